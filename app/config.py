@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
+import os
 
 class Settings(BaseSettings):
     # Application
@@ -11,13 +12,91 @@ class Settings(BaseSettings):
     # JWT
     JWT_SECRET_KEY: str = "dev-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    # Refresh tokens expire this long after they were issued (each use rotates them)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Signing keys for rotation, "kid:secret,kid:secret"; unset means JWT_SECRET_KEY only
+    JWT_SIGNING_KEYS: Optional[str] = None
+    # Key id new tokens are signed with (defaults to the first key)
+    JWT_ACTIVE_KEY_ID: Optional[str] = None
+    # Verified tokens kept per worker
+    JWT_CACHE_SIZE: int = 10000
     
     # DynamoDB
     LEADS_TABLE_NAME: str = "leads"
     USERS_TABLE_NAME: str = "users"
+    LEAD_META_TABLE_NAME: str = "lead_meta"
     AWS_REGION: str = "us-east-1"
     DYNAMODB_ENDPOINT: Optional[str] = "http://localhost:8000"
+    # Set after scripts/migrate_lead_shards.py backfill: list leads from shard_key-created_at-index
+    LEADS_SHARD_INDEX_READY: bool = False
+    # New leads are merged into GET /leads for clients passing X-Session-Token for this long
+    READ_YOUR_WRITES_SECONDS: int = 60
+    # Set after scripts/backfill_user_email_keys.py: registration stops checking email-index
+    USER_EMAIL_KEYS_BACKFILLED: bool = False
+    # Concurrent identical lead/user reads tracked for sharing one call (0 disables)
+    READ_COALESCING_MAX_KEYS: int = 1024
+    # Validate every stored lead/user read instead of trusting our own rows (for migrations)
+    ROW_CODEC_STRICT: bool = False
+    
+    # Accept http and private/loopback webhook URLs (local development only;
+    # otherwise webhooks must be https to public addresses)
+    WEBHOOK_ALLOW_PRIVATE_URLS: bool = False
+    
+    # Search index backend: "dynamodb" (lead meta table) or "memory" (local only)
+    SEARCH_INDEX_BACKEND: str = "dynamodb"
+    
+    # Timezone lead scoring judges business hours in (IANA name). It applies
+    # to every tenant: businesses have no timezone of their own yet
+    SCORING_TIMEZONE: str = "UTC"
+    
+    # Duplicate lead handling on create: "off", "flag", "reject" or "merge"
+    DEDUPE_MODE: Literal["off", "flag", "reject", "merge"] = "flag"
+    
+    # Live lead feed (GET /leads/stream, not available on Lambda). Broker
+    # "dynamodb" shares events between workers through the lead meta table,
+    # polled every LEAD_FEED_POLL_SECONDS; "local" only within one process
+    LEAD_FEED_BROKER: str = "dynamodb"
+    LEAD_FEED_POLL_SECONDS: float = 1.0
+    LEAD_FEED_HEARTBEAT_SECONDS: float = 15.0
+    LEAD_FEED_QUEUE_SIZE: int = 100
+    
+    # Lead archive: "local" (ARCHIVE_PATH directory) or "s3" (ARCHIVE_BUCKET)
+    ARCHIVE_BACKEND: str = "local"
+    ARCHIVE_PATH: str = "archive"
+    ARCHIVE_BUCKET: Optional[str] = None
+    ARCHIVE_AFTER_DAYS: int = 365
+    
+    # Request profiling: requests with an X-Profile header signed with
+    # PROFILE_SECRET, under an admin toggle, or a random PROFILE_SAMPLE_RATE
+    PROFILE_SECRET: Optional[str] = None
+    PROFILE_SAMPLE_RATE: float = 0.001
+    # Relative to the working directory, or to /tmp on Lambda (the code directory is read-only)
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_STORED: int = 200
+    
+    # Load shedding: in-flight requests per worker are held to a limit
+    # adapted from latency; requests over it get 503 with Retry-After
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_INITIAL_LIMIT: int = 50
+    LOAD_SHED_MIN_LIMIT: int = 5
+    LOAD_SHED_MAX_LIMIT: int = 500
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 1
+    # Path prefixes shed first, and ones never limited (long-lived streams)
+    LOAD_SHED_BULK_PATHS: str = "/leads/archive,/admin"
+    LOAD_SHED_EXEMPT_PATHS: str = "/leads/stream"
+    
+    # Admin endpoints (comma-separated emails)
+    ADMIN_EMAILS: str = ""
+    
+    # Response compression: encodings in order of preference ("" disables),
+    # bodies under COMPRESSION_MINIMUM_SIZE bytes are sent uncompressed
+    COMPRESSION_ENCODINGS: str = "zstd,br,gzip"
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Higher is smaller but slower: gzip 1-9, brotli 0-11, zstd 1-22
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
     
     # CORS - stored as string, converted to list via method
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:8080"
@@ -25,6 +104,9 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     
+    # Set by the Lambda runtime
+    AWS_LAMBDA_FUNCTION_NAME: Optional[str] = None
+    
     # Use model_config instead of Config class
     model_config = {
         "env_file": ".env",
@@ -33,8 +115,26 @@ class Settings(BaseSettings):
         "extra": "ignore"
     }
     
+    def is_lambda(self) -> bool:
+        """Whether we are running inside AWS Lambda (behind Mangum)"""
+        return bool(self.AWS_LAMBDA_FUNCTION_NAME)
+    
+    def get_profile_dir(self) -> str:
+        """Directory request profiles are written to, under /tmp on Lambda"""
+        if self.is_lambda() and not os.path.isabs(self.PROFILE_DIR):
+            return os.path.join("/tmp", self.PROFILE_DIR)
+        return self.PROFILE_DIR
+    
     def get_cors_origins(self) -> list[str]:
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+    
+    def get_compression_encodings(self) -> list[str]:
+        """Parse compression encodings from comma-separated string"""
+        return [encoding.strip() for encoding in self.COMPRESSION_ENCODINGS.split(",") if encoding.strip()]
+    
+    def get_admin_emails(self) -> set[str]:
+        """Parse admin emails from comma-separated string"""
+        return {email.strip().lower() for email in self.ADMIN_EMAILS.split(",") if email.strip()}
 
 settings = Settings()
\ No newline at end of file
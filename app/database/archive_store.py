@@ -0,0 +1,67 @@
+from typing import List
+import io
+import logging
+import os
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+
+class LocalArchiveStore:
+    """
+    Archive files on the local filesystem, under one directory per tenant.
+
+    Used for local development and tests. Files are written to a temporary
+    name and renamed into place, so readers never see a partial file.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def list_keys(self, prefix: str) -> List[str]:
+        """Keys under a "<dir>/" prefix, in sorted order"""
+        directory = self._path(prefix.rstrip("/"))
+        keys = []
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                relative = os.path.relpath(os.path.join(dirpath, filename), self.root)
+                keys.append(relative.replace(os.sep, "/"))
+        return sorted(keys)
+
+    def open(self, key: str) -> io.BufferedIOBase:
+        return open(self._path(key), "rb")
+
+
+class S3ArchiveStore:
+    """Archive files in an S3 bucket, keyed under an optional prefix"""
+    def __init__(self, bucket: str, prefix: str = ""):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3 = boto3.client('s3', region_name=os.getenv("AWS_REGION", "us-east-1"))
+
+    def put(self, key: str, data: bytes) -> None:
+        self.s3.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def list_keys(self, prefix: str) -> List[str]:
+        keys = []
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + prefix):
+            keys.extend(obj['Key'][len(self.prefix):] for obj in page.get('Contents', []))
+        return sorted(keys)
+
+    def open(self, key: str) -> io.RawIOBase:
+        return self.s3.get_object(Bucket=self.bucket, Key=self.prefix + key)['Body']
+
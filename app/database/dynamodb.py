@@ -1,12 +1,81 @@
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
-from typing import List, Optional, Dict, Any
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from decimal import Decimal
+from itertools import islice
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
+import base64
+import heapq
+import json
 import os
+import time
+import zlib
 from datetime import datetime
 import logging
 
+from app.config import settings
+from app.database.single_flight import SingleFlight
+from app.utils.profiling import profiled_methods
+
 logger = logging.getLogger(__name__)
 
+# Outbox events are spread over this many partitions of the meta table
+OUTBOX_SHARDS = 4
+# Undelivered outbox and dead-letter items expire (via DynamoDB TTL) after this
+OUTBOX_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+def outbox_due_key(due_at: float) -> str:
+    """Outbox sort key prefix for events due at an epoch time (millisecond resolution)"""
+    return f"due#{int(due_at * 1000):013d}"
+
+# Indexes for listing a tenant's leads by created_at. The legacy index is keyed
+# on business_id. The shard index is keyed on shard_key: the business_id for
+# most tenants, business_id#N for tenants whose writes are spread over shards.
+LEGACY_LEADS_INDEX = 'business_id-created_at-index'
+SHARD_LEADS_INDEX = 'shard_key-created_at-index'
+# Workers re-read a tenant's sharding config this often
+SHARDING_CACHE_SECONDS = 60
+# Leads per page yielded by iter_business_leads
+ITER_PAGE_SIZE = 1000
+
+
+def _lead_order(item: Dict[str, Any]) -> Tuple[str, str]:
+    """Sort key for merging leads from several index partitions"""
+    return item['created_at'], item['id']
+
+
+def encode_cursor(item: Dict[str, Any]) -> str:
+    """Opaque list_leads cursor pointing just past an item"""
+    return base64.urlsafe_b64encode(json.dumps(list(_lead_order(item))).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        created_at, lead_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(lead_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class ConditionalWriteError(Exception):
+    """Raised when DynamoDB rejects a conditional or transactional write"""
+    def __init__(self, message: str, reasons: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.reasons = reasons or []
+
+
+class DuplicateLeadError(ConditionalWriteError):
+    """Raised when a new lead's email or phone is already claimed by another lead"""
+    def __init__(self, existing_lead_id: str):
+        super().__init__(f"Duplicate of lead {existing_lead_id}")
+        self.existing_lead_id = existing_lead_id
+
+
+@profiled_methods("dynamodb")
 class DynamoDBClient:
     def __init__(self):
         environment = os.getenv("ENVIRONMENT", "production")
@@ -32,23 +101,199 @@ class DynamoDBClient:
         self.users_table = self.dynamodb.Table(
             os.getenv("USERS_TABLE_NAME", "users")
         )
+        # Generic pk/sk table for derived per-tenant data (counters, indexes)
+        self.meta_table = self.dynamodb.Table(
+            os.getenv("LEAD_META_TABLE_NAME", "lead_meta")
+        )
+        # Set once every lead has a shard_key, so unsharded tenants read the shard index too
+        self.shard_index_ready = settings.LEADS_SHARD_INDEX_READY
+        self._sharding_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # New leads are also kept in a per-tenant buffer this long, for read-your-writes listings
+        self.recent_writes_seconds = settings.READ_YOUR_WRITES_SECONDS
+        # Concurrent identical lead and user reads share one DynamoDB call
+        self.reads = SingleFlight(settings.READ_COALESCING_MAX_KEYS)
+
+    def _transact_write(self, items: List[Dict[str, Any]]) -> None:
+        """Run a TransactWriteItems call, mapping cancellations to ConditionalWriteError"""
+        try:
+            self.dynamodb.meta.client.transact_write_items(TransactItems=items)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'TransactionCanceledException':
+                raise ConditionalWriteError(
+                    e.response['Error'].get('Message', 'Transaction cancelled'),
+                    e.response.get('CancellationReasons', [])
+                ) from e
+            raise
+
+    def _contact_key_puts(
+        self,
+        business_id: str,
+        contact_keys: List[str],
+        lead_id: str
+    ) -> List[Dict[str, Any]]:
+        """Build transaction items that claim contact keys only if they are unclaimed"""
+        return [
+            {
+                'Put': {
+                    'TableName': self.meta_table.name,
+                    'Item': {'pk': f"contact#{business_id}", 'sk': key, 'lead_id': lead_id},
+                    'ConditionExpression': 'attribute_not_exists(pk)',
+                    'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+                }
+            }
+            for key in contact_keys
+        ]
+    
+    def _contact_key_owner(
+        self,
+        business_id: str,
+        key: str,
+        reason: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Find the lead that owns a contact key, preferring the item from a failed condition"""
+        item = (reason or {}).get('Item')
+        if item and 'lead_id' in item:
+            # Items attached to errors are not converted from the wire format
+            owner = item['lead_id']
+            return TypeDeserializer().deserialize(owner) if isinstance(owner, dict) else owner
+        response = self.meta_table.get_item(
+            Key={'pk': f"contact#{business_id}", 'sk': key},
+            ConsistentRead=True
+        )
+        return response.get('Item', {}).get('lead_id')
+    
+    @staticmethod
+    def outbox_pk(event_id: str) -> str:
+        """Outbox partition for an event"""
+        return f"outbox#{zlib.crc32(event_id.encode()) % OUTBOX_SHARDS}"
+    
+    def _outbox_puts(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build transaction items that append events to the outbox, due at once"""
+        now = time.time()
+        expires_at = int(now) + OUTBOX_RETENTION_SECONDS
+        return [
+            {
+                'Put': {
+                    'TableName': self.meta_table.name,
+                    'Item': {
+                        **event,
+                        'pk': self.outbox_pk(event['event_id']),
+                        'sk': f"{outbox_due_key(now)}#{event['event_id']}",
+                        'attempts': 0,
+                        'expires_at': expires_at
+                    }
+                }
+            }
+            for event in events
+        ]
+    
+    def _score_dirty_puts(self, business_id: str, lead_id: str) -> List[Dict[str, Any]]:
+        """Build the transaction item that queues a lead for re-scoring"""
+        return [{
+            'Put': {
+                'TableName': self.meta_table.name,
+                'Item': {'pk': f"scoredirty#{business_id}", 'sk': lead_id}
+            }
+        }]
+    
+    @staticmethod
+    def _recent_write_key(business_id: str, lead_id: str, created_at: str) -> Dict[str, str]:
+        return {'pk': f"recent#{business_id}", 'sk': f"{created_at}#{lead_id}"}
+    
+    def _recent_write_puts(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build the transaction item that adds a new lead to its tenant's recent-writes buffer"""
+        return [{
+            'Put': {
+                'TableName': self.meta_table.name,
+                'Item': {
+                    **self._recent_write_key(item['business_id'], item['id'], item['created_at']),
+                    'lead': item,
+                    'expires_at': int(time.time()) + self.recent_writes_seconds
+                }
+            }
+        }]
+    
+    def _apply_stats_deltas(self, business_id: str, stats_deltas: Optional[Dict[str, int]]) -> None:
+        """
+        ADD deltas to per-tenant stats counters once the lead write has committed.
+        Kept out of the write's transaction: every write of a tenant touches the
+        same counter items, so concurrent transactions would cancel each other.
+        Failures are logged; the stats rebuild repairs any drift.
+        """
+        for bucket, delta in (stats_deltas or {}).items():
+            if not delta:
+                continue
+            try:
+                self.meta_table.update_item(
+                    Key={'pk': f"stats#{business_id}", 'sk': bucket},
+                    UpdateExpression='ADD #count :delta',
+                    ExpressionAttributeNames={'#count': 'count'},
+                    ExpressionAttributeValues={':delta': delta}
+                )
+            except Exception as e:
+                logger.error(f"Error updating stats bucket {bucket} for business {business_id}: {str(e)}")
     
     # LEAD OPERATIONS
-    async def create_lead(self, lead_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new lead"""
+    async def create_lead(
+        self,
+        lead_data: Dict[str, Any],
+        stats_deltas: Optional[Dict[str, int]] = None,
+        contact_keys: Optional[List[str]] = None,
+        outbox_events: Optional[List[Dict[str, Any]]] = None,
+        score_dirty: bool = False,
+        recent_write: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create a new lead, appending outbox events in the same transaction.
+        contact_keys are claimed in that transaction too; if any is already
+        claimed nothing is written and DuplicateLeadError names the owner. With
+        recent_write the lead is also added to the tenant's recent-writes
+        buffer. Stats counters are updated after the transaction commits.
+        """
+        business_id = lead_data['business_id']
+        contact_keys = contact_keys or []
+        item = {**lead_data, 'shard_key': self._write_shard_key(business_id, lead_data['id'])}
         try:
-            self.leads_table.put_item(Item=lead_data)
+            if contact_keys or outbox_events or score_dirty or recent_write:
+                try:
+                    self._transact_write([
+                        {'Put': {'TableName': self.leads_table.name, 'Item': item}},
+                        *self._outbox_puts(outbox_events or []),
+                        *(self._score_dirty_puts(business_id, lead_data['id']) if score_dirty else []),
+                        *(self._recent_write_puts(item) if recent_write else []),
+                        *self._contact_key_puts(business_id, contact_keys, lead_data['id'])
+                    ])
+                except ConditionalWriteError as e:
+                    # Reasons line up with the transaction items; contact keys come last
+                    reasons = e.reasons[-len(contact_keys):] if e.reasons and contact_keys else []
+                    for key, reason in zip(contact_keys, reasons):
+                        if reason.get('Code') == 'ConditionalCheckFailed':
+                            owner = self._contact_key_owner(business_id, key, reason)
+                            if owner:
+                                raise DuplicateLeadError(owner) from e
+                    raise
+            else:
+                self.leads_table.put_item(Item=item)
+            self._apply_stats_deltas(business_id, stats_deltas)
             logger.info(f"Created lead: {lead_data['id']}")
             return lead_data
+        except DuplicateLeadError as e:
+            logger.info(f"Lead {lead_data['id']} duplicates lead {e.existing_lead_id}")
+            raise
         except Exception as e:
             logger.error(f"Error creating lead: {str(e)}")
             raise
+        finally:
+            self.reads.forget(business_id)
     
     async def get_lead(self, lead_id: str, business_id: str) -> Optional[Dict[str, Any]]:
         """Get a lead by ID and business_id"""
         try:
-            response = self.leads_table.get_item(
-                Key={'id': lead_id, 'business_id': business_id}
+            response = await self.reads.do(
+                (business_id, 'get_lead', lead_id),
+                lambda: asyncio.to_thread(
+                    self.leads_table.get_item, Key={'id': lead_id, 'business_id': business_id}
+                )
             )
             return response.get('Item')
         except Exception as e:
@@ -62,42 +307,105 @@ class DynamoDBClient:
         limit: int = 100
     ) -> List[Dict[str, Any]]:
         """List leads for a business with optional status filter"""
+        items, _ = await self.list_leads_page(business_id, status, limit)
+        return items
+    
+    async def list_leads_page(
+        self,
+        business_id: str,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of a business's leads, most recent first, and the cursor for
+        the next page (None on the last page). Sharded tenants are read from
+        every shard concurrently and merged by created_at.
+        """
+        return await self.reads.do(
+            (business_id, 'list_leads_page', status, limit, cursor),
+            lambda: self._list_leads_page(business_id, status, limit, cursor)
+        )
+    
+    async def _list_leads_page(
+        self,
+        business_id: str,
+        status: Optional[str],
+        limit: int,
+        cursor: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         try:
-            # Query using GSI on business_id
-            kwargs = {
-                'IndexName': 'business_id-created_at-index',
-                'KeyConditionExpression': Key('business_id').eq(business_id),
-                'Limit': limit,
-                'ScanIndexForward': False  # Most recent first
-            }
+            after = decode_cursor(cursor) if cursor else None
             
-            if status:
-                kwargs['FilterExpression'] = Attr('status').eq(status)
+            def read(partition):
+                items = list(islice(
+                    self._iter_partition(partition, status, after=after, page_size=limit),
+                    limit
+                ))
+                # The index does not order leads with equal created_at; the merge needs it
+                items.sort(key=_lead_order, reverse=True)
+                return items
             
-            response = self.leads_table.query(**kwargs)
-            return response.get('Items', [])
+            partitions = self._lead_partitions(business_id)
+            results = await asyncio.gather(*(asyncio.to_thread(read, p) for p in partitions))
+            items = list(islice(heapq.merge(*results, key=_lead_order, reverse=True), limit))
+            next_cursor = encode_cursor(items[-1]) if len(items) == limit else None
+            return items, next_cursor
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error listing leads for business {business_id}: {str(e)}")
             raise
     
+    async def list_recent_writes(self, business_id: str, since: str) -> List[Dict[str, Any]]:
+        """
+        Leads from a tenant's recent-writes buffer created at or after since
+        (ISO timestamp), as they were when created. A strongly consistent read
+        of one small partition, so it includes every committed create.
+        """
+        try:
+            kwargs = {
+                'KeyConditionExpression': Key('pk').eq(f"recent#{business_id}") & Key('sk').gte(since),
+                'ConsistentRead': True
+            }
+            leads = []
+            while True:
+                response = self.meta_table.query(**kwargs)
+                leads.extend(item['lead'] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return leads
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            logger.error(f"Error listing recent writes for business {business_id}: {str(e)}")
+            raise
+    
     async def update_lead(
     self, 
     lead_id: str, 
     business_id: str, 
-    updates: Dict[str, Any]
+    updates: Dict[str, Any],
+    stats_deltas: Optional[Dict[str, int]] = None,
+    expected_status: Optional[str] = None,
+    outbox_events: Optional[List[Dict[str, Any]]] = None,
+    score_dirty: bool = False
     ) -> Dict[str, Any]:
-        """Update a lead"""
+        """
+        Update a lead.
+        When outbox_events are given they are written in the same transaction,
+        which is only applied if the stored status still equals
+        expected_status; stats_deltas are then added once it has committed.
+        """
         try:
             # Build update expression with attribute name mapping for reserved keywords
             update_parts = ["updated_at = :updated_at"]
-            expr_values = {':updated_at': datetime.utcnow().isoformat()}
+            expr_values = {':updated_at': updates.get('updated_at') or datetime.utcnow().isoformat()}
             expr_names = {}
             
             # DynamoDB reserved keywords that need ExpressionAttributeNames
             reserved_keywords = {'status', 'name', 'data', 'timestamp'}
             
             for key, value in updates.items():
-                if value is not None:
+                if value is not None and key != 'updated_at':
                     # Check if attribute name is a reserved keyword
                     if key.lower() in reserved_keywords:
                         # Use ExpressionAttributeNames for reserved keywords
@@ -126,6 +434,27 @@ class DynamoDBClient:
             if expr_names:
                 update_params['ExpressionAttributeNames'] = expr_names
             
+            if stats_deltas or outbox_events or score_dirty:
+                update_params.pop('ReturnValues')
+                update_params['TableName'] = self.leads_table.name
+                if expected_status is not None:
+                    update_params['ConditionExpression'] = '#status = :expected_status'
+                    update_params['ExpressionAttributeNames'] = {**expr_names, '#status': 'status'}
+                    expr_values[':expected_status'] = expected_status
+                self._transact_write([
+                    {'Update': update_params},
+                    *self._outbox_puts(outbox_events or []),
+                    *(self._score_dirty_puts(business_id, lead_id) if score_dirty else [])
+                ])
+                self._apply_stats_deltas(business_id, stats_deltas)
+                # Transactions return no attributes, so read back the new item
+                response = self.leads_table.get_item(
+                    Key={'id': lead_id, 'business_id': business_id},
+                    ConsistentRead=True
+                )
+                logger.info(f"Updated lead: {lead_id}")
+                return response['Item']
+            
             response = self.leads_table.update_item(**update_params)
             
             updated_item = response.get('Attributes')
@@ -138,42 +467,924 @@ class DynamoDBClient:
         except Exception as e:
             logger.error(f"Error updating lead {lead_id}: {str(e)}")
             raise
+        finally:
+            self.reads.forget(business_id)
     
-    async def delete_lead(self, lead_id: str, business_id: str) -> bool:
-        """Delete a lead"""
+    async def delete_lead(
+        self,
+        lead_id: str,
+        business_id: str,
+        stats_deltas: Optional[Dict[str, int]] = None,
+        contact_keys: Optional[List[str]] = None,
+        outbox_events: Optional[List[Dict[str, Any]]] = None,
+        score_dirty: bool = False,
+        recent_created_at: Optional[str] = None
+    ) -> bool:
+        """
+        Delete a lead, appending outbox events in the same transaction, then
+        update stats and release the contact keys the lead still owns (keys
+        owned by another lead are left alone, as the lead may never have
+        claimed them). recent_created_at is the
+        created_at of a lead that may still be in the recent-writes buffer,
+        to remove it from there too.
+        """
         try:
-            self.leads_table.delete_item(
-                Key={'id': lead_id, 'business_id': business_id}
-            )
+            if stats_deltas or contact_keys or outbox_events or score_dirty or recent_created_at:
+                self._transact_write([
+                    {
+                        'Delete': {
+                            'TableName': self.leads_table.name,
+                            'Key': {'id': lead_id, 'business_id': business_id},
+                            'ConditionExpression': 'attribute_exists(id)'
+                        }
+                    },
+                    *self._outbox_puts(outbox_events or []),
+                    *(self._score_dirty_puts(business_id, lead_id) if score_dirty else []),
+                    *([{
+                        'Delete': {
+                            'TableName': self.meta_table.name,
+                            'Key': self._recent_write_key(business_id, lead_id, recent_created_at)
+                        }
+                    }] if recent_created_at else [])
+                ])
+            else:
+                self.leads_table.delete_item(
+                    Key={'id': lead_id, 'business_id': business_id}
+                )
+            self._apply_stats_deltas(business_id, stats_deltas)
+            if contact_keys:
+                try:
+                    await self.release_contact_keys(business_id, contact_keys, lead_id)
+                except Exception as e:
+                    logger.error(f"Error releasing contact keys of lead {lead_id}: {str(e)}")
             logger.info(f"Deleted lead: {lead_id}")
             return True
         except Exception as e:
             logger.error(f"Error deleting lead {lead_id}: {str(e)}")
             raise
+        finally:
+            self.reads.forget(business_id)
+    
+    def _batch_get(self, table, keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """BatchGetItem in chunks of 100, retrying unprocessed keys (order not preserved)"""
+        items = []
+        for i in range(0, len(keys), 100):
+            request = {table.name: {'Keys': keys[i:i + 100]}}
+            while request:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                items.extend(response.get('Responses', {}).get(table.name, []))
+                request = response.get('UnprocessedKeys')
+        return items
+    
+    async def get_leads_batch(self, business_id: str, lead_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get several leads of one business by ID (order not preserved)"""
+        try:
+            return self._batch_get(
+                self.leads_table,
+                [{'id': lead_id, 'business_id': business_id} for lead_id in dict.fromkeys(lead_ids)]
+            )
+        except Exception as e:
+            logger.error(f"Error batch getting leads for business {business_id}: {str(e)}")
+            raise
+    
+    async def delete_lead_if_unchanged(self, row: Dict[str, Any]) -> bool:
+        """
+        Delete a lead only if its status and updated_at still match a copy read
+        earlier; False if it was changed (or deleted) since.
+        """
+        business_id = row['business_id']
+        condition = Attr('status').eq(row.get('status'))
+        if row.get('updated_at') is None:
+            condition = condition & Attr('updated_at').not_exists()
+        else:
+            condition = condition & Attr('updated_at').eq(row['updated_at'])
+        try:
+            self.leads_table.delete_item(
+                Key={'id': row['id'], 'business_id': business_id},
+                ConditionExpression=condition
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            logger.error(f"Error deleting lead {row['id']}: {str(e)}")
+            raise
+        finally:
+            self.reads.forget(business_id)
+    
+    async def iter_business_leads(self, business_id: str, oldest_first: bool = False):
+        """Yield pages of every lead for a business, newest first by default"""
+        iterators = [
+            self._iter_partition(partition, oldest_first=oldest_first)
+            for partition in self._lead_partitions(business_id)
+        ]
+        if len(iterators) == 1:
+            items = iterators[0]
+        else:
+            items = heapq.merge(*iterators, key=_lead_order, reverse=not oldest_first)
+        page = []
+        for item in items:
+            page.append(item)
+            if len(page) >= ITER_PAGE_SIZE:
+                yield page
+                page = []
+        if page:
+            yield page
+    
+    # LEAD SHARDING
+    @staticmethod
+    def lead_shard_key(business_id: str, lead_id: str, shards: int) -> str:
+        """Shard index key for a lead of a tenant spread over the given number of shards"""
+        if shards <= 1:
+            return business_id
+        return f"{business_id}#{zlib.crc32(lead_id.encode()) % shards}"
+    
+    def get_lead_sharding(self, business_id: str) -> Dict[str, Any]:
+        """
+        A tenant's sharding config, cached for SHARDING_CACHE_SECONDS:
+        {'shards': N, 'previous_shards': M, 'state': 'migrating' | 'active'}.
+        """
+        cached = self._sharding_cache.get(business_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        item = self.meta_table.get_item(
+            Key={'pk': f"tenant#{business_id}", 'sk': 'sharding'}
+        ).get('Item')
+        if item:
+            config = {
+                'shards': int(item['shards']),
+                'previous_shards': int(item.get('previous_shards', 1)),
+                'state': item['state']
+            }
+        else:
+            config = {'shards': 1, 'previous_shards': 1, 'state': 'active'}
+        self._sharding_cache[business_id] = (time.monotonic() + SHARDING_CACHE_SECONDS, config)
+        return config
+    
+    async def set_lead_sharding(
+        self,
+        business_id: str,
+        shards: int,
+        state: str,
+        previous_shards: int = 1
+    ) -> None:
+        """Store a tenant's sharding config (other workers see it within SHARDING_CACHE_SECONDS)"""
+        self.meta_table.put_item(Item={
+            'pk': f"tenant#{business_id}",
+            'sk': 'sharding',
+            'shards': shards,
+            'previous_shards': previous_shards,
+            'state': state,
+            'updated_at': datetime.utcnow().isoformat()
+        })
+        self._sharding_cache.pop(business_id, None)
+        self.reads.forget(business_id)
+    
+    def _write_shard_key(self, business_id: str, lead_id: str) -> str:
+        return self.lead_shard_key(business_id, lead_id, self.get_lead_sharding(business_id)['shards'])
+    
+    def _lead_partitions(self, business_id: str) -> List[Tuple[str, str, str]]:
+        """(index, key attribute, key value) of every index partition holding a tenant's leads"""
+        config = self.get_lead_sharding(business_id)
+        
+        def keys(shards: int) -> List[str]:
+            return [business_id] if shards <= 1 else [f"{business_id}#{n}" for n in range(shards)]
+        
+        if config['state'] == 'migrating':
+            if not self.shard_index_ready:
+                # The legacy index holds every lead whatever its shard key
+                return [(LEGACY_LEADS_INDEX, 'business_id', business_id)]
+            values = list(dict.fromkeys(keys(config['previous_shards']) + keys(config['shards'])))
+        else:
+            if config['shards'] <= 1 and not self.shard_index_ready:
+                return [(LEGACY_LEADS_INDEX, 'business_id', business_id)]
+            values = keys(config['shards'])
+        return [(SHARD_LEADS_INDEX, 'shard_key', value) for value in values]
+    
+    def _iter_partition(
+        self,
+        partition: Tuple[str, str, str],
+        status: Optional[str] = None,
+        oldest_first: bool = False,
+        after: Optional[Tuple[str, str]] = None,
+        page_size: Optional[int] = None
+    ):
+        """
+        Yield a partition's leads in created_at order, lazily page by page.
+        after is a (created_at, id) cursor; only leads that sort below it
+        (newest-first order) are yielded.
+        """
+        index, attribute, value = partition
+        condition = Key(attribute).eq(value)
+        if after:
+            condition = condition & Key('created_at').lte(after[0])
+        kwargs = {
+            'IndexName': index,
+            'KeyConditionExpression': condition,
+            'ScanIndexForward': oldest_first
+        }
+        if page_size:
+            kwargs['Limit'] = page_size
+        if status:
+            kwargs['FilterExpression'] = Attr('status').eq(status)
+        while True:
+            response = self.leads_table.query(**kwargs)
+            for item in response.get('Items', []):
+                if after and _lead_order(item) >= after:
+                    continue
+                yield item
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    async def set_lead_shard_key(self, lead_id: str, business_id: str, shard_key: str) -> bool:
+        """Move a lead to another index partition; False if the lead no longer exists"""
+        try:
+            self.leads_table.update_item(
+                Key={'id': lead_id, 'business_id': business_id},
+                UpdateExpression='SET shard_key = :shard_key',
+                ConditionExpression='attribute_exists(id)',
+                ExpressionAttributeValues={':shard_key': shard_key}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        finally:
+            self.reads.forget(business_id)
+    
+    # CONTACT KEY OPERATIONS
+    async def claim_contact_key(self, business_id: str, key: str, lead_id: str) -> str:
+        """Claim a contact key for a lead if unclaimed; returns the lead that owns it"""
+        try:
+            self.meta_table.put_item(
+                Item={'pk': f"contact#{business_id}", 'sk': key, 'lead_id': lead_id},
+                ConditionExpression='attribute_not_exists(pk) OR lead_id = :lead_id',
+                ExpressionAttributeValues={':lead_id': lead_id},
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+            return lead_id
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logger.error(f"Error claiming contact key for lead {lead_id}: {str(e)}")
+                raise
+            return self._contact_key_owner(business_id, key, e.response) or lead_id
+    
+    async def release_contact_keys(self, business_id: str, keys: List[str], lead_id: str) -> None:
+        """Delete contact keys that are still owned by a lead"""
+        for key in keys:
+            try:
+                self.meta_table.delete_item(
+                    Key={'pk': f"contact#{business_id}", 'sk': key},
+                    ConditionExpression='lead_id = :lead_id',
+                    ExpressionAttributeValues={':lead_id': lead_id}
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+    
+    # OUTBOX OPERATIONS
+    # Outbox items are keyed by when they are next due (sk = due#<epoch ms>#<event_id>),
+    # so the due events of a shard are one range query. Claiming, rescheduling
+    # and dead-lettering an event each move it with a conditional delete of its
+    # current key, which only one dispatcher can win.
+    async def get_outbox_events(self, shard: int, limit: int = 100) -> List[Dict[str, Any]]:
+        """Up to limit events in an outbox shard that are due for delivery, oldest due first"""
+        try:
+            events: List[Dict[str, Any]] = []
+            kwargs = {
+                # Keys written before due keys existed sort before "due#" and count as due
+                'KeyConditionExpression': (
+                    Key('pk').eq(f"outbox#{shard}") & Key('sk').lte(f"{outbox_due_key(time.time())}$")
+                ),
+                'Limit': limit
+            }
+            while len(events) < limit:
+                response = self.meta_table.query(**kwargs)
+                events.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+                kwargs['Limit'] = limit - len(events)
+            return events[:limit]
+        except Exception as e:
+            logger.error(f"Error reading outbox shard {shard}: {str(e)}")
+            raise
+    
+    def _move_outbox_event(self, event: Dict[str, Any], item: Dict[str, Any]) -> bool:
+        """Replace an outbox event with item, only if the event is still at its key"""
+        try:
+            self._transact_write([
+                {
+                    'Delete': {
+                        'TableName': self.meta_table.name,
+                        'Key': {'pk': event['pk'], 'sk': event['sk']},
+                        'ConditionExpression': 'attribute_exists(pk)'
+                    }
+                },
+                {'Put': {'TableName': self.meta_table.name, 'Item': item}}
+            ])
+            return True
+        except ConditionalWriteError:
+            return False
+    
+    async def claim_outbox_event(self, event: Dict[str, Any], lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Lease a due event for delivery by moving it lease_seconds into the
+        future; None if another dispatcher claimed it first. An event whose
+        dispatcher dies becomes due again when the lease runs out.
+        """
+        leased_until = time.time() + lease_seconds
+        claimed = {
+            **event,
+            'sk': f"{outbox_due_key(leased_until)}#{event['event_id']}",
+            'leased_until': int(leased_until)
+        }
+        return claimed if self._move_outbox_event(event, claimed) else None
+    
+    async def delete_outbox_events(self, events: List[Dict[str, Any]]) -> None:
+        """Remove delivered events from the outbox"""
+        with self.meta_table.batch_writer() as batch:
+            for event in events:
+                batch.delete_item(Key={'pk': event['pk'], 'sk': event['sk']})
+    
+    async def reschedule_outbox_event(
+        self,
+        event: Dict[str, Any],
+        next_attempt_at: int,
+        delivered_to: List[str],
+        error: str
+    ) -> bool:
+        """Record a failed delivery attempt and when to try again; False if the lease was lost"""
+        rescheduled = {
+            **{k: v for k, v in event.items() if k != 'leased_until'},
+            'sk': f"{outbox_due_key(next_attempt_at)}#{event['event_id']}",
+            'next_attempt_at': next_attempt_at,
+            'last_error': error,
+            'attempts': int(event.get('attempts', 0)) + 1
+        }
+        if delivered_to:
+            rescheduled['delivered_to'] = set(delivered_to)
+        return self._move_outbox_event(event, rescheduled)
+    
+    async def dead_letter_outbox_event(self, event: Dict[str, Any], error: str) -> bool:
+        """Move an event that exhausted its retries to the tenant's dead-letter partition"""
+        dead_letter = {
+            **{k: v for k, v in event.items() if k != 'leased_until'},
+            'pk': f"deadletter#{event['business_id']}",
+            'sk': f"{event['occurred_at']}#{event['event_id']}",
+            'last_error': error,
+            'expires_at': int(time.time()) + OUTBOX_RETENTION_SECONDS
+        }
+        if not self._move_outbox_event(event, dead_letter):
+            return False
+        logger.warning(f"Dead-lettered event {event['event_id']}: {error}")
+        return True
+    
+    async def list_dead_letters(
+        self,
+        business_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        A page of events that could not be delivered for a business, oldest
+        first, and the cursor for the next page (None on the last page).
+        Raises ValueError for malformed cursors.
+        """
+        pk = f"deadletter#{business_id}"
+        kwargs = {'KeyConditionExpression': Key('pk').eq(pk), 'Limit': limit}
+        if cursor:
+            try:
+                sk = base64.urlsafe_b64decode(cursor.encode()).decode()
+            except Exception as e:
+                raise ValueError("Invalid cursor") from e
+            if not sk:
+                raise ValueError("Invalid cursor")
+            kwargs['ExclusiveStartKey'] = {'pk': pk, 'sk': sk}
+        items: List[Dict[str, Any]] = []
+        while True:
+            response = self.meta_table.query(**kwargs)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if last_key is None:
+                return items, None
+            if len(items) >= limit:
+                return items, base64.urlsafe_b64encode(last_key['sk'].encode()).decode()
+            kwargs['ExclusiveStartKey'] = last_key
+            kwargs['Limit'] = limit - len(items)
+    
+    # WEBHOOK OPERATIONS
+    async def create_webhook(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Register a webhook endpoint for a business"""
+        try:
+            self.meta_table.put_item(Item={
+                **webhook_data,
+                'pk': f"webhooks#{webhook_data['business_id']}",
+                'sk': webhook_data['id']
+            })
+            logger.info(f"Created webhook: {webhook_data['id']}")
+            return webhook_data
+        except Exception as e:
+            logger.error(f"Error creating webhook: {str(e)}")
+            raise
+    
+    async def list_webhooks(self, business_id: str) -> List[Dict[str, Any]]:
+        """List a business's webhook endpoints"""
+        try:
+            response = self.meta_table.query(
+                KeyConditionExpression=Key('pk').eq(f"webhooks#{business_id}")
+            )
+            return response.get('Items', [])
+        except Exception as e:
+            logger.error(f"Error listing webhooks for business {business_id}: {str(e)}")
+            raise
+    
+    async def delete_webhook(self, webhook_id: str, business_id: str) -> bool:
+        """Delete a webhook endpoint; False if it did not exist"""
+        try:
+            response = self.meta_table.delete_item(
+                Key={'pk': f"webhooks#{business_id}", 'sk': webhook_id},
+                ReturnValues='ALL_OLD'
+            )
+            return 'Attributes' in response
+        except Exception as e:
+            logger.error(f"Error deleting webhook {webhook_id}: {str(e)}")
+            raise
+    
+    # LEAD FEED OPERATIONS
+    async def put_feed_event(self, event: Dict[str, Any], ttl_seconds: int) -> None:
+        """Append a lead event to its tenant's feed partition, which every worker polls"""
+        now = time.time()
+        self.meta_table.put_item(Item={
+            'pk': f"feed#{event['business_id']}",
+            'sk': f"{int(now * 1000):013d}#{event['event_id']}",
+            # Stored as JSON: events may hold floats, which DynamoDB rejects
+            'event': json.dumps(event, default=str),
+            'expires_at': int(now) + ttl_seconds
+        })
+    
+    def list_feed_events(self, business_id: str, since: float) -> List[Dict[str, Any]]:
+        """Events in a tenant's feed partition published at or after an epoch time, oldest first (blocking)"""
+        events = []
+        kwargs = {
+            'KeyConditionExpression': (
+                Key('pk').eq(f"feed#{business_id}") & Key('sk').gte(f"{int(since * 1000):013d}")
+            )
+        }
+        while True:
+            response = self.meta_table.query(**kwargs)
+            events.extend(json.loads(item['event']) for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return events
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    # LEAD SCORE OPERATIONS
+    @staticmethod
+    def _ranking_sk(score: Decimal, lead_id: str) -> str:
+        """Ranking sort key; zero-padded so string order matches score order"""
+        return f"{score:07.3f}#{lead_id}"
+    
+    def _delete_partition(self, pk: str) -> None:
+        """Delete every item in a meta table partition"""
+        kwargs = {'KeyConditionExpression': Key('pk').eq(pk), 'ProjectionExpression': 'sk'}
+        with self.meta_table.batch_writer() as batch:
+            while True:
+                response = self.meta_table.query(**kwargs)
+                for item in response.get('Items', []):
+                    batch.delete_item(Key={'pk': pk, 'sk': item['sk']})
+                if 'LastEvaluatedKey' not in response:
+                    return
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    async def pop_score_dirty(self, business_id: str, limit: int) -> List[str]:
+        """Take up to limit leads off the re-scoring queue"""
+        pk = f"scoredirty#{business_id}"
+        lead_ids: List[str] = []
+        kwargs = {'KeyConditionExpression': Key('pk').eq(pk), 'Limit': limit}
+        while len(lead_ids) < limit:
+            response = self.meta_table.query(**kwargs)
+            lead_ids.extend(item['sk'] for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            kwargs['Limit'] = limit - len(lead_ids)
+        # Delete before scoring so writes that land meanwhile queue the lead again
+        with self.meta_table.batch_writer() as batch:
+            for lead_id in lead_ids:
+                batch.delete_item(Key={'pk': pk, 'sk': lead_id})
+        return lead_ids
+    
+    async def clear_score_dirty(self, business_id: str) -> None:
+        """Empty the re-scoring queue (before a full run)"""
+        self._delete_partition(f"scoredirty#{business_id}")
+    
+    def _score_states(self, business_id: str, lead_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        pk = f"scorestate#{business_id}"
+        states = self._batch_get(
+            self.meta_table, [{'pk': pk, 'sk': lead_id} for lead_id in dict.fromkeys(lead_ids)]
+        )
+        return {state['sk']: state for state in states}
+    
+    def _set_lead_score(self, business_id: str, lead_id: str, score: Decimal) -> None:
+        """Set a lead's score attribute unless the lead has been deleted meanwhile (blocking)"""
+        try:
+            self.leads_table.update_item(
+                Key={'id': lead_id, 'business_id': business_id},
+                UpdateExpression='SET score = :score',
+                ConditionExpression='attribute_exists(id)',
+                ExpressionAttributeValues={':score': score}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+    
+    async def write_lead_scores(
+        self,
+        business_id: str,
+        scores: List[tuple]
+    ) -> None:
+        """
+        Store (lead_id, score) results with batched writes, replacing each
+        lead's previous ranking entry, and set the score on the lead items.
+        """
+        try:
+            states = self._score_states(business_id, [lead_id for lead_id, _ in scores])
+            scored_at = datetime.utcnow().isoformat()
+            with self.meta_table.batch_writer(overwrite_by_pkeys=['pk', 'sk']) as batch:
+                for lead_id, score in scores:
+                    ranking_sk = self._ranking_sk(score, lead_id)
+                    old_sk = states.get(lead_id, {}).get('ranking_sk')
+                    if old_sk and old_sk != ranking_sk:
+                        batch.delete_item(Key={'pk': f"score#{business_id}", 'sk': old_sk})
+                    batch.put_item(Item={
+                        'pk': f"score#{business_id}",
+                        'sk': ranking_sk,
+                        'lead_id': lead_id,
+                        'score': score
+                    })
+                    batch.put_item(Item={
+                        'pk': f"scorestate#{business_id}",
+                        'sk': lead_id,
+                        'ranking_sk': ranking_sk,
+                        'score': score,
+                        'scored_at': scored_at
+                    })
+            await asyncio.gather(*(
+                asyncio.to_thread(self._set_lead_score, business_id, lead_id, score)
+                for lead_id, score in scores
+            ))
+        except Exception as e:
+            logger.error(f"Error writing lead scores for business {business_id}: {str(e)}")
+            raise
+    
+    async def remove_lead_scores(self, business_id: str, lead_ids: List[str]) -> None:
+        """Drop ranking entries for leads that no longer exist"""
+        states = self._score_states(business_id, lead_ids)
+        with self.meta_table.batch_writer() as batch:
+            for lead_id, state in states.items():
+                batch.delete_item(Key={'pk': f"score#{business_id}", 'sk': state['ranking_sk']})
+                batch.delete_item(Key={'pk': f"scorestate#{business_id}", 'sk': lead_id})
+    
+    async def list_scored_lead_ids(self, business_id: str) -> List[str]:
+        """Every lead that has a ranking entry"""
+        lead_ids: List[str] = []
+        kwargs = {
+            'KeyConditionExpression': Key('pk').eq(f"scorestate#{business_id}"),
+            'ProjectionExpression': 'sk'
+        }
+        while True:
+            response = self.meta_table.query(**kwargs)
+            lead_ids.extend(item['sk'] for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return lead_ids
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    async def iter_top_scored(self, business_id: str, page_size: int = 100):
+        """Yield pages of (lead_id, score) pairs, highest score first"""
+        kwargs = {
+            'KeyConditionExpression': Key('pk').eq(f"score#{business_id}"),
+            'ScanIndexForward': False,
+            'Limit': page_size
+        }
+        while True:
+            try:
+                response = self.meta_table.query(**kwargs)
+            except Exception as e:
+                logger.error(f"Error listing scored leads for business {business_id}: {str(e)}")
+                raise
+            yield [(item['lead_id'], item['score']) for item in response.get('Items', [])]
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    # LEAD STATS OPERATIONS
+    async def get_lead_stats(
+        self,
+        business_id: str,
+        start_day: str,
+        end_day: str
+    ) -> List[Dict[str, Any]]:
+        """Get status buckets plus the day buckets between start_day and end_day"""
+        try:
+            pk = Key('pk').eq(f"stats#{business_id}")
+            items = []
+            for condition in (
+                pk & Key('sk').begins_with('status#'),
+                pk & Key('sk').between(f"day#{start_day}", f"day#{end_day}")
+            ):
+                kwargs = {'KeyConditionExpression': condition}
+                while True:
+                    response = self.meta_table.query(**kwargs)
+                    items.extend(response.get('Items', []))
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            return items
+        except Exception as e:
+            logger.error(f"Error getting lead stats for business {business_id}: {str(e)}")
+            raise
+    
+    async def list_stats_business_ids(self) -> List[str]:
+        """Businesses that have stats buckets (a full scan of the meta table, for rebuilds)"""
+        try:
+            business_ids = set()
+            kwargs = {
+                'FilterExpression': Attr('pk').begins_with('stats#'),
+                'ProjectionExpression': 'pk'
+            }
+            while True:
+                response = await asyncio.to_thread(self.meta_table.scan, **kwargs)
+                business_ids.update(item['pk'][len('stats#'):] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return sorted(business_ids)
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            logger.error(f"Error listing businesses with lead stats: {str(e)}")
+            raise
+    
+    async def add_archived_lead_stats(self, business_id: str, counts: Dict[str, int]) -> None:
+        """ADD the counters of archived leads to the business's archived totals"""
+        try:
+            for bucket, count in counts.items():
+                self.meta_table.update_item(
+                    Key={'pk': f"archived_stats#{business_id}", 'sk': bucket},
+                    UpdateExpression='ADD #count :count',
+                    ExpressionAttributeNames={'#count': 'count'},
+                    ExpressionAttributeValues={':count': count}
+                )
+        except Exception as e:
+            logger.error(f"Error recording archived lead stats for business {business_id}: {str(e)}")
+            raise
+    
+    async def list_archived_lead_stats(self) -> Dict[str, Dict[str, int]]:
+        """Archived totals of every business (a full scan of the meta table, for rebuilds)"""
+        try:
+            totals: Dict[str, Dict[str, int]] = {}
+            kwargs = {'FilterExpression': Attr('pk').begins_with('archived_stats#')}
+            while True:
+                response = await asyncio.to_thread(self.meta_table.scan, **kwargs)
+                for item in response.get('Items', []):
+                    business_id = item['pk'][len('archived_stats#'):]
+                    totals.setdefault(business_id, {})[item['sk']] = int(item.get('count', 0))
+                if 'LastEvaluatedKey' not in response:
+                    return totals
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            logger.error(f"Error listing archived lead stats: {str(e)}")
+            raise
+    
+    async def replace_lead_stats(self, business_id: str, counts: Dict[str, int]) -> None:
+        """Overwrite all stats buckets for a business with recomputed counts"""
+        try:
+            pk = f"stats#{business_id}"
+            existing = set()
+            kwargs = {
+                'KeyConditionExpression': Key('pk').eq(pk),
+                'ProjectionExpression': 'sk'
+            }
+            while True:
+                response = self.meta_table.query(**kwargs)
+                existing.update(item['sk'] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+            with self.meta_table.batch_writer() as batch:
+                for bucket, count in counts.items():
+                    batch.put_item(Item={'pk': pk, 'sk': bucket, 'count': count})
+                for bucket in existing - counts.keys():
+                    batch.delete_item(Key={'pk': pk, 'sk': bucket})
+            logger.info(f"Rebuilt {len(counts)} stats buckets for business {business_id}")
+        except Exception as e:
+            logger.error(f"Error replacing lead stats for business {business_id}: {str(e)}")
+            raise
+    
+    # TOKEN REVOCATION
+    async def revoke_token(self, jti: str, expires_at: int) -> None:
+        """Record a revoked token id until the token would have expired"""
+        self.meta_table.put_item(Item={
+            'pk': 'revoked_tokens',
+            'sk': jti,
+            'expires_at': expires_at
+        })
+    
+    def list_revoked_tokens(self) -> Dict[str, float]:
+        """Unexpired revoked token ids and their expiry times"""
+        now = int(time.time())
+        revoked = {}
+        kwargs = {
+            'KeyConditionExpression': Key('pk').eq('revoked_tokens'),
+            # TTL deletion lags, so skip entries that have already expired
+            'FilterExpression': Attr('expires_at').gt(now)
+        }
+        while True:
+            response = self.meta_table.query(**kwargs)
+            for item in response.get('Items', []):
+                revoked[item['sk']] = float(item['expires_at'])
+            if 'LastEvaluatedKey' not in response:
+                return revoked
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    # REFRESH TOKEN OPERATIONS
+    async def create_refresh_family(self, family: Dict[str, Any]) -> None:
+        """Store a new refresh token family (one per login)"""
+        self.meta_table.put_item(
+            Item={'pk': f"refresh#{family['family_id']}", 'sk': 'family', **family},
+            ConditionExpression='attribute_not_exists(pk)'
+        )
+    
+    async def get_refresh_family(self, family_id: str) -> Optional[Dict[str, Any]]:
+        response = self.meta_table.get_item(
+            Key={'pk': f"refresh#{family_id}", 'sk': 'family'},
+            ConsistentRead=True
+        )
+        return response.get('Item')
+    
+    async def rotate_refresh_family(
+        self,
+        family_id: str,
+        current_hash: str,
+        updates: Dict[str, Any]
+    ) -> bool:
+        """
+        Replace a family's current token, only if current_hash is still current
+        and the family is not revoked; False if another request got there first.
+        """
+        names = {f"#{key}": key for key in updates}
+        values = {f":{key}": value for key, value in updates.items()}
+        try:
+            self.meta_table.update_item(
+                Key={'pk': f"refresh#{family_id}", 'sk': 'family'},
+                UpdateExpression='SET ' + ', '.join(f"#{key} = :{key}" for key in updates),
+                ConditionExpression='token_hash = :current_hash AND revoked = :false',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues={**values, ':current_hash': current_hash, ':false': False}
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+    
+    async def revoke_refresh_family(self, family_id: str) -> None:
+        """Revoke every refresh token of a family (kept until it expires, to catch reuse)"""
+        try:
+            self.meta_table.update_item(
+                Key={'pk': f"refresh#{family_id}", 'sk': 'family'},
+                UpdateExpression='SET revoked = :true',
+                ConditionExpression='attribute_exists(pk)',
+                ExpressionAttributeValues={':true': True}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
     
     # USER OPERATIONS
+    @staticmethod
+    def _email_key(email: str) -> str:
+        """Key of the item that reserves an email address in the users table"""
+        return f"email#{email.strip().lower()}"
+    
+    @staticmethod
+    def _email_item(user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Uniqueness item for a user's email. It also carries the fields login
+        needs, so a user can be fetched by email with a single get_item. The
+        address is stored as user_email rather than email, which keeps the item
+        out of email-index.
+        """
+        item = {k: v for k, v in user_data.items() if k not in ('id', 'email')}
+        item['id'] = DynamoDBClient._email_key(user_data['email'])
+        item['user_id'] = user_data['id']
+        item['user_email'] = user_data['email']
+        return item
+    
     async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new user"""
+        """
+        Create a new user together with its email uniqueness item in one
+        transaction. Raises ConditionalWriteError if the email is taken.
+        """
         try:
-            self.users_table.put_item(Item=user_data)
+            self._transact_write([
+                {
+                    'Put': {
+                        'TableName': self.users_table.name,
+                        'Item': user_data,
+                        'ConditionExpression': 'attribute_not_exists(id)'
+                    }
+                },
+                {
+                    'Put': {
+                        'TableName': self.users_table.name,
+                        'Item': self._email_item(user_data),
+                        'ConditionExpression': 'attribute_not_exists(id)'
+                    }
+                }
+            ])
             logger.info(f"Created user: {user_data['email']}")
             return user_data
+        except ConditionalWriteError:
+            logger.info(f"Email already registered: {user_data['email']}")
+            raise
         except Exception as e:
             logger.error(f"Error creating user: {str(e)}")
             raise
+        finally:
+            self.reads.forget(self._email_key(user_data['email']))
+    
+    async def reserve_user_email(self, user_data: Dict[str, Any]) -> bool:
+        """Write the email uniqueness item for an existing user; False if already present"""
+        try:
+            self.users_table.put_item(
+                Item=self._email_item(user_data),
+                ConditionExpression='attribute_not_exists(id)'
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            logger.error(f"Error reserving email {user_data['email']}: {str(e)}")
+            raise
+        finally:
+            self.reads.forget(self._email_key(user_data['email']))
+    
+    async def list_business_ids(self) -> List[str]:
+        """List every business_id that has a user"""
+        try:
+            business_ids = set()
+            kwargs = {'ProjectionExpression': 'business_id'}
+            while True:
+                response = self.users_table.scan(**kwargs)
+                business_ids.update(
+                    item['business_id'] for item in response.get('Items', [])
+                    if 'business_id' in item
+                )
+                if 'LastEvaluatedKey' not in response:
+                    return sorted(business_ids)
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            logger.error(f"Error listing business ids: {str(e)}")
+            raise
     
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        """Get user by email"""
+        """
+        Get user by email with a strongly consistent read of its uniqueness item,
+        falling back to email-index for users registered before those existed.
+        """
         try:
-            response = self.users_table.query(
-                IndexName='email-index',
-                KeyConditionExpression=Key('email').eq(email)
+            return await self.reads.do(
+                (self._email_key(email), 'get_user_by_email', email),
+                lambda: asyncio.to_thread(self._read_user_by_email, email)
             )
-            items = response.get('Items', [])
-            return items[0] if items else None
         except Exception as e:
             logger.error(f"Error getting user by email {email}: {str(e)}")
             raise
+    
+    def _read_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        response = self.users_table.get_item(
+            Key={'id': self._email_key(email)},
+            ConsistentRead=True
+        )
+        item = response.get('Item')
+        if item:
+            user_data = {
+                k: v for k, v in item.items() if k not in ('user_id', 'user_email')
+            }
+            user_data['id'] = item['user_id']
+            user_data['email'] = item['user_email']
+            return user_data
+        return self.query_email_index(email)
+    
+    def query_email_index(self, email: str) -> Optional[Dict[str, Any]]:
+        """Look a user up in email-index (users registered before uniqueness items existed)"""
+        response = self.users_table.query(
+            IndexName='email-index',
+            KeyConditionExpression=Key('email').eq(email)
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
 
 # Singleton instance
 _db_instance: Optional[DynamoDBClient] = None
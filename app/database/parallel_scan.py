@@ -0,0 +1,279 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from collections import Counter
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+class TokenBucket:
+    """
+    Capacity-unit budget shared by scan workers (thread-safe).
+
+    Workers wait until the bucket is not overdrawn, scan a page, then pay for
+    what the page actually consumed, so the long-run rate stays at
+    rate_per_second even though page cost is only known afterwards.
+    """
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = rate_per_second
+        self.capacity = burst or rate_per_second
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self) -> None:
+        """Block until the budget is no longer overdrawn"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens > 0:
+                    return
+                delay = max(-self.tokens / self.rate, 0.01)
+            time.sleep(delay)
+
+    def consume(self, units: float) -> None:
+        with self.lock:
+            self._refill()
+            self.tokens -= units
+
+
+class ScanCheckpoint:
+    """
+    Per-segment progress of a scan, saved to a JSON file after every page.
+
+    A segment's last evaluated key is stored in DynamoDB's wire format so any
+    key type round-trips. Without a path the checkpoint is kept in memory only.
+    """
+    def __init__(self, path: Optional[str], table_name: str, total_segments: int):
+        self.path = path
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+            if (self.state['table'], self.state['total_segments']) != (table_name, total_segments):
+                raise ValueError(
+                    f"Checkpoint {path} is for table {self.state['table']} with "
+                    f"{self.state['total_segments']} segments"
+                )
+        else:
+            self.state = {'table': table_name, 'total_segments': total_segments, 'segments': {}}
+
+    def segment(self, segment: int) -> Dict[str, Any]:
+        with self.lock:
+            progress = self.state['segments'].get(str(segment))
+            if not progress:
+                return {'start_key': None, 'done': False, 'items': 0}
+            start_key = progress['last_key']
+            return {
+                'start_key': {k: _deserializer.deserialize(v) for k, v in start_key.items()} if start_key else None,
+                'done': progress['done'],
+                'items': progress['items']
+            }
+
+    def update(self, segment: int, last_key: Optional[Dict[str, Any]], items: int) -> None:
+        with self.lock:
+            self.state['segments'][str(segment)] = {
+                'last_key': {k: _serializer.serialize(v) for k, v in last_key.items()} if last_key else None,
+                'done': last_key is None,
+                'items': items
+            }
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+class NDJSONSink:
+    """Appends items as JSON lines, gzipped if the path ends in .gz"""
+    def __init__(self, path: str):
+        self.path = path
+        self.file = gzip.open(path, "at") if path.endswith(".gz") else open(path, "a")
+
+    def write(self, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            self.file.write(json.dumps(item, default=str, sort_keys=True) + "\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CountSink:
+    """Counts items, optionally grouped by one attribute (e.g. business_id)"""
+    def __init__(self, group_by: Optional[str] = None):
+        self.group_by = group_by
+        self.total = 0
+        self.groups: Counter = Counter()
+
+    def write(self, items: List[Dict[str, Any]]) -> None:
+        self.total += len(items)
+        if self.group_by:
+            self.groups.update(str(item.get(self.group_by)) for item in items)
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncSink:
+    """
+    Hands each page to a coroutine function on the event loop, for scans run
+    from async code with asyncio.to_thread(scan.run). Create it on the loop;
+    workers wait for the handler, so pages are handled one at a time.
+    """
+    def __init__(self, handler: Callable[[List[Dict[str, Any]]], Awaitable[None]]):
+        self.handler = handler
+        self.loop = asyncio.get_running_loop()
+
+    def write(self, items: List[Dict[str, Any]]) -> None:
+        asyncio.run_coroutine_threadsafe(self.handler(items), self.loop).result()
+
+    def close(self) -> None:
+        pass
+
+
+class ScanStats:
+    """Counters for a scan run (updated under the scan's lock)"""
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.scanned = 0
+        self.written = 0
+        self.pages = 0
+        self.capacity_units = 0.0
+        self.segments_done = 0
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            'scanned': self.scanned,
+            'written': self.written,
+            'pages': self.pages,
+            'segments_done': self.segments_done,
+            'capacity_units': round(self.capacity_units, 1),
+            'capacity_units_per_second': round(self.capacity_units / elapsed, 1),
+            'items_per_second': round(self.scanned / elapsed, 1),
+            'elapsed_seconds': round(elapsed, 2)
+        }
+
+
+class ParallelScan:
+    """
+    Parallel Scan of a whole table: TotalSegments segments spread over a pool
+    of worker threads, optionally held to a read-capacity budget.
+
+    Each page is passed through transform (return None to drop an item) and
+    written to the sink before the segment's checkpoint advances, so an
+    interrupted run resumes where it stopped; items from the page in flight
+    may be written twice.
+    """
+    def __init__(
+        self,
+        table,
+        total_segments: int = 8,
+        workers: Optional[int] = None,
+        rcu_per_second: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+        transform: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+        sink=None,
+        page_size: Optional[int] = None
+    ):
+        self.table = table
+        self.total_segments = total_segments
+        self.workers = workers or total_segments
+        self.limiter = TokenBucket(rcu_per_second) if rcu_per_second else None
+        self.checkpoint = ScanCheckpoint(checkpoint_path, table.name, total_segments)
+        self.transform = transform
+        self.sink = sink or CountSink()
+        self.page_size = page_size
+        self.stats = ScanStats()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Ask workers to stop after their current page"""
+        self._stop.set()
+
+    def _scan_segment(self, segment: int) -> None:
+        progress = self.checkpoint.segment(segment)
+        if progress['done']:
+            with self._lock:
+                self.stats.segments_done += 1
+            return
+
+        kwargs = {
+            'Segment': segment,
+            'TotalSegments': self.total_segments,
+            'ReturnConsumedCapacity': 'TOTAL'
+        }
+        if self.page_size:
+            kwargs['Limit'] = self.page_size
+        if progress['start_key']:
+            kwargs['ExclusiveStartKey'] = progress['start_key']
+        items_done = progress['items']
+
+        while not self._stop.is_set():
+            if self.limiter:
+                self.limiter.wait()
+            response = self.table.scan(**kwargs)
+            items = response.get('Items', [])
+            # Eventually consistent reads cost 0.5 RCU per 4KB; fall back to a guess
+            units = response.get('ConsumedCapacity', {}).get('CapacityUnits', 0.5 * max(len(items), 1))
+            if self.limiter:
+                self.limiter.consume(units)
+
+            if self.transform:
+                items_out = [out for out in map(self.transform, items) if out is not None]
+            else:
+                items_out = items
+            last_key = response.get('LastEvaluatedKey')
+            with self._lock:
+                if items_out:
+                    self.sink.write(items_out)
+                self.stats.scanned += len(items)
+                self.stats.written += len(items_out)
+                self.stats.pages += 1
+                self.stats.capacity_units += units
+            items_done += len(items)
+            self.checkpoint.update(segment, last_key, items_done)
+
+            if last_key is None:
+                with self._lock:
+                    self.stats.segments_done += 1
+                logger.info(f"Scan segment {segment}/{self.total_segments} done: {items_done} items")
+                return
+            kwargs['ExclusiveStartKey'] = last_key
+
+    def run(self) -> ScanStats:
+        """Scan every unfinished segment; re-raises the first worker error"""
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._scan_segment, segment) for segment in range(self.total_segments)]
+            for future in futures:
+                try:
+                    future.result()
+                except BaseException as e:
+                    # Let the other workers finish their page and checkpoint
+                    self._stop.set()
+                    errors.append(e)
+        self.sink.close()
+        if errors:
+            raise errors[0]
+        return self.stats
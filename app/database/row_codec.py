@@ -0,0 +1,96 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Type, Union, get_args, get_origin
+import types
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models.lead import Lead
+from app.models.user import User
+
+
+def _decode_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def _encode_datetime(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _decode_int(value):
+    return int(value) if isinstance(value, Decimal) else value
+
+def _decode_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+def _encode_float(value):
+    # boto3 rejects floats; str() keeps the shortest exact representation
+    return Decimal(str(value)) if isinstance(value, float) else value
+
+_CONVERTERS = {
+    datetime: (_decode_datetime, _encode_datetime),
+    int: (_decode_int, None),
+    float: (_decode_float, _encode_float),
+}
+
+def _field_type(annotation):
+    """The type inside Optional[...], or the annotation itself"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+class RowCodec:
+    """
+    Maps DynamoDB items to and from a pydantic model in one pass.
+
+    Items we wrote ourselves were validated on the way in, so decode()
+    builds models with model_construct: no regexes, email or phone
+    validators, only the Decimal and ISO datetime conversions the model's
+    field types need. Extra attributes on the item (shard_key, the user's
+    hashed_password) are dropped. strict=True validates the item with the
+    model instead and raises pydantic's ValidationError, for migrations and
+    scripts that read data of unknown provenance; ROW_CODEC_STRICT=true makes
+    that the default.
+    """
+    def __init__(self, model: Type[BaseModel], exclude: Iterable[str] = ()):
+        self.model = model
+        self.exclude = set(exclude)
+        self.strict = settings.ROW_CODEC_STRICT
+        self._decoders: List[tuple] = []
+        self._encoders: List[tuple] = []
+        for name, field in model.model_fields.items():
+            decode, encode = _CONVERTERS.get(_field_type(field.annotation), (None, None))
+            self._decoders.append((name, decode))
+            if name not in self.exclude:
+                self._encoders.append((name, encode))
+
+    def decode(self, item: Dict[str, Any], strict: Optional[bool] = None, **overrides) -> BaseModel:
+        """Build a model from a stored item; overrides replace item attributes"""
+        if overrides:
+            item = {**item, **overrides}
+        if self.strict if strict is None else strict:
+            return self.model.model_validate(item)
+        values = {}
+        for name, decode in self._decoders:
+            if name in item:
+                value = item[name]
+                values[name] = decode(value) if decode is not None and value is not None else value
+        return self.model.model_construct(**values)
+
+    def decode_many(self, items: Iterable[Dict[str, Any]], strict: Optional[bool] = None) -> List[BaseModel]:
+        return [self.decode(item, strict) for item in items]
+
+    def encode(self, instance: BaseModel) -> Dict[str, Any]:
+        """The item to store for a model, datetimes as ISO strings"""
+        item = {}
+        for name, encode in self._encoders:
+            value = getattr(instance, name)
+            item[name] = encode(value) if encode is not None and value is not None else value
+        return item
+
+# score is only written by the scoring job, never by lead writes
+lead_codec = RowCodec(Lead, exclude={'score'})
+# Users are stored with hashed_password, which the User model leaves out
+user_codec = RowCodec(User)
@@ -0,0 +1,148 @@
+from bisect import bisect_left, insort
+from boto3.dynamodb.conditions import Attr, Key
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class InMemorySearchIndex:
+    """
+    Per-tenant inverted index held in process memory.
+
+    Used for local development and benchmarks. Tokens are kept in a sorted list
+    per tenant so prefix lookups are a bisect plus a linear walk over matches.
+    """
+    def __init__(self):
+        # business_id -> token -> lead_id -> weight
+        self._postings: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+        # business_id -> sorted tokens
+        self._tokens: Dict[str, list] = defaultdict(list)
+        # business_id -> (token, lead_id) -> time the posting was last written
+        self._indexed_at: Dict[str, Dict[tuple, float]] = defaultdict(dict)
+
+    async def add(self, business_id: str, lead_id: str, postings: Dict[str, float]) -> None:
+        """Add or re-weight postings for a lead"""
+        index = self._postings[business_id]
+        indexed_at = time.time()
+        for token, weight in postings.items():
+            if token not in index:
+                index[token] = {}
+                insort(self._tokens[business_id], token)
+            index[token][lead_id] = weight
+            self._indexed_at[business_id][(token, lead_id)] = indexed_at
+
+    async def remove(self, business_id: str, lead_id: str, tokens: Iterable[str]) -> None:
+        """Remove a lead's postings for the given tokens"""
+        index = self._postings[business_id]
+        for token in tokens:
+            self._indexed_at[business_id].pop((token, lead_id), None)
+            leads = index.get(token)
+            if leads is None:
+                continue
+            leads.pop(lead_id, None)
+            if not leads:
+                del index[token]
+                sorted_tokens = self._tokens[business_id]
+                del sorted_tokens[bisect_left(sorted_tokens, token)]
+
+    async def lookup(self, business_id: str, prefix: str) -> Dict[str, Dict[str, float]]:
+        """Return token -> {lead_id: weight} for every token starting with prefix"""
+        index = self._postings.get(business_id, {})
+        sorted_tokens = self._tokens.get(business_id, [])
+        matches = {}
+        for i in range(bisect_left(sorted_tokens, prefix), len(sorted_tokens)):
+            token = sorted_tokens[i]
+            if not token.startswith(prefix):
+                break
+            matches[token] = index[token]
+        return matches
+
+    async def prune(self, business_id: str, before: float) -> int:
+        """Remove a tenant's postings last written before a time; returns how many"""
+        stale = defaultdict(list)
+        for (token, lead_id), indexed_at in self._indexed_at[business_id].items():
+            if indexed_at < before:
+                stale[lead_id].append(token)
+        for lead_id, tokens in stale.items():
+            await self.remove(business_id, lead_id, tokens)
+        return sum(len(tokens) for tokens in stale.values())
+
+
+class DynamoDBSearchIndex:
+    """
+    Per-tenant inverted index stored in the lead meta table.
+
+    Each posting is one item: pk = search#<business_id>, sk = <token>#<lead_id>,
+    stamped with the time it was written. Because postings are sorted by token
+    within the tenant partition, a prefix lookup is a single begins_with query,
+    followed page by page until every matching posting has been read.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def _pk(business_id: str) -> str:
+        return f"search#{business_id}"
+
+    async def add(self, business_id: str, lead_id: str, postings: Dict[str, float]) -> None:
+        """Add or re-weight postings for a lead"""
+        pk = self._pk(business_id)
+        indexed_at = Decimal(str(time.time()))
+        with self.db.meta_table.batch_writer() as batch:
+            for token, weight in postings.items():
+                batch.put_item(Item={
+                    'pk': pk,
+                    'sk': f"{token}#{lead_id}",
+                    'weight': Decimal(str(weight)),
+                    'indexed_at': indexed_at
+                })
+
+    async def remove(self, business_id: str, lead_id: str, tokens: Iterable[str]) -> None:
+        """Remove a lead's postings for the given tokens"""
+        pk = self._pk(business_id)
+        with self.db.meta_table.batch_writer() as batch:
+            for token in tokens:
+                batch.delete_item(Key={'pk': pk, 'sk': f"{token}#{lead_id}"})
+
+    async def lookup(self, business_id: str, prefix: str) -> Dict[str, Dict[str, float]]:
+        """Return token -> {lead_id: weight} for every token starting with prefix"""
+        matches: Dict[str, Dict[str, float]] = defaultdict(dict)
+        kwargs = {
+            'KeyConditionExpression': (
+                Key('pk').eq(self._pk(business_id)) & Key('sk').begins_with(prefix)
+            )
+        }
+        while True:
+            response = self.db.meta_table.query(**kwargs)
+            for item in response.get('Items', []):
+                token, _, lead_id = item['sk'].rpartition('#')
+                matches[token][lead_id] = float(item['weight'])
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return matches
+
+    async def prune(self, business_id: str, before: float) -> int:
+        """Remove a tenant's postings last written before a time; returns how many"""
+        pk = self._pk(business_id)
+        kwargs = {
+            'KeyConditionExpression': Key('pk').eq(pk),
+            'FilterExpression': Attr('indexed_at').not_exists() | Attr('indexed_at').lt(Decimal(str(before))),
+            'ProjectionExpression': 'sk'
+        }
+        removed = 0
+        with self.db.meta_table.batch_writer() as batch:
+            while True:
+                response = self.db.meta_table.query(**kwargs)
+                for item in response.get('Items', []):
+                    batch.delete_item(Key={'pk': pk, 'sk': item['sk']})
+                    removed += 1
+                if 'LastEvaluatedKey' not in response:
+                    break
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        logger.info(f"Pruned {removed} stale postings for business {business_id}")
+        return removed
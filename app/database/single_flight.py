@@ -0,0 +1,62 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers of the same key.
+
+    Keys are tuples whose first element is a scope (a business_id or an
+    email) so writes can forget() every in-flight read of that scope: a
+    caller that reads after its own write then starts a fresh call instead
+    of joining one that began before the write. At most max_keys calls are
+    tracked; past that, calls run uncoalesced. Joined callers receive the
+    same result object, so results must be treated as read-only.
+
+    The call runs as its own task, so a cancelled caller does not cancel it
+    for the others.
+    """
+    def __init__(self, max_keys: int = 1024):
+        self.max_keys = max_keys
+        self._inflight: Dict[Tuple[Hashable, ...], asyncio.Future] = {}
+        self.calls = 0
+        self.collapsed = 0
+        self.bypassed = 0
+
+    async def do(self, key: Tuple[Hashable, ...], call: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            return await asyncio.shield(task)
+        if len(self._inflight) >= self.max_keys:
+            self.bypassed += 1
+            return await call()
+
+        task = asyncio.ensure_future(call())
+        self._inflight[key] = task
+        self.calls += 1
+
+        def done(finished: asyncio.Future) -> None:
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled():
+                # Retrieved here in case every caller was cancelled
+                finished.exception()
+
+        task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    def forget(self, scope: Hashable) -> None:
+        """Stop sharing in-flight calls of a scope with later callers"""
+        for key in [key for key in self._inflight if key[0] == scope]:
+            del self._inflight[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        total = self.calls + self.collapsed + self.bypassed
+        return {
+            'calls': self.calls,
+            'collapsed': self.collapsed,
+            'bypassed': self.bypassed,
+            'inflight': len(self._inflight),
+            'collapsed_ratio': round(self.collapsed / total, 4) if total else 0.0
+        }
@@ -8,7 +8,10 @@ import time
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.routes import leads, auth
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.load_shedding import LoadSheddingMiddleware, load_shedder
+from app.routes import leads, auth, webhooks, admin
+from app.services.profiler import request_profiler, PROFILE_HEADER, PROFILE_ID_HEADER
 from app.utils.exceptions import (
     NotFoundException,
     UnauthorizedException,
@@ -41,6 +44,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Load Shedding (added first so it runs inside CORS and rejections carry CORS headers)
+app.add_middleware(LoadSheddingMiddleware, shedder=load_shedder)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +54,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Session-Token", "Retry-After", PROFILE_ID_HEADER],
+)
+
+# Response Compression
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    encodings=settings.get_compression_encodings(),
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
 )
 
 
@@ -82,6 +99,28 @@ async def log_requests(request: Request, call_next):
         raise
 
 
+# Request Profiling Middleware
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile requests chosen by the request profiler (signed header, admin toggle or sample)"""
+    reason = request_profiler.should_profile(
+        request.method, request.url.path, request.headers.get(PROFILE_HEADER)
+    )
+    if reason is None:
+        return await call_next(request)
+    
+    started = request_profiler.start(request.method, request.url.path, reason)
+    status_code = None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        profile = await request_profiler.finish(started, status_code)
+    if profile is not None:
+        response.headers[PROFILE_ID_HEADER] = profile.profile_id
+    return response
+
+
 # Exception Handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -172,6 +211,8 @@ async def root():
 # Include routers
 app.include_router(auth.router)
 app.include_router(leads.router)
+app.include_router(webhooks.router)
+app.include_router(admin.router)
 
 
 # Lambda Handler (for AWS Lambda deployment)
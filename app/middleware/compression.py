@@ -0,0 +1,219 @@
+from typing import Iterable, List, Optional
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    # brotli not installed: "br" is not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard not installed: "zstd" is not offered
+    zstandard = None
+
+# Content types that are already compressed or must not be buffered
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/gzip",
+    "application/zip",
+    "application/zstd",
+)
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + self._compressor.flush() if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else output
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings(preferred: Iterable[str]) -> List[str]:
+    """The preferred encodings whose libraries are installed, in order"""
+    installed = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    return [encoding for encoding in preferred if installed.get(encoding)]
+
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    The encoding to use for an Accept-Encoding header: the highest q-value
+    the client gives, ties going to the earlier entry in encodings.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with gzip, brotli or zstd, as negotiated from
+    Accept-Encoding.
+
+    Bodies smaller than minimum_size are sent as they are. A streaming
+    response is buffered until it reaches minimum_size (or ends), then
+    compressed chunk by chunk, each chunk flushed so clients can decode
+    what has arrived. Responses that already have a Content-Encoding, and
+    excluded content types (server-sent events, media, archives), pass
+    through untouched.
+
+    Compressed bodies are binary; under Mangum they go back to API Gateway
+    base64 encoded, which needs binary media types enabled on the REST API.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Iterable[str] = ("zstd", "br", "gzip"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+
+    def encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        if encoding == "zstd":
+            return _ZstdEncoder(self.zstd_level)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Per-response state: holds the start message until the body decides"""
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.encoder = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or content_type.startswith(EXCLUDED_CONTENT_TYPES):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+        if self.passthrough or message_type != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is not None:
+            await self._send_compressed(body, more_body)
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if self.buffered < self.middleware.minimum_size:
+            if more_body:
+                return
+            # Too small to be worth compressing
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": b"".join(self.buffer)})
+            return
+
+        self.encoder = self.middleware.encoder(self.encoding)
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        body = b"".join(self.buffer)
+        self.buffer = []
+        if more_body:
+            # Length unknown until the stream ends
+            del headers["Content-Length"]
+            await self._send(self.start)
+            await self._send_compressed(body, True)
+        else:
+            compressed = self.encoder.compress(body, flush=False) + self.encoder.finish()
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _send_compressed(self, body: bytes, more_body: bool) -> None:
+        if more_body:
+            compressed = self.encoder.compress(body, flush=True)
+            if compressed:
+                await self._send({"type": "http.response.body", "body": compressed, "more_body": True})
+        else:
+            compressed = self.encoder.compress(body, flush=False) + self.encoder.finish()
+            await self._send({"type": "http.response.body", "body": compressed})
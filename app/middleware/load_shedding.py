@@ -0,0 +1,218 @@
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, Optional
+import math
+import time
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+# Priority classes, most important first. Each may use this share of the
+# concurrency limit; critical requests are never shed.
+PRIORITY_SHARES = {
+    "critical": None,
+    "interactive": 1.0,
+    "normal": 0.9,
+    "bulk": 0.5,
+}
+# Classes whose latency feeds the limit. Bulk requests (archive streams,
+# exports) run long by design and would shrink it for everyone else.
+SAMPLED_PRIORITIES = ("critical", "interactive", "normal")
+
+
+class GradientLimit:
+    """
+    Concurrency limit adapted from request latency (the gradient algorithm).
+
+    The lowest latency seen recently stands in for latency without queueing
+    and a short moving average for the current latency. While the average
+    stays within tolerance of that baseline the limit grows by about
+    sqrt(limit) per sample; as queueing inflates it the limit shrinks in
+    proportion, by up to half per sample. The baseline is re-measured every
+    baseline_seconds so it follows real changes in backend latency.
+    """
+    def __init__(
+        self,
+        initial_limit: float = 50,
+        min_limit: float = 5,
+        max_limit: float = 500,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        short_window: int = 10,
+        baseline_seconds: float = 30.0
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.baseline_seconds = baseline_seconds
+        self._short_alpha = 2 / (short_window + 1)
+        self.short_rtt: Optional[float] = None
+        self.min_rtt: Optional[float] = None
+        self._window_min = math.inf
+        self._window_started = time.monotonic()
+
+    def _update_baseline(self, rtt: float) -> None:
+        self._window_min = min(self._window_min, rtt)
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        now = time.monotonic()
+        if now - self._window_started >= self.baseline_seconds:
+            self.min_rtt = self._window_min
+            self._window_min = math.inf
+            self._window_started = now
+
+    def on_sample(self, rtt: float, inflight: int) -> None:
+        self._update_baseline(rtt)
+        if self.short_rtt is None:
+            self.short_rtt = rtt
+            return
+        self.short_rtt += self._short_alpha * (rtt - self.short_rtt)
+
+        # Only a limit that is actually being used tells us anything
+        if inflight < self.limit / 2:
+            return
+        gradient = max(0.5, min(1.0, self.tolerance * self.min_rtt / self.short_rtt))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        new_limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, new_limit))
+
+
+class LoadShedder:
+    """
+    Admission control shared by the middleware and the admin metrics.
+
+    Requests are classified by path and method. A request is admitted while
+    the requests in flight are below its class's share of the adaptive
+    limit; otherwise it is rejected at once. Bulk requests count towards
+    the requests in flight but their latency does not adjust the limit.
+    Exempt paths (long-lived streams) are neither limited nor counted.
+    State is per worker process.
+
+    Interactive means a GET or HEAD under interactive_paths carrying an
+    Authorization header. The header is only checked for presence, not
+    verified (that happens later, in the route), so any client can claim
+    the interactive share; it is kept to lead reads to bound what that buys.
+    """
+    def __init__(
+        self,
+        limit: Optional[GradientLimit] = None,
+        bulk_paths: Iterable[str] = (),
+        exempt_paths: Iterable[str] = (),
+        critical_paths: Iterable[str] = ("/health",),
+        interactive_paths: Iterable[str] = ("/leads",),
+        retry_after_seconds: int = 1,
+        enabled: bool = True
+    ):
+        self.limit = limit or GradientLimit()
+        self.bulk_paths = tuple(bulk_paths)
+        self.exempt_paths = tuple(exempt_paths)
+        self.critical_paths = tuple(critical_paths)
+        self.interactive_paths = tuple(interactive_paths)
+        self.retry_after_seconds = retry_after_seconds
+        self.enabled = enabled
+        self.inflight = 0
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.latencies: deque = deque(maxlen=1000)
+
+    def classify(self, method: str, path: str, authenticated: bool) -> Optional[str]:
+        """The request's priority class, or None if it is exempt"""
+        if path.startswith(self.exempt_paths):
+            return None
+        if path.startswith(self.critical_paths):
+            return "critical"
+        if path.startswith(self.bulk_paths):
+            return "bulk"
+        if authenticated and method in ("GET", "HEAD") and path.startswith(self.interactive_paths):
+            return "interactive"
+        return "normal"
+
+    def try_acquire(self, priority: str) -> bool:
+        share = PRIORITY_SHARES[priority]
+        if share is not None and self.inflight >= max(1, int(self.limit.limit * share)):
+            self.rejected[priority] += 1
+            return False
+        self.inflight += 1
+        self.admitted[priority] += 1
+        return True
+
+    def release(self, latency: Optional[float], priority: str) -> None:
+        """Finish an admitted request; latency is None if it failed"""
+        if latency is not None and priority in SAMPLED_PRIORITIES:
+            self.limit.on_sample(latency, self.inflight)
+            self.latencies.append(latency)
+        self.inflight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+
+        return {
+            'enabled': self.enabled,
+            'limit': round(self.limit.limit, 1),
+            'inflight': self.inflight,
+            'short_rtt_ms': round(self.limit.short_rtt * 1000, 3) if self.limit.short_rtt else None,
+            'min_rtt_ms': round(self.limit.min_rtt * 1000, 3) if self.limit.min_rtt else None,
+            'p50_ms': percentile(0.5),
+            'p99_ms': percentile(0.99),
+            'admitted': dict(self.admitted),
+            'rejected': dict(self.rejected)
+        }
+
+
+class LoadSheddingMiddleware:
+    """Rejects requests over the load shedder's limit with 503 and Retry-After"""
+    def __init__(self, app: ASGIApp, shedder: LoadShedder):
+        self.app = app
+        self.shedder = shedder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.shedder.enabled:
+            await self.app(scope, receive, send)
+            return
+        authenticated = "authorization" in Headers(scope=scope)
+        priority = self.shedder.classify(scope["method"], scope["path"], authenticated)
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.shedder.try_acquire(priority):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is overloaded, please retry"},
+                headers={"Retry-After": str(self.shedder.retry_after_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.perf_counter() - start
+        finally:
+            self.shedder.release(latency, priority)
+
+
+def _paths(value: str) -> tuple:
+    return tuple(path.strip() for path in value.split(",") if path.strip())
+
+load_shedder = LoadShedder(
+    GradientLimit(
+        initial_limit=settings.LOAD_SHED_INITIAL_LIMIT,
+        min_limit=settings.LOAD_SHED_MIN_LIMIT,
+        max_limit=settings.LOAD_SHED_MAX_LIMIT
+    ),
+    bulk_paths=_paths(settings.LOAD_SHED_BULK_PATHS),
+    exempt_paths=_paths(settings.LOAD_SHED_EXEMPT_PATHS),
+    retry_after_seconds=settings.LOAD_SHED_RETRY_AFTER_SECONDS,
+    enabled=settings.LOAD_SHED_ENABLED
+)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
 from datetime import datetime
 from uuid import uuid4
 
@@ -31,6 +31,9 @@ class Lead(LeadBase):
     status: Literal["new", "contacted", "qualified", "converted", "lost"] = "new"
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    duplicate_of: Optional[str] = None
+    # Written by the scoring job; None until the lead is first scored
+    score: Optional[float] = None
     
     model_config = {
         "json_encoders": {
@@ -43,4 +46,9 @@ class LeadUpdate(BaseModel):
     message: Optional[str] = None
 
 class LeadResponse(Lead):
-    pass
\ No newline at end of file
+    pass
+
+class LeadStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_day: Dict[str, int]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+class ProfilingToggle(BaseModel):
+    enabled: bool
+    # Only requests whose path starts with this are profiled
+    path_prefix: str = "/"
+    duration_seconds: int = Field(300, ge=1, le=3600)
@@ -16,6 +16,12 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # Seconds until the access token expires
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
     
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, AnyHttpUrl, Field
+from typing import List, Literal
+from datetime import datetime
+from uuid import uuid4
+
+EventType = Literal["lead.created", "lead.updated", "lead.status_changed", "lead.deleted"]
+
+class WebhookCreate(BaseModel):
+    url: AnyHttpUrl
+    events: List[EventType] = Field(
+        default_factory=lambda: ["lead.created", "lead.status_changed"],
+        min_length=1
+    )
+
+class Webhook(BaseModel):
+    id: str = Field(default_factory=lambda: f"wh_{uuid4().hex[:12]}")
+    business_id: str
+    url: str
+    events: List[EventType]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class WebhookWithSecret(Webhook):
+    # Only returned when the webhook is created
+    secret: str
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.database.dynamodb import db
+from app.middleware.load_shedding import load_shedder
+from app.models.profile import ProfilingToggle
+from app.models.user import User
+from app.services.profiler import request_profiler
+from app.routes.auth import get_current_user
+from app.utils.exceptions import ForbiddenException, NotFoundException
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency allowing only users listed in ADMIN_EMAILS"""
+    if current_user.email.lower() not in settings.get_admin_emails():
+        raise ForbiddenException("Admin access required")
+    return current_user
+
+@router.get("/profiles")
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of results"),
+    admin: User = Depends(get_admin_user)
+):
+    """List stored request profiles, newest first"""
+    return request_profiler.list_profiles(limit)
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, admin: User = Depends(get_admin_user)):
+    """Get a request profile's time breakdown"""
+    profile = request_profiler.get_profile(profile_id)
+    if profile is None:
+        raise NotFoundException("Profile not found")
+    return profile
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_stacks(profile_id: str, admin: User = Depends(get_admin_user)):
+    """Get a request profile's samples as collapsed stacks (for flamegraph.pl or speedscope)"""
+    stacks = request_profiler.get_collapsed_stacks(profile_id)
+    if stacks is None:
+        raise NotFoundException("Profile not found")
+    return PlainTextResponse(stacks)
+
+@router.get("/profiling")
+async def get_profiling(admin: User = Depends(get_admin_user)):
+    """Get this worker's profiling toggle"""
+    return request_profiler.toggle_state()
+
+@router.post("/profiling")
+async def set_profiling(toggle: ProfilingToggle, admin: User = Depends(get_admin_user)):
+    """Profile every matching request on this worker for a while, or stop"""
+    if toggle.enabled:
+        request_profiler.enable(toggle.path_prefix, toggle.duration_seconds)
+    else:
+        request_profiler.disable()
+    return request_profiler.toggle_state()
+
+@router.get("/load")
+async def get_load(admin: User = Depends(get_admin_user)):
+    """Get this worker's concurrency limit, latency and shed request counts"""
+    return load_shedder.metrics()
+
+@router.get("/reads")
+async def get_read_coalescing(admin: User = Depends(get_admin_user)):
+    """Get how many of this worker's lead and user reads shared an in-flight call"""
+    return db.reads.metrics()
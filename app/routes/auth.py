@@ -1,9 +1,8 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from datetime import timedelta
 
-from app.models.user import User, UserCreate, Token
-from app.services.auth_service import auth_service, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.models.user import User, UserCreate, Token, RefreshRequest
+from app.services.auth_service import auth_service
 from app.utils.exceptions import UnauthorizedException
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -27,13 +26,18 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     if not user:
         raise UnauthorizedException("Incorrect email or password")
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth_service.create_access_token(
-        data={"sub": user.email, "business_id": user.business_id},
-        expires_delta=access_token_expires
-    )
-    
-    return Token(access_token=access_token, token_type="bearer")
+    return await auth_service.issue_tokens(user)
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest):
+    """Exchange a refresh token for new tokens (the refresh token is rotated)"""
+    return await auth_service.refresh(request.refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the access token and its refresh tokens"""
+    await auth_service.logout(token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/me", response_model=User)
 async def get_me(current_user: User = Depends(get_current_user)):
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import date
 
-from app.models.lead import Lead, LeadCreate, LeadUpdate, LeadResponse
+from app.config import settings
+from app.models.lead import Lead, LeadCreate, LeadUpdate, LeadResponse, LeadStats
 from app.models.user import User
-from app.services.lead_service import lead_service
+from app.services.lead_service import lead_service, encode_session_token
+from app.services.stats_service import lead_stats_service
+from app.services.search_service import search_service
+from app.services.lead_feed import lead_feed, stream_events
+from app.services.scoring_service import scoring_service
+from app.services.archive_service import archive_service
 from app.routes.auth import get_current_user
 
 router = APIRouter(prefix="/leads", tags=["leads"])
@@ -11,23 +19,107 @@ router = APIRouter(prefix="/leads", tags=["leads"])
 @router.post("/", response_model=LeadResponse, status_code=status.HTTP_201_CREATED)
 async def create_lead(
     lead: LeadCreate,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
-    """Create a new lead"""
+    """
+    Create a new lead. Pass the X-Session-Token response header to GET /leads
+    to see the lead there straight away.
+    """
     # Pass business_id from authenticated user to service
-    return await lead_service.create_lead(lead, current_user.business_id)
+    created = await lead_service.create_lead(lead, current_user.business_id)
+    response.headers["X-Session-Token"] = encode_session_token(created.created_at)
+    return created
 
 @router.get("/", response_model=List[LeadResponse])
 async def list_leads(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    sort: Literal["created_at", "score"] = Query("created_at", description="Sort order (newest or highest score first)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    x_session_token: Optional[str] = Header(None, description="X-Session-Token from POST /leads, for read-your-writes"),
     current_user: User = Depends(get_current_user)
 ):
-    """List all leads for the authenticated business"""
-    return await lead_service.list_leads(
+    """
+    List all leads for the authenticated business. When more leads follow,
+    the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    if sort == "score":
+        # Only leads scored by the last scoring run are included
+        return await scoring_service.top_leads(current_user.business_id, status, limit)
+    leads, next_cursor = await lead_service.list_leads_page(
         business_id=current_user.business_id,
         status=status,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        session_token=x_session_token
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return leads
+
+@router.get("/stats", response_model=LeadStats)
+async def get_lead_stats(
+    start: Optional[date] = Query(None, description="First day to include (defaults to start of month)"),
+    end: Optional[date] = Query(None, description="Last day to include (defaults to today)"),
+    current_user: User = Depends(get_current_user)
+):
+    """Lead counts by status and by creation day"""
+    return await lead_stats_service.get_stats(current_user.business_id, start, end)
+
+@router.get("/search", response_model=List[LeadResponse])
+async def search_leads(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms (prefixes allowed)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    current_user: User = Depends(get_current_user)
+):
+    """Search leads by name, company, email or message, best match first"""
+    return await search_service.search(current_user.business_id, q, limit)
+
+@router.get("/stream")
+async def stream_leads(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Live feed of lead events for the authenticated business (Server-Sent Events).
+    Reconnecting clients send Last-Event-ID to receive what they missed; a
+    "resync" event means the gap could not be filled and the client should
+    reload the list.
+    
+    Not available on Lambda, where responses are buffered until they end:
+    it answers 501 there and clients should poll GET /leads instead.
+    """
+    if settings.is_lambda():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="The live lead feed is not available on this deployment; poll GET /leads"
+        )
+    subscription = lead_feed.subscribe(current_user.business_id, last_event_id)
+    return StreamingResponse(
+        stream_events(request, subscription, lead_feed),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/archive")
+async def list_archived_leads(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    start: Optional[date] = Query(None, description="First creation day to include"),
+    end: Optional[date] = Query(None, description="Last creation day to include"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream archived leads for the authenticated business as NDJSON, oldest first"""
+    return StreamingResponse(
+        archive_service.stream_archive(
+            current_user.business_id,
+            status=status,
+            start=start.isoformat() if start else None,
+            end=end.isoformat() if end else None
+        ),
+        media_type="application/x-ndjson"
     )
 
 @router.get("/{lead_id}", response_model=LeadResponse)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, status, Query, Response
+from typing import List, Optional
+
+from app.models.webhook import Webhook, WebhookCreate, WebhookWithSecret
+from app.models.user import User
+from app.services.webhook_service import webhook_service
+from app.routes.auth import get_current_user
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+@router.post("/", response_model=WebhookWithSecret, status_code=status.HTTP_201_CREATED)
+async def create_webhook(
+    webhook: WebhookCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Register a webhook endpoint for lead events (https, public hosts only)"""
+    return await webhook_service.create_webhook(webhook, current_user.business_id)
+
+@router.get("/", response_model=List[Webhook])
+async def list_webhooks(current_user: User = Depends(get_current_user)):
+    """List webhook endpoints for the authenticated business"""
+    return await webhook_service.list_webhooks(current_user.business_id)
+
+@router.get("/dead-letters")
+async def list_dead_letters(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List events that could not be delivered, oldest first. When more follow,
+    the X-Next-Cursor response header holds the cursor for the next page.
+    """
+    dead_letters, next_cursor = await webhook_service.list_dead_letters(
+        current_user.business_id, limit, cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return dead_letters
+
+@router.delete("/{webhook_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(
+    webhook_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a webhook endpoint"""
+    await webhook_service.delete_webhook(webhook_id, current_user.business_id)
+    return None
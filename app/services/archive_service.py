@@ -0,0 +1,149 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import gzip
+import json
+import logging
+
+from app.config import settings
+from app.database.archive_store import LocalArchiveStore, S3ArchiveStore
+from app.database.dynamodb import db
+from app.services.dedupe_service import contact_keys
+from app.services.search_service import search_service
+from app.services.stats_service import lead_stats_service
+
+logger = logging.getLogger(__name__)
+
+# Statuses a lead must have reached before it is archived
+ARCHIVE_STATUSES = ("lost", "converted")
+
+# Leads per archive file
+FILE_ROWS = 10000
+
+
+def encode_rows(rows: List[Dict[str, Any]]) -> bytes:
+    """Gzipped NDJSON, one stored lead item per line"""
+    return gzip.compress("".join(
+        json.dumps(row, default=str, sort_keys=True) + "\n" for row in rows
+    ).encode())
+
+
+class ArchiveService:
+    """
+    Moves old, closed leads out of the leads table into compressed archive files.
+
+    A tenant's leads are walked oldest first on business_id-created_at-index and
+    the walk stops at the age cutoff, so a run only reads leads old enough to
+    archive. Each file is written before its leads are deleted; if a run dies in
+    between, the next run writes those leads again, so readers may see a lead
+    twice and should key on its id. A lead is only deleted if its status and
+    updated_at are still those that were archived; leads changed meanwhile
+    stay in the table and are taken out of the file again.
+    """
+    def __init__(self, store=None):
+        self.db = db
+        if store is None:
+            if settings.ARCHIVE_BACKEND == "s3":
+                store = S3ArchiveStore(settings.ARCHIVE_BUCKET)
+            else:
+                store = LocalArchiveStore(settings.ARCHIVE_PATH)
+        self.store = store
+
+    @staticmethod
+    def _key(business_id: str, first_row: Dict[str, Any]) -> str:
+        created = first_row['created_at'][:19].replace(":", "")
+        return f"{business_id}/{created}_{first_row['id']}.ndjson.gz"
+
+    async def _cleanup_derived(self, business_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Drop search postings, scores and contact keys of archived leads (best effort)"""
+        try:
+            await self.db.remove_lead_scores(business_id, [row['id'] for row in rows])
+            for row in rows:
+                await search_service.unindex_lead(row)
+                if not row.get('duplicate_of'):
+                    await self.db.release_contact_keys(business_id, contact_keys(row), row['id'])
+        except Exception as e:
+            logger.error(f"Error cleaning up archived leads for business {business_id}: {str(e)}")
+
+    async def _archive_file(self, business_id: str, rows: List[Dict[str, Any]]) -> int:
+        key = self._key(business_id, rows[0])
+        self.store.put(key, encode_rows(rows))
+        deleted = [row for row in rows if await self.db.delete_lead_if_unchanged(row)]
+        if len(deleted) < len(rows):
+            logger.info(f"Kept {len(rows) - len(deleted)} leads of business {business_id} changed while archiving")
+            self.store.put(key, encode_rows(deleted))
+        archived_counts: Counter = Counter()
+        for row in deleted:
+            archived_counts.update(lead_stats_service.deltas_for_create(row))
+        await self.db.add_archived_lead_stats(business_id, dict(archived_counts))
+        await self._cleanup_derived(business_id, deleted)
+        return len(deleted)
+
+    async def archive_business(
+        self,
+        business_id: str,
+        older_than_days: Optional[int] = None,
+        statuses: Sequence[str] = ARCHIVE_STATUSES
+    ) -> Dict[str, int]:
+        """
+        Archive a business's leads created more than older_than_days ago whose
+        status is one of statuses. Lead stats keep counting archived leads:
+        their counters are left as they are, and their totals are recorded so
+        a stats rebuild adds them back.
+        """
+        if older_than_days is None:
+            older_than_days = settings.ARCHIVE_AFTER_DAYS
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+        scanned = 0
+        archived = 0
+        batch: List[Dict[str, Any]] = []
+
+        async for page in self.db.iter_business_leads(business_id, oldest_first=True):
+            reached_cutoff = False
+            for row in page:
+                if row['created_at'] >= cutoff:
+                    reached_cutoff = True
+                    break
+                scanned += 1
+                if row.get('status') in statuses:
+                    batch.append(row)
+                if len(batch) >= FILE_ROWS:
+                    archived += await self._archive_file(business_id, batch)
+                    batch = []
+            if reached_cutoff:
+                break
+        if batch:
+            archived += await self._archive_file(business_id, batch)
+
+        logger.info(f"Archived business {business_id}: {scanned} scanned, {archived} archived")
+        return {'scanned': scanned, 'archived': archived}
+
+    def stream_archive(
+        self,
+        business_id: str,
+        status: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Yield archived leads as NDJSON lines, decompressing one file at a time.
+        start/end bound created_at (ISO date strings, end inclusive). Lines are
+        passed through as stored and only parsed when a filter needs it.
+        """
+        filtered = status or start or end
+        for key in self.store.list_keys(f"{business_id}/"):
+            raw = self.store.open(key)
+            try:
+                for line in gzip.GzipFile(fileobj=raw):
+                    if filtered:
+                        row = json.loads(line)
+                        if status and row.get('status') != status:
+                            continue
+                        created_day = row['created_at'][:10]
+                        if (start and created_day < start) or (end and created_day > end):
+                            continue
+                    yield line
+            finally:
+                raw.close()
+
+archive_service = ArchiveService()
@@ -1,22 +1,32 @@
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError
 from datetime import datetime, timedelta
-from typing import Optional
-import os
+from typing import Optional, Tuple
 from uuid import uuid4
+import asyncio
 import hashlib
+import hmac
+import secrets
+import time
 
+from app.config import settings
 from app.models.user import User, UserCreate, Token, TokenData
-from app.database.dynamodb import db
+from app.database.dynamodb import db, ConditionalWriteError
+from app.database.row_codec import user_codec
+from app.services.token_service import token_verifier
 from app.utils.exceptions import UnauthorizedException, ConflictException
+from app.utils.profiling import span
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# JWT Configuration
-SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+# JWT Configuration (signing keys are managed by token_service)
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+# Hashes of superseded refresh tokens kept per family, to recognise replays
+REFRESH_HASH_HISTORY = 10
+# The token superseded this recently is a concurrent refresh (another tab), not a replay
+REFRESH_REUSE_GRACE_SECONDS = 10
 
 class AuthService:
     def __init__(self):
@@ -41,13 +51,15 @@ class AuthService:
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
         prepared_password = AuthService._prepare_password(plain_password)
-        return pwd_context.verify(prepared_password, hashed_password)
+        with span("bcrypt"):
+            return pwd_context.verify(prepared_password, hashed_password)
     
     @staticmethod
     def get_password_hash(password: str) -> str:
         """Hash a password"""
         prepared_password = AuthService._prepare_password(password)
-        return pwd_context.hash(prepared_password)
+        with span("bcrypt"):
+            return pwd_context.hash(prepared_password)
     
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -59,16 +71,124 @@ class AuthService:
         else:
             expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         
+        # jti identifies the token for revocation
+        to_encode.setdefault("jti", uuid4().hex)
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        return encoded_jwt
+        return token_verifier.issue(to_encode)
+    
+    @staticmethod
+    def _new_refresh_token(family_id: str) -> Tuple[str, str]:
+        """A refresh token for a family and the hash that is stored for it"""
+        secret = secrets.token_urlsafe(32)
+        return f"{family_id}.{secret}", hashlib.sha256(secret.encode()).hexdigest()
+    
+    def _access_token(self, email: str, business_id: str, family_id: str) -> Tuple[str, dict]:
+        """Mint an access token; also returns the claims needed to revoke it"""
+        jti = uuid4().hex
+        expires_at = int(time.time()) + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        access_token = self.create_access_token(
+            data={"sub": email, "business_id": business_id, "fam": family_id, "jti": jti},
+            expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+        return access_token, {'access_jti': jti, 'access_exp': expires_at}
+    
+    async def issue_tokens(self, user: User) -> Token:
+        """Start a refresh token family for a login and return its first tokens"""
+        family_id = uuid4().hex
+        refresh_token, token_hash = self._new_refresh_token(family_id)
+        access_token, access = self._access_token(user.email, user.business_id, family_id)
+        await self.db.create_refresh_family({
+            'family_id': family_id,
+            'token_hash': token_hash,
+            'user_email': user.email,
+            'business_id': user.business_id,
+            'generation': 0,
+            'revoked': False,
+            'created_at': datetime.utcnow().isoformat(),
+            'expires_at': int(time.time()) + REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+            **access
+        })
+        return Token(
+            access_token=access_token,
+            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=refresh_token
+        )
+    
+    async def _revoke_family(self, family_id: str) -> None:
+        """Revoke a refresh token family and the last access token it issued"""
+        await self.db.revoke_refresh_family(family_id)
+        family = await self.db.get_refresh_family(family_id)
+        if family and family.get('access_jti'):
+            await token_verifier.revocations.revoke(family['access_jti'], float(family['access_exp']))
+    
+    async def refresh(self, refresh_token: str) -> Token:
+        """
+        Exchange a refresh token for a new access token and refresh token.
+        Presenting a token that was already exchanged means a copy is in the
+        wrong hands, so the whole family is revoked. The family id is not
+        secret, so any other mismatch is just rejected, and so is the token
+        superseded within the last REFRESH_REUSE_GRACE_SECONDS (two tabs
+        refreshing at once).
+        """
+        family_id, _, secret = refresh_token.partition(".")
+        family = await self.db.get_refresh_family(family_id) if family_id and secret else None
+        if (
+            family is None
+            or family.get('revoked')
+            or int(family['expires_at']) <= time.time()
+        ):
+            raise UnauthorizedException("Invalid refresh token")
+        
+        presented_hash = hashlib.sha256(secret.encode()).hexdigest()
+        if not hmac.compare_digest(presented_hash, family['token_hash']):
+            previous = family.get('previous_hashes', [])
+            if not any(hmac.compare_digest(presented_hash, old) for old in previous):
+                raise UnauthorizedException("Invalid refresh token")
+            if (
+                hmac.compare_digest(presented_hash, previous[0])
+                and time.time() - int(family.get('rotated_at', 0)) <= REFRESH_REUSE_GRACE_SECONDS
+            ):
+                raise UnauthorizedException("Refresh token was just rotated")
+            await self._revoke_family(family_id)
+            raise UnauthorizedException("Refresh token reuse detected")
+        
+        new_refresh_token, new_hash = self._new_refresh_token(family_id)
+        access_token, access = self._access_token(family['user_email'], family['business_id'], family_id)
+        rotated = await self.db.rotate_refresh_family(family_id, presented_hash, {
+            'token_hash': new_hash,
+            'previous_hashes': [presented_hash, *family.get('previous_hashes', [])][:REFRESH_HASH_HISTORY],
+            'rotated_at': int(time.time()),
+            'generation': int(family['generation']) + 1,
+            'expires_at': int(time.time()) + REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+            **access
+        })
+        if not rotated:
+            # A concurrent refresh with the same token won
+            raise UnauthorizedException("Refresh token was just rotated")
+        
+        return Token(
+            access_token=access_token,
+            expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            refresh_token=new_refresh_token
+        )
+    
+    async def logout(self, token: str) -> None:
+        """Revoke an access token and the refresh token family it came from"""
+        try:
+            claims = token_verifier.verify(token)
+        except JWTError:
+            raise UnauthorizedException("Could not validate credentials")
+        await token_verifier.revoke(claims)
+        if claims.get('fam'):
+            await self.db.revoke_refresh_family(claims['fam'])
     
     async def register_user(self, user_create: UserCreate) -> User:
         """Register a new user"""
-        # Check if user already exists
-        existing_user = await self.db.get_user_by_email(user_create.email)
-        if existing_user:
-            raise ConflictException("Email already registered")
+        # Users registered before uniqueness items existed only show up in
+        # email-index until scripts/backfill_user_email_keys.py has run
+        if not settings.USER_EMAIL_KEYS_BACKFILLED:
+            if await asyncio.to_thread(self.db.query_email_index, user_create.email):
+                raise ConflictException("Email already registered")
         
         # Create new business_id for this user
         business_id = f"biz_{uuid4().hex[:12]}"
@@ -84,15 +204,14 @@ class AuthService:
             'created_at': datetime.utcnow().isoformat()
         }
         
-        await self.db.create_user(user_data)
+        # The email uniqueness item is written in the same transaction, so
+        # concurrent registrations for one address cannot both succeed
+        try:
+            await self.db.create_user(user_data)
+        except ConditionalWriteError:
+            raise ConflictException("Email already registered")
         
-        return User(
-            id=user_data['id'],
-            email=user_data['email'],
-            business_name=user_data['business_name'],
-            business_id=user_data['business_id'],
-            is_active=user_data['is_active']
-        )
+        return user_codec.decode(user_data)
     
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate a user"""
@@ -103,18 +222,12 @@ class AuthService:
         if not self.verify_password(password, user_data['hashed_password']):
             return None
         
-        return User(
-            id=user_data['id'],
-            email=user_data['email'],
-            business_name=user_data['business_name'],
-            business_id=user_data['business_id'],
-            is_active=user_data.get('is_active', True)
-        )
+        return user_codec.decode(user_data)
     
     async def get_current_user(self, token: str) -> User:
         """Get current user from JWT token"""
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            payload = token_verifier.verify(token)
             email: str = payload.get("sub")
             business_id: str = payload.get("business_id")
             
@@ -129,12 +242,6 @@ class AuthService:
         if user_data is None:
             raise UnauthorizedException("Could not validate credentials")
         
-        return User(
-            id=user_data['id'],
-            email=user_data['email'],
-            business_name=user_data['business_name'],
-            business_id=user_data['business_id'],
-            is_active=user_data.get('is_active', True)
-        )
+        return user_codec.decode(user_data)
 
 auth_service = AuthService()
\ No newline at end of file
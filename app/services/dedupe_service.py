@@ -0,0 +1,67 @@
+from typing import Any, Dict, List
+import logging
+
+from app.database.dynamodb import db
+from app.utils.validators import normalize_email, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+
+def contact_keys(lead_data: Dict[str, Any]) -> List[str]:
+    """Uniqueness keys for a lead's normalised email and phone"""
+    keys = []
+    email = normalize_email(lead_data.get('email'))
+    if email:
+        keys.append(f"email#{email}")
+    phone = normalize_phone(lead_data.get('phone'))
+    if phone:
+        keys.append(f"phone#{phone}")
+    return keys
+
+
+class DedupeService:
+    """
+    Duplicate lead detection for existing data.
+
+    New leads are checked in LeadService.create_lead, which claims the contact
+    keys in the same transaction as the lead write. This job brings leads that
+    predate the keys up to date: it walks a tenant oldest first, one page at a
+    time, lets the oldest lead claim each key and flags later leads whose keys
+    are already owned.
+    """
+    def __init__(self):
+        self.db = db
+
+    async def dedupe_business(self, business_id: str) -> Dict[str, int]:
+        """Claim contact keys for a business's leads and flag duplicates"""
+        scanned = 0
+        flagged = 0
+        async for page in self.db.iter_business_leads(business_id, oldest_first=True):
+            for lead_data in page:
+                scanned += 1
+                if lead_data.get('duplicate_of'):
+                    continue
+
+                lead_id = lead_data['id']
+                keys = contact_keys(lead_data)
+                owners = [
+                    await self.db.claim_contact_key(business_id, key, lead_id)
+                    for key in keys
+                ]
+                owner = next((o for o in owners if o != lead_id), None)
+                if owner is None:
+                    continue
+
+                # Flagged leads own no keys, so give back any this lead just claimed
+                await self.db.release_contact_keys(
+                    business_id,
+                    [key for key, o in zip(keys, owners) if o == lead_id],
+                    lead_id
+                )
+                await self.db.update_lead(lead_id, business_id, {'duplicate_of': owner})
+                flagged += 1
+
+        logger.info(f"Deduped business {business_id}: {scanned} scanned, {flagged} flagged")
+        return {'scanned': scanned, 'flagged': flagged}
+
+dedupe_service = DedupeService()
@@ -0,0 +1,38 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from uuid import uuid4
+
+
+def build_event(
+    event_type: str,
+    lead_data: Dict[str, Any],
+    changes: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Describe a lead mutation; lead_data must already be JSON-safe"""
+    event = {
+        'event_id': str(uuid4()),
+        'type': event_type,
+        'business_id': lead_data['business_id'],
+        'lead_id': lead_data['id'],
+        'occurred_at': datetime.utcnow().isoformat(),
+        'lead': lead_data
+    }
+    if changes:
+        event['changes'] = changes
+    return event
+
+
+def update_events(
+    old_data: Dict[str, Any],
+    new_data: Dict[str, Any],
+    changes: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Events for a lead update: lead.updated, plus lead.status_changed if it moved"""
+    events = [build_event("lead.updated", new_data, changes)]
+    if 'status' in changes and old_data.get('status') != new_data.get('status'):
+        events.append(build_event(
+            "lead.status_changed",
+            new_data,
+            {'status': {'from': old_data.get('status'), 'to': new_data.get('status')}}
+        ))
+    return events
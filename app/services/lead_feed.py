@@ -0,0 +1,248 @@
+import asyncio
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+import json
+import logging
+import time
+
+from app.config import settings
+from app.database.dynamodb import db
+
+logger = logging.getLogger(__name__)
+
+# Sent instead of the backlog when a subscriber cannot be caught up; the client
+# should reload via GET /leads and carry on streaming
+RESYNC_EVENT = {'type': 'resync'}
+
+
+class LocalBroker:
+    """
+    Broker that only delivers within this process.
+
+    A broker moves published events to every worker; each worker's LeadFeed
+    then fans them out to its own connections. publish() sends the event to
+    all workers, and each worker calls the attached handler on receipt.
+    LeadFeed calls watch() when a tenant gets its first local subscriber and
+    unwatch() when it loses its last, for brokers that read per tenant.
+    watch() returns False if events published while the tenant was not
+    watched may never reach the handler, so its history has a gap.
+    """
+    def __init__(self):
+        self._handler: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+
+    def attach(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        self._handler = handler
+
+    def watch(self, business_id: str) -> bool:
+        return True
+
+    def unwatch(self, business_id: str) -> None:
+        pass
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        if self._handler is not None:
+            await self._handler(event)
+
+
+class DynamoDBBroker(LocalBroker):
+    """
+    Broker that delivers across workers and instances through the lead meta table.
+
+    publish() appends the event to its tenant's feed partition. Every worker
+    polls the partitions of the tenants it has subscribers for and hands new
+    events, its own included, to the handler. Each poll re-reads the last
+    lookback_seconds so events committed late or stamped by a skewed clock
+    are still seen; ids already delivered are skipped. Feed items expire
+    via TTL after ttl_seconds.
+
+    A tenant that is unwatched keeps its read position, and watching it again
+    resumes from there, so events published in between are still delivered.
+    Once the position is older than the feed retention it is dropped and
+    watch() reports the gap.
+    """
+    def __init__(
+        self,
+        db,
+        poll_interval: float = 1.0,
+        lookback_seconds: float = 10.0,
+        ttl_seconds: int = 300
+    ):
+        super().__init__()
+        self.db = db
+        self.poll_interval = poll_interval
+        self.lookback_seconds = lookback_seconds
+        self.ttl_seconds = ttl_seconds
+        self._watched: Set[str] = set()
+        # business_id -> epoch time the next poll reads from (kept while unwatched)
+        self._read_from: Dict[str, float] = {}
+        # business_id -> event_id -> when it was delivered
+        self._delivered: Dict[str, Dict[str, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _forget_stale(self, now: float) -> None:
+        """Drop read positions of unwatched tenants whose events may have expired"""
+        for business_id, read_from in list(self._read_from.items()):
+            if business_id not in self._watched and read_from < now - self.ttl_seconds + self.lookback_seconds:
+                del self._read_from[business_id]
+                self._delivered.pop(business_id, None)
+
+    def watch(self, business_id: str) -> bool:
+        now = time.time()
+        self._forget_stale(now)
+        resumed = business_id in self._read_from
+        if not resumed:
+            self._read_from[business_id] = now
+            self._delivered[business_id] = {}
+        self._watched.add(business_id)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._poll_forever())
+        return resumed
+
+    def unwatch(self, business_id: str) -> None:
+        self._watched.discard(business_id)
+        self._forget_stale(time.time())
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await self.db.put_feed_event(event, self.ttl_seconds)
+
+    async def poll(self) -> None:
+        """Deliver new events of every watched tenant once"""
+        now = time.time()
+        for business_id in list(self._watched):
+            since = self._read_from[business_id]
+            events = await asyncio.to_thread(self.db.list_feed_events, business_id, since)
+            delivered = self._delivered.get(business_id)
+            if delivered is None:
+                continue
+            for event in events:
+                if event['event_id'] in delivered:
+                    continue
+                delivered[event['event_id']] = now
+                if self._handler is not None:
+                    await self._handler(event)
+            since = max(since, now - self.lookback_seconds)
+            self._read_from[business_id] = since
+            # Ids delivered before the next read position are not read again
+            for event_id in [e for e, at in delivered.items() if at < since]:
+                del delivered[event_id]
+
+    async def _poll_forever(self) -> None:
+        while self._watched:
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Error polling lead feed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+
+class Subscription:
+    """One SSE connection's bounded queue of pending events"""
+    def __init__(self, business_id: str, queue_size: int):
+        self.business_id = business_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """
+        Queue an event without ever blocking the publisher. A subscriber that
+        falls a full queue behind has its backlog replaced by a resync event.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+
+class LeadFeed:
+    """
+    Per-worker fan-out of lead events to live subscribers, per tenant.
+
+    A short history per tenant lets reconnecting clients resume from their
+    Last-Event-ID. Idle subscribers are just a parked coroutine and a queue.
+    """
+    def __init__(self, broker=None, history_size: int = 256, queue_size: int = 100):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self._history: Dict[str, Deque[Dict[str, Any]]] = defaultdict(
+            lambda: deque(maxlen=self.history_size)
+        )
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.broker = broker or LocalBroker()
+        self.broker.attach(self._dispatch)
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Publish a lead event to every worker"""
+        await self.broker.publish(event)
+
+    async def _dispatch(self, event: Dict[str, Any]) -> None:
+        """Deliver an event received from the broker to local subscribers"""
+        business_id = event['business_id']
+        self._history[business_id].append(event)
+        for subscription in self._subscribers.get(business_id, ()):
+            subscription.offer(event)
+
+    def subscribe(self, business_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        """Start a subscription, replaying events after last_event_id if given"""
+        subscription = Subscription(business_id, self.queue_size)
+        if not self.broker.watch(business_id):
+            # Events may have been missed while unwatched; replaying would hide that
+            self._history.pop(business_id, None)
+        if last_event_id:
+            history = list(self._history.get(business_id, ()))
+            ids = [event['event_id'] for event in history]
+            if last_event_id in ids:
+                for event in history[ids.index(last_event_id) + 1:]:
+                    subscription.offer(event)
+            else:
+                # Too old, or seen by another worker: the client must reload
+                subscription.offer(RESYNC_EVENT)
+        self._subscribers[business_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.business_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.business_id]
+                self.broker.unwatch(subscription.business_id)
+
+    def subscriber_count(self, business_id: Optional[str] = None) -> int:
+        if business_id is not None:
+            return len(self._subscribers.get(business_id, ()))
+        return sum(len(subs) for subs in self._subscribers.values())
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event as a Server-Sent Events message"""
+    lines = [f"event: {event['type']}"]
+    if 'event_id' in event:
+        lines.append(f"id: {event['event_id']}")
+    lines.append(f"data: {json.dumps(event, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_events(request, subscription: Subscription, feed: "LeadFeed"):
+    """Yield SSE messages for a subscription until the client disconnects"""
+    heartbeat = settings.LEAD_FEED_HEARTBEAT_SECONDS
+    try:
+        # Tell the client how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        feed.unsubscribe(subscription)
+
+if settings.LEAD_FEED_BROKER == "dynamodb":
+    _broker = DynamoDBBroker(db, poll_interval=settings.LEAD_FEED_POLL_SECONDS)
+else:
+    _broker = LocalBroker()
+
+lead_feed = LeadFeed(_broker, queue_size=settings.LEAD_FEED_QUEUE_SIZE)
@@ -1,30 +1,163 @@
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import base64
+import json
+import logging
 
-from app.models.lead import Lead, LeadCreate, LeadUpdate, LeadResponse
-from app.database.dynamodb import db
-from app.utils.exceptions import NotFoundException
+from app.config import settings
+from app.models.lead import Lead, LeadCreate, LeadUpdate
+from app.database.dynamodb import db, ConditionalWriteError, DuplicateLeadError, encode_cursor
+from app.database.row_codec import lead_codec
+from app.services.stats_service import lead_stats_service
+from app.services.search_service import search_service
+from app.services.dedupe_service import contact_keys
+from app.services.lead_events import build_event, update_events
+from app.services.lead_feed import lead_feed
+from app.utils.exceptions import NotFoundException, ConflictException, BadRequestException
+
+logger = logging.getLogger(__name__)
+
+# Longest message kept when merging a duplicate submission into a lead
+MAX_MERGED_MESSAGE_LENGTH = 2000
+
+
+def encode_session_token(created_at: datetime) -> str:
+    """Opaque read-your-writes token for a lead the client just created"""
+    return base64.urlsafe_b64encode(json.dumps({'t': created_at.isoformat()}).encode()).decode()
+
+
+def decode_session_token(token: str) -> datetime:
+    """Inverse of encode_session_token; raises ValueError for malformed tokens"""
+    try:
+        written_at = datetime.fromisoformat(json.loads(base64.urlsafe_b64decode(token.encode()))['t'])
+    except Exception as e:
+        raise ValueError("Invalid session token") from e
+    # Tokens carry naive UTC times, like the ones they are compared with
+    if written_at.tzinfo is not None:
+        raise ValueError("Invalid session token")
+    return written_at
+
+
+def merge_recent_writes(
+    items: List[Dict[str, Any]],
+    recent: List[Dict[str, Any]],
+    status: Optional[str],
+    limit: int,
+    next_cursor: Optional[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Add buffered new leads missing from a first page of index results, keeping
+    newest-first order and the page size. Leads pushed off the page are
+    reached through the recomputed cursor.
+    """
+    listed = {item['id'] for item in items}
+    missing = [
+        lead for lead in recent
+        if lead['id'] not in listed and (status is None or lead['status'] == status)
+    ]
+    if not missing:
+        return items, next_cursor
+    merged = sorted(items + missing, key=lambda lead: (lead['created_at'], lead['id']), reverse=True)[:limit]
+    return merged, encode_cursor(merged[-1]) if len(merged) == limit else next_cursor
 
 class LeadService:
     def __init__(self):
         self.db = db
     
+    @staticmethod
+    async def _update_derived(description: str, operation) -> None:
+        """
+        Run a best-effort write to derived data (e.g. the search index).
+        The lead write has already succeeded, so failures are logged rather than
+        raised; the rebuild scripts repair any drift.
+        """
+        try:
+            await operation
+        except Exception as e:
+            logger.error(f"Error {description}: {str(e)}")
+    
+    async def _publish(self, events) -> None:
+        """Push committed events to live subscribers (there are none on Lambda)"""
+        if settings.is_lambda():
+            return
+        for event in events:
+            await self._update_derived(
+                f"publishing event {event['event_id']}", lead_feed.publish(event)
+            )
+    
+    async def _store_new_lead(self, lead_data: Dict[str, Any], **kwargs) -> None:
+        """Write a new lead; DuplicateLeadError passes through, other cancellations are a 409"""
+        try:
+            await self.db.create_lead(lead_data, **kwargs)
+        except DuplicateLeadError:
+            raise
+        except ConditionalWriteError:
+            # A concurrent transaction on the same items (e.g. a contact key) cancelled ours
+            raise ConflictException("Lead was modified concurrently, please retry")
+    
     async def create_lead(self, lead_create: LeadCreate, business_id: str) -> Lead:
         """Create a new lead"""
-        # Create Lead object with business_id from authenticated user
-        lead_dict = lead_create.dict()
-        lead_dict['business_id'] = business_id
-        
-        lead = Lead(**lead_dict)
-        lead_data = lead.dict()
+        # Create Lead object with business_id from authenticated user; the
+        # submitted fields were already validated as a LeadCreate
+        lead = Lead.model_construct(**dict(lead_create), business_id=business_id)
+        lead_data = lead_codec.encode(lead)
         
-        # Convert datetime to ISO string for DynamoDB
-        lead_data['created_at'] = lead.created_at.isoformat()
-        lead_data['updated_at'] = lead.updated_at.isoformat()
+        stats_deltas = lead_stats_service.deltas_for_create(lead_data)
+        events = [build_event("lead.created", lead_data)]
+        mode = settings.DEDUPE_MODE
+        try:
+            await self._store_new_lead(
+                lead_data,
+                stats_deltas=stats_deltas,
+                contact_keys=contact_keys(lead_data) if mode != "off" else None,
+                outbox_events=events,
+                score_dirty=True,
+                recent_write=True
+            )
+        except DuplicateLeadError as e:
+            if mode == "reject":
+                raise ConflictException(f"Lead duplicates existing lead {e.existing_lead_id}")
+            if mode == "merge":
+                merged = await self._merge_duplicate(e.existing_lead_id, business_id, lead)
+                if merged:
+                    return merged
+            else:
+                # Flagged duplicates are stored without claiming the contact keys
+                lead.duplicate_of = e.existing_lead_id
+                lead_data['duplicate_of'] = e.existing_lead_id
+            await self._store_new_lead(
+                lead_data, stats_deltas=stats_deltas, outbox_events=events, score_dirty=True,
+                recent_write=True
+            )
         
-        await self.db.create_lead(lead_data)
+        await self._update_derived(
+            f"indexing lead {lead.id}", search_service.index_lead(lead_data)
+        )
+        await self._publish(events)
         return lead
     
+    async def _merge_duplicate(
+        self,
+        existing_id: str,
+        business_id: str,
+        lead: Lead
+    ) -> Optional[Lead]:
+        """Fold a duplicate submission into the existing lead; None if it is gone"""
+        try:
+            existing = await self.get_lead(existing_id, business_id)
+        except NotFoundException:
+            return None
+        
+        if not lead.message or lead.message == existing.message:
+            return existing
+        
+        message = f"{existing.message}\n\n{lead.message}" if existing.message else lead.message
+        return await self.update_lead(
+            existing_id,
+            business_id,
+            LeadUpdate(message=message[-MAX_MERGED_MESSAGE_LENGTH:])
+        )
+    
     async def get_lead(self, lead_id: str, business_id: str) -> Lead:
         """Get a lead by ID"""
         lead_data = await self.db.get_lead(lead_id, business_id)
@@ -32,7 +165,7 @@ class LeadService:
         if not lead_data:
             raise NotFoundException(f"Lead {lead_id} not found")
         
-        return Lead(**lead_data)
+        return lead_codec.decode(lead_data)
     
     async def list_leads(
         self,
@@ -42,7 +175,42 @@ class LeadService:
     ) -> List[Lead]:
         """List leads for a business"""
         leads_data = await self.db.list_leads(business_id, status, limit)
-        return [Lead(**lead) for lead in leads_data]
+        return lead_codec.decode_many(leads_data)
+    
+    async def list_leads_page(
+        self,
+        business_id: str,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        session_token: Optional[str] = None
+    ) -> Tuple[List[Lead], Optional[str]]:
+        """
+        List a page of leads for a business and the cursor for the next page.
+        With the session token from creating a lead, leads created in the
+        last READ_YOUR_WRITES_SECONDS appear on the first page even if the
+        index has not caught up with them yet.
+        """
+        try:
+            leads_data, next_cursor = await self.db.list_leads_page(business_id, status, limit, cursor)
+        except ValueError:
+            raise BadRequestException("Invalid cursor")
+        if session_token and cursor is None:
+            try:
+                written_at = decode_session_token(session_token)
+            except ValueError:
+                raise BadRequestException("Invalid session token")
+            since = datetime.utcnow() - timedelta(seconds=self.db.recent_writes_seconds)
+            # Older writes are long since in the index
+            if written_at >= since:
+                recent = await self.db.list_recent_writes(business_id, since.isoformat())
+                listed = {item['id'] for item in leads_data}
+                unlisted = [lead['id'] for lead in recent if lead['id'] not in listed]
+                if unlisted:
+                    # The buffer holds leads as created; merge them as they are now
+                    current = await self.db.get_leads_batch(business_id, unlisted)
+                    leads_data, next_cursor = merge_recent_writes(leads_data, current, status, limit, next_cursor)
+        return lead_codec.decode_many(leads_data), next_cursor
     
     async def update_lead(
         self,
@@ -52,19 +220,75 @@ class LeadService:
     ) -> Lead:
         """Update a lead"""
         # Verify lead exists
-        await self.get_lead(lead_id, business_id)
+        existing = await self.get_lead(lead_id, business_id)
         
         # Prepare updates
         updates = lead_update.dict(exclude_unset=True)
+        changes = {key: value for key, value in updates.items() if value is not None}
+        updates['updated_at'] = datetime.utcnow().isoformat()
         
-        updated_data = await self.db.update_lead(lead_id, business_id, updates)
-        return Lead(**updated_data)
+        # The score is written by the scoring job, not carried in lead events
+        old_data = existing.model_dump(mode="json", exclude={'score'})
+        new_data = {**old_data, **changes, 'updated_at': updates['updated_at']}
+        
+        stats_deltas = {}
+        if updates.get('status'):
+            stats_deltas = lead_stats_service.deltas_for_status_change(
+                existing.status, updates['status']
+            )
+        
+        events = update_events(old_data, new_data, changes)
+        try:
+            updated_data = await self.db.update_lead(
+                lead_id,
+                business_id,
+                updates,
+                stats_deltas=stats_deltas,
+                expected_status=existing.status,
+                outbox_events=events,
+                score_dirty=True
+            )
+        except ConditionalWriteError:
+            raise ConflictException(f"Lead {lead_id} was modified concurrently, please retry")
+        await self._update_derived(
+            f"reindexing lead {lead_id}",
+            search_service.reindex_lead(existing.model_dump(), updated_data)
+        )
+        await self._publish(events)
+        return lead_codec.decode(updated_data)
+    
+    def _recent_created_at(self, lead: Lead) -> Optional[str]:
+        """The lead's stored created_at if it may still be in the recent-writes buffer"""
+        if lead.created_at >= datetime.utcnow() - timedelta(seconds=self.db.recent_writes_seconds):
+            return lead.created_at.isoformat()
+        return None
     
     async def delete_lead(self, lead_id: str, business_id: str) -> bool:
         """Delete a lead"""
         # Verify lead exists
-        await self.get_lead(lead_id, business_id)
+        existing = await self.get_lead(lead_id, business_id)
         
-        return await self.db.delete_lead(lead_id, business_id)
+        existing_data = existing.model_dump()
+        events = [build_event("lead.deleted", existing.model_dump(mode="json", exclude={'score'}))]
+        try:
+            deleted = await self.db.delete_lead(
+                lead_id,
+                business_id,
+                stats_deltas=lead_stats_service.deltas_for_delete(existing_data),
+                # Only the original lead owns the contact keys
+                contact_keys=None if existing.duplicate_of else contact_keys(existing_data),
+                outbox_events=events,
+                score_dirty=True,
+                recent_created_at=self._recent_created_at(existing)
+            )
+        except ConditionalWriteError as e:
+            if e.reasons and e.reasons[0].get('Code') == 'ConditionalCheckFailed':
+                raise NotFoundException(f"Lead {lead_id} not found")
+            raise ConflictException(f"Lead {lead_id} was modified concurrently, please retry")
+        await self._update_derived(
+            f"unindexing lead {lead_id}", search_service.unindex_lead(existing_data)
+        )
+        await self._publish(events)
+        return deleted
 
 lead_service = LeadService()
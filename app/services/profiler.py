@@ -0,0 +1,206 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from uuid import uuid4
+
+from app.config import settings
+from app.utils.profiling import Profile, StackSampler, current_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Signed profile headers are accepted for this long after signing
+SIGNATURE_MAX_AGE_SECONDS = 300
+# Profiles beyond max_profiles are removed at most this often
+PRUNE_INTERVAL_SECONDS = 60
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """X-Profile header value that asks for one request to be profiled"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}:{method}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and stores the results.
+
+    A request is profiled when it carries a valid signed X-Profile header,
+    while an admin has switched profiling on for its path prefix, or at
+    random at sample_rate. Profiles (breakdown JSON plus collapsed stacks) are
+    written under the profile directory off the event loop; older ones beyond
+    max_profiles are pruned every prune_interval seconds. The toggle is per
+    worker.
+    """
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        secret: Optional[str] = None,
+        max_profiles: int = 200,
+        interval: float = 0.005,
+        prune_interval: float = PRUNE_INTERVAL_SECONDS
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.secret = secret
+        self.max_profiles = max_profiles
+        self.interval = interval
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._toggle_prefix: Optional[str] = None
+        self._toggle_until = 0.0
+        self._lock = threading.Lock()
+
+    def enable(self, path_prefix: str = "/", duration_seconds: float = 300) -> None:
+        """Profile every request under path_prefix for a while"""
+        self._toggle_prefix = path_prefix
+        self._toggle_until = time.time() + duration_seconds
+
+    def disable(self) -> None:
+        self._toggle_until = 0.0
+
+    def toggle_state(self) -> Dict[str, Any]:
+        active = self._toggle_until > time.time()
+        return {
+            'enabled': active,
+            'path_prefix': self._toggle_prefix if active else None,
+            'until': self._toggle_until if active else None,
+            'sample_rate': self.sample_rate
+        }
+
+    def _signature_valid(self, value: str, method: str, path: str) -> bool:
+        if not self.secret:
+            return False
+        try:
+            parts = dict(part.split("=", 1) for part in value.split(","))
+            timestamp = int(parts['t'])
+        except (KeyError, ValueError):
+            return False
+        if abs(time.time() - timestamp) > SIGNATURE_MAX_AGE_SECONDS:
+            return False
+        expected = sign_profile_request(self.secret, method, path, timestamp)
+        return hmac.compare_digest(expected, value)
+
+    def should_profile(self, method: str, path: str, header: Optional[str]) -> Optional[str]:
+        """The reason to profile this request, or None"""
+        if header is not None and self._signature_valid(header, method, path):
+            return "header"
+        if self._toggle_until and self._toggle_until > time.time() and path.startswith(self._toggle_prefix):
+            return "toggle"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def start(self, method: str, path: str, reason: str):
+        """Begin profiling the current request; returns a token for finish()"""
+        profile = Profile(uuid4().hex, method, path, reason)
+        sampler = StackSampler(profile, threading.get_ident(), self.interval)
+        sampler.start()
+        return profile, sampler, current_profile.set(profile)
+
+    async def finish(self, started, status_code: Optional[int]) -> Optional[Profile]:
+        """Stop profiling and store the profile; returns it, or None if it could not be stored"""
+        profile, sampler, token = started
+        sampler.stop()
+        current_profile.reset(token)
+        profile.duration = time.time() - profile.started_at
+        profile.status_code = status_code
+        try:
+            await asyncio.to_thread(self._save, profile)
+        except Exception as e:
+            logger.error(f"Error saving profile {profile.profile_id}: {str(e)}")
+            return None
+        return profile
+
+    def _save(self, profile: Profile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        summary = {
+            'id': profile.profile_id,
+            'method': profile.method,
+            'path': profile.path,
+            'reason': profile.reason,
+            'status_code': profile.status_code,
+            'started_at': profile.started_at,
+            'duration_ms': round(profile.duration * 1000, 3),
+            'samples': profile.samples,
+            'breakdown': profile.breakdown()
+        }
+        base = os.path.join(self.directory, profile.profile_id)
+        with open(f"{base}.folded", "w") as f:
+            f.write(profile.collapsed_stacks())
+        with open(f"{base}.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove all but the newest max_profiles, if prune_interval has passed"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_prune:
+                return
+            self._next_prune = now + self.prune_interval
+            summaries = self._summary_paths()
+            for path in summaries[self.max_profiles:]:
+                for extension in (".json", ".folded"):
+                    try:
+                        os.remove(path[:-len(".json")] + extension)
+                    except FileNotFoundError:
+                        pass
+
+    def _summary_paths(self) -> List[str]:
+        """Stored profile summaries, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory) if name.endswith(".json")
+        ]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def list_profiles(self, limit: int = 50) -> List[Dict[str, Any]]:
+        profiles = []
+        for path in self._summary_paths()[:limit]:
+            with open(path) as f:
+                summary = json.load(f)
+            profiles.append({k: v for k, v in summary.items() if k != 'breakdown'})
+        return profiles
+
+    def _path(self, profile_id: str, extension: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, profile_id + extension)
+        return path if os.path.exists(path) else None
+
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(profile_id, ".json")
+        if path is None:
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def get_collapsed_stacks(self, profile_id: str) -> Optional[str]:
+        path = self._path(profile_id, ".folded")
+        if path is None:
+            return None
+        with open(path) as f:
+            return f.read()
+
+request_profiler = RequestProfiler(
+    settings.get_profile_dir(),
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    secret=settings.PROFILE_SECRET,
+    max_profiles=settings.PROFILE_MAX_STORED
+)
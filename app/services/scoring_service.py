@@ -0,0 +1,221 @@
+from datetime import datetime, timezone, tzinfo
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+import logging
+import math
+
+import numpy as np
+
+from app.config import settings
+from app.models.lead import Lead
+from app.database.dynamodb import db
+from app.database.row_codec import lead_codec
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ("website", "referral", "social", "other")
+STATUSES = ("new", "contacted", "qualified", "converted", "lost")
+
+# Logistic model over the features built in feature_matrix(), in column order.
+# Hand-tuned starting point; refit once conversion data is available.
+FEATURE_WEIGHTS = [
+    ("source_website", 0.0),
+    ("source_referral", 1.2),
+    ("source_social", -0.3),
+    ("source_other", -0.5),
+    ("status_new", 0.0),
+    ("status_contacted", 0.6),
+    ("status_qualified", 1.8),
+    ("status_converted", 3.0),
+    ("status_lost", -3.0),
+    ("has_company", 0.7),
+    ("log_message_length", 0.25),
+    ("business_hours", 0.4),
+    ("recency", 1.0),
+    ("touched", 0.3),
+]
+BIAS = -1.5
+WEIGHTS = np.array([weight for _, weight in FEATURE_WEIGHTS])
+
+# Leads lose half their recency weight every RECENCY_HALF_LIFE_DAYS
+RECENCY_HALF_LIFE_DAYS = 14.0
+# Local hours [start, end) in BUSINESS_TIMEZONE; one zone for every tenant
+BUSINESS_HOURS = (8, 18)
+BUSINESS_TIMEZONE = ZoneInfo(settings.SCORING_TIMEZONE)
+
+# Leads scored per vectorised batch
+BATCH_SIZE = 5000
+
+
+def _timestamps(values: List[str]) -> np.ndarray:
+    return np.array([value[:19] for value in values], dtype="datetime64[s]")
+
+
+def _local_hours(created: np.ndarray, tz: tzinfo) -> np.ndarray:
+    """Hour of day in tz of UTC timestamps; offsets are looked up once per distinct hour"""
+    utc_hours, inverse = np.unique(created.astype("datetime64[h]"), return_inverse=True)
+    offsets = np.array([
+        tz.utcoffset(hour.astype(datetime).replace(tzinfo=timezone.utc)).total_seconds() // 60
+        for hour in utc_hours
+    ], dtype=np.int64)
+    local = created + offsets[inverse].astype("timedelta64[m]")
+    return (local - local.astype("datetime64[D]")).astype(np.int64) // 3600
+
+
+def feature_matrix(
+    rows: List[Dict[str, Any]],
+    now: Optional[datetime] = None,
+    tz: Optional[tzinfo] = None
+) -> np.ndarray:
+    """Build the (len(rows), len(FEATURE_WEIGHTS)) feature matrix column by column"""
+    now64 = np.datetime64((now or datetime.utcnow()).replace(microsecond=0), "s")
+    n = len(rows)
+
+    source = np.array([row.get('source') or 'other' for row in rows])
+    status = np.array([row.get('status') or 'new' for row in rows])
+    created = _timestamps([row['created_at'] for row in rows])
+    updated = _timestamps([row.get('updated_at') or row['created_at'] for row in rows])
+    has_company = np.fromiter((bool(row.get('company')) for row in rows), dtype=bool, count=n)
+    message_length = np.fromiter(
+        (len(row.get('message') or '') for row in rows), dtype=np.float64, count=n
+    )
+
+    age_days = (now64 - created).astype(np.float64) / 86400.0
+    hour = _local_hours(created, tz or BUSINESS_TIMEZONE)
+
+    columns = [source == s for s in SOURCES] + [status == s for s in STATUSES] + [
+        has_company,
+        np.log1p(message_length),
+        (hour >= BUSINESS_HOURS[0]) & (hour < BUSINESS_HOURS[1]),
+        np.exp2(-np.clip(age_days, 0, None) / RECENCY_HALF_LIFE_DAYS),
+        (updated - created) > np.timedelta64(60, "s"),
+    ]
+    return np.column_stack(columns).astype(np.float64)
+
+
+def score_batch(
+    rows: List[Dict[str, Any]],
+    now: Optional[datetime] = None,
+    tz: Optional[tzinfo] = None
+) -> np.ndarray:
+    """Scores in [0, 100] for a batch of stored lead rows"""
+    if not rows:
+        return np.empty(0)
+    logits = feature_matrix(rows, now, tz) @ WEIGHTS + BIAS
+    return 100.0 / (1.0 + np.exp(-logits))
+
+
+def score_one(row: Dict[str, Any], now: Optional[datetime] = None, tz: Optional[tzinfo] = None) -> float:
+    """Per-object reference implementation of score_batch, for tests and benchmarks"""
+    now = now or datetime.utcnow()
+    created = datetime.fromisoformat(row['created_at'][:19])
+    local_hour = created.replace(tzinfo=timezone.utc).astimezone(tz or BUSINESS_TIMEZONE).hour
+    updated = datetime.fromisoformat((row.get('updated_at') or row['created_at'])[:19])
+    age_days = (now.replace(microsecond=0) - created).total_seconds() / 86400.0
+    features = {
+        f"source_{row.get('source') or 'other'}": 1.0,
+        f"status_{row.get('status') or 'new'}": 1.0,
+        "has_company": float(bool(row.get('company'))),
+        "log_message_length": math.log1p(len(row.get('message') or '')),
+        "business_hours": float(BUSINESS_HOURS[0] <= local_hour < BUSINESS_HOURS[1]),
+        "recency": 2 ** (-max(age_days, 0) / RECENCY_HALF_LIFE_DAYS),
+        "touched": float((updated - created).total_seconds() > 60),
+    }
+    logit = BIAS + sum(weight * features.get(name, 0.0) for name, weight in FEATURE_WEIGHTS)
+    return 100.0 / (1.0 + math.exp(-logit))
+
+
+class ScoringService:
+    """
+    Batch lead scoring.
+
+    Scores are written to the lead items and kept in the lead meta table as a
+    per-tenant ranking, so "top N by score" is one query. Every lead write
+    marks the lead dirty; an incremental run scores only dirty leads, a full
+    run scores the tenant. Business hours are judged in SCORING_TIMEZONE.
+    """
+    def __init__(self):
+        self.db = db
+
+    async def _apply(self, business_id: str, rows: List[Dict[str, Any]], now: datetime) -> int:
+        """Score rows in one vectorised pass and store the results"""
+        scores = score_batch(rows, now)
+        await self.db.write_lead_scores(business_id, [
+            (row['id'], Decimal(f"{score:.3f}"))
+            for row, score in zip(rows, scores.tolist())
+        ])
+        return len(rows)
+
+    async def score_business(self, business_id: str, full: bool = False) -> Dict[str, int]:
+        """
+        Score a business's changed leads, or all of them if full is set. A
+        full run also drops ranking entries of leads it did not find.
+        """
+        now = datetime.utcnow()
+        scored = 0
+        removed = 0
+
+        if full:
+            batch: List[Dict[str, Any]] = []
+            seen = set()
+            await self.db.clear_score_dirty(business_id)
+            async for page in self.db.iter_business_leads(business_id):
+                batch.extend(page)
+                seen.update(row['id'] for row in page)
+                if len(batch) >= BATCH_SIZE:
+                    scored += await self._apply(business_id, batch, now)
+                    batch = []
+            if batch:
+                scored += await self._apply(business_id, batch, now)
+            # Leads created during the run were queued as dirty and scored meanwhile or next run
+            gone = [
+                lead_id for lead_id in await self.db.list_scored_lead_ids(business_id)
+                if lead_id not in seen
+            ]
+            if gone:
+                await self.db.remove_lead_scores(business_id, gone)
+                removed += len(gone)
+        else:
+            while True:
+                lead_ids = await self.db.pop_score_dirty(business_id, BATCH_SIZE)
+                if not lead_ids:
+                    break
+                rows = await self.db.get_leads_batch(business_id, lead_ids)
+                found = {row['id'] for row in rows}
+                gone = [lead_id for lead_id in lead_ids if lead_id not in found]
+                if gone:
+                    await self.db.remove_lead_scores(business_id, gone)
+                    removed += len(gone)
+                if rows:
+                    scored += await self._apply(business_id, rows, now)
+
+        logger.info(f"Scored business {business_id}: {scored} scored, {removed} removed")
+        return {'scored': scored, 'removed': removed}
+
+    async def top_leads(
+        self,
+        business_id: str,
+        status: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Lead]:
+        """
+        Highest scoring leads first; leads not yet scored are not included.
+        The status filter applies to the leads as stored now, not as scored.
+        """
+        leads: List[Lead] = []
+        async for ranked in self.db.iter_top_scored(business_id, limit):
+            if not ranked:
+                continue
+            rows = await self.db.get_leads_batch(business_id, [lead_id for lead_id, _ in ranked])
+            by_id = {row['id']: row for row in rows}
+            for lead_id, score in ranked:
+                row = by_id.get(lead_id)
+                if row is None or (status and row.get('status') != status):
+                    continue
+                leads.append(lead_codec.decode(row, score=float(score)))
+                if len(leads) >= limit:
+                    return leads
+        return leads
+
+scoring_service = ScoringService()
@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, Optional
+import logging
+import re
+import time
+
+from app.config import settings
+from app.models.lead import Lead
+from app.database.dynamodb import db
+from app.database.row_codec import lead_codec
+from app.database.search_index import InMemorySearchIndex, DynamoDBSearchIndex
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+MIN_TOKEN_LENGTH = 2
+
+# Relative weight of a token depending on the field it came from
+FIELD_WEIGHTS = {
+    'first_name': 3.0,
+    'last_name': 3.0,
+    'company': 2.0,
+    'email': 2.0,
+    'message': 1.0
+}
+
+# Score multiplier for a prefix match compared to an exact token match
+PREFIX_MATCH_FACTOR = 0.5
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    if not text:
+        return []
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def lead_postings(lead_data: Dict[str, Any]) -> Dict[str, float]:
+    """Map every searchable token of a lead to its highest field weight"""
+    postings: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(lead_data.get(field)):
+            if postings.get(token, 0) < weight:
+                postings[token] = weight
+    return postings
+
+
+class SearchService:
+    """
+    Full-text lead search over a per-tenant inverted index.
+
+    The index is maintained incrementally by LeadService on every write. Query
+    terms are matched as prefixes, all terms must match, and leads are ranked by
+    the summed field weight of their best match for each term.
+    """
+    def __init__(self, index=None):
+        self.db = db
+        if index is None:
+            if settings.SEARCH_INDEX_BACKEND == "memory":
+                index = InMemorySearchIndex()
+            else:
+                index = DynamoDBSearchIndex(db)
+        self.index = index
+
+    async def index_lead(self, lead_data: Dict[str, Any]) -> None:
+        """Index a newly created lead"""
+        await self.index.add(lead_data['business_id'], lead_data['id'], lead_postings(lead_data))
+
+    async def reindex_lead(self, old_data: Dict[str, Any], new_data: Dict[str, Any]) -> None:
+        """Apply the token difference between two versions of a lead"""
+        old_postings = lead_postings(old_data)
+        new_postings = lead_postings(new_data)
+
+        removed = old_postings.keys() - new_postings.keys()
+        changed = {
+            token: weight for token, weight in new_postings.items()
+            if old_postings.get(token) != weight
+        }
+        if removed:
+            await self.index.remove(new_data['business_id'], new_data['id'], removed)
+        if changed:
+            await self.index.add(new_data['business_id'], new_data['id'], changed)
+
+    async def unindex_lead(self, lead_data: Dict[str, Any]) -> None:
+        """Remove a deleted lead from the index"""
+        await self.index.remove(
+            lead_data['business_id'], lead_data['id'], lead_postings(lead_data).keys()
+        )
+
+    async def rank(self, business_id: str, query: str, limit: int = 20) -> List[tuple]:
+        """Return (lead_id, score) pairs for a query, best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for term in terms:
+            term_scores: Dict[str, float] = {}
+            for token, leads in (await self.index.lookup(business_id, term)).items():
+                factor = 1.0 if token == term else PREFIX_MATCH_FACTOR
+                for lead_id, weight in leads.items():
+                    score = weight * factor
+                    if term_scores.get(lead_id, 0) < score:
+                        term_scores[lead_id] = score
+
+            # Every term has to match
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    lead_id: score + term_scores[lead_id]
+                    for lead_id, score in scores.items()
+                    if lead_id in term_scores
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    async def search(self, business_id: str, query: str, limit: int = 20) -> List[Lead]:
+        """Search a business's leads, returning full leads in rank order"""
+        ranked = await self.rank(business_id, query, limit)
+        if not ranked:
+            return []
+
+        leads_data = await self.db.get_leads_batch(business_id, [lead_id for lead_id, _ in ranked])
+        by_id = {lead['id']: lead for lead in leads_data}
+        # Leads missing from the table are stale postings; skip them
+        return [lead_codec.decode(by_id[lead_id]) for lead_id, _ in ranked if lead_id in by_id]
+
+    async def rebuild(self, business_id: str) -> int:
+        """
+        Rebuild a business's index from the leads table.
+
+        Every lead's postings are rewritten first and postings not rewritten
+        since the rebuild started are removed afterwards, so searches keep
+        working while it runs. Writes that land meanwhile stamp their postings
+        after the start and are kept.
+        """
+        started_at = time.time()
+        count = 0
+        async for page in self.db.iter_business_leads(business_id):
+            for lead_data in page:
+                await self.index_lead(lead_data)
+                count += 1
+        await self.index.prune(business_id, started_at)
+        logger.info(f"Rebuilt search index for business {business_id}: {count} leads")
+        return count
+
+search_service = SearchService()
@@ -0,0 +1,128 @@
+import asyncio
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+import logging
+
+from app.models.lead import LeadStats
+from app.database.dynamodb import db
+from app.database.parallel_scan import AsyncSink, ParallelScan
+
+logger = logging.getLogger(__name__)
+
+
+def status_bucket(status: str) -> str:
+    """Counter bucket for leads in a given status"""
+    return f"status#{status}"
+
+
+def day_bucket(created_at: Any) -> str:
+    """Counter bucket for leads created on a given (UTC) day"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    return f"day#{created_at[:10]}"
+
+
+class LeadStatsService:
+    """
+    Materialised per-tenant lead counters.
+
+    Every lead contributes +1 to its status bucket and +1 to the bucket of the
+    day it was created. The deltas below are applied by the database layer
+    right after the lead write commits, so reads never touch the leads.
+    """
+    def __init__(self):
+        self.db = db
+
+    @staticmethod
+    def deltas_for_create(lead_data: Dict[str, Any]) -> Dict[str, int]:
+        return {
+            status_bucket(lead_data['status']): 1,
+            day_bucket(lead_data['created_at']): 1
+        }
+
+    @staticmethod
+    def deltas_for_status_change(old_status: str, new_status: str) -> Dict[str, int]:
+        if old_status == new_status:
+            return {}
+        return {status_bucket(old_status): -1, status_bucket(new_status): 1}
+
+    @staticmethod
+    def deltas_for_delete(lead_data: Dict[str, Any]) -> Dict[str, int]:
+        return {
+            status_bucket(lead_data['status']): -1,
+            day_bucket(lead_data['created_at']): -1
+        }
+
+    async def get_stats(
+        self,
+        business_id: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> LeadStats:
+        """Read counters for a business; day buckets default to the current month"""
+        today = datetime.utcnow().date()
+        start = start or today.replace(day=1)
+        end = end or today
+
+        items = await self.db.get_lead_stats(business_id, start.isoformat(), end.isoformat())
+
+        by_status: Dict[str, int] = {}
+        by_day: Dict[str, int] = {}
+        for item in items:
+            kind, _, key = item['sk'].partition('#')
+            count = int(item.get('count', 0))
+            if count <= 0:
+                continue
+            if kind == 'status':
+                by_status[key] = count
+            elif kind == 'day':
+                by_day[key] = count
+
+        return LeadStats(
+            total=sum(by_status.values()),
+            by_status=by_status,
+            by_day=by_day
+        )
+
+    async def rebuild(
+        self,
+        total_segments: int = 8,
+        rcu_per_second: Optional[float] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Recompute every tenant's counters from the leads table.
+
+        The table is read with a parallel scan (optionally held to
+        rcu_per_second), counting page by page, and the results replace the
+        stored buckets. Leads moved to the
+        archive are no longer in the table, so their recorded totals are added
+        back. Businesses with stored buckets but no leads left are reset.
+        Writes that land while the scan is running can be missed, so run this
+        when traffic is low.
+        """
+        counts: Dict[str, Counter] = defaultdict(Counter)
+
+        async def count_page(items) -> None:
+            for item in items:
+                counts[item['business_id']].update(self.deltas_for_create(item))
+
+        scan = ParallelScan(
+            self.db.leads_table,
+            total_segments=total_segments,
+            rcu_per_second=rcu_per_second,
+            sink=AsyncSink(count_page)
+        )
+        await asyncio.to_thread(scan.run)
+
+        archived = await self.db.list_archived_lead_stats()
+        for business_id, buckets in archived.items():
+            counts[business_id].update(buckets)
+
+        for business_id in set(counts) | set(await self.db.list_stats_business_ids()):
+            await self.db.replace_lead_stats(business_id, dict(counts.get(business_id, {})))
+
+        logger.info(f"Rebuilt lead stats for {len(counts)} businesses")
+        return {business_id: dict(buckets) for business_id, buckets in counts.items()}
+
+lead_stats_service = LeadStatsService()
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+import time
+
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.database.dynamodb import db
+from app.utils.profiling import span
+
+logger = logging.getLogger(__name__)
+
+
+def parse_signing_keys(value: Optional[str], fallback_secret: str) -> Dict[str, str]:
+    """Parse "kid:secret,kid:secret" into a dict; a single "default" key if unset"""
+    if not value:
+        return {"default": fallback_secret}
+    keys = {}
+    for entry in value.split(","):
+        kid, _, secret = entry.strip().partition(":")
+        if not kid or not secret:
+            raise ValueError("JWT_SIGNING_KEYS entries must look like kid:secret")
+        keys[kid] = secret
+    return keys
+
+
+class SigningKeys:
+    """
+    The set of keys tokens may be signed with, by key id.
+
+    New tokens are signed with the active key and carry its id in the "kid"
+    header. To rotate: add the new key, deploy, make it active, deploy, and
+    drop the old key once the tokens it signed have expired.
+    """
+    def __init__(self, keys: Dict[str, str], active_kid: Optional[str] = None, algorithm: str = "HS256"):
+        self.keys = keys
+        self.active_kid = active_kid or next(iter(keys))
+        self.algorithm = algorithm
+        if self.active_kid not in keys:
+            raise ValueError(f"Active JWT key {self.active_kid} is not configured")
+
+    @classmethod
+    def from_settings(cls) -> "SigningKeys":
+        return cls(
+            parse_signing_keys(settings.JWT_SIGNING_KEYS, settings.JWT_SECRET_KEY),
+            settings.JWT_ACTIVE_KEY_ID,
+            settings.JWT_ALGORITHM
+        )
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(
+            claims, self.keys[self.active_kid], algorithm=self.algorithm,
+            headers={"kid": self.active_kid}
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verify a token's signature and expiry; raises JWTError"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None:
+            if kid not in self.keys:
+                raise JWTError(f"Unknown signing key {kid}")
+            return jwt.decode(token, self.keys[kid], algorithms=[self.algorithm])
+        # Tokens issued before key ids were added
+        for secret in self.keys.values():
+            try:
+                return jwt.decode(token, secret, algorithms=[self.algorithm])
+            except JWTError:
+                continue
+        raise JWTError("Signature verification failed")
+
+
+class TokenCache:
+    """Bounded LRU of verified token claims; entries expire with the token"""
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        if 'exp' not in claims:
+            return
+        self._entries[token] = (float(claims['exp']), claims)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti), checked with a dict lookup.
+
+    Revocations are stored in the lead meta table with a TTL at the token's
+    expiry. Each worker reloads them every refresh_seconds, so a revocation
+    made elsewhere applies here within that interval (immediately on the
+    worker that made it). With shared=False revocations stay in this process
+    (tests, benchmarks).
+    """
+    def __init__(self, refresh_seconds: float = 30.0, shared: bool = True):
+        self.db = db
+        self.refresh_seconds = refresh_seconds
+        self.shared = shared
+        self._revoked: Dict[str, float] = {}
+        self._loaded_at = float("-inf")
+
+    def _refresh_if_stale(self) -> None:
+        if not self.shared:
+            return
+        now = time.monotonic()
+        if now - self._loaded_at < self.refresh_seconds:
+            return
+        self._loaded_at = now
+        try:
+            self._revoked = self.db.list_revoked_tokens()
+        except Exception as e:
+            # Keep the previous list rather than failing every request
+            logger.error(f"Error loading revoked tokens: {str(e)}")
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if jti is None:
+            return False
+        self._refresh_if_stale()
+        return jti in self._revoked
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        if self.shared:
+            await self.db.revoke_token(jti, int(expires_at))
+        self._revoked[jti] = expires_at
+
+
+class TokenVerifier:
+    """
+    Verifies bearer tokens, skipping signature checks for recently verified
+    tokens. A cache hit still checks expiry and revocation.
+    """
+    def __init__(
+        self,
+        keys: Optional[SigningKeys] = None,
+        cache: Optional[TokenCache] = None,
+        revocations: Optional[RevocationList] = None
+    ):
+        self.keys = keys or SigningKeys.from_settings()
+        self.cache = cache or TokenCache(settings.JWT_CACHE_SIZE)
+        self.revocations = revocations or RevocationList()
+
+    def issue(self, claims: Dict[str, Any]) -> str:
+        return self.keys.sign(claims)
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Claims of a valid, unrevoked token; raises JWTError otherwise"""
+        with span("jwt"):
+            claims = self.cache.get(token)
+            if claims is None:
+                claims = self.keys.decode(token)
+                self.cache.put(token, claims)
+            if self.revocations.is_revoked(claims.get('jti')):
+                raise JWTError("Token has been revoked")
+            return claims
+
+    async def revoke(self, claims: Dict[str, Any]) -> None:
+        """Revoke a verified token until it expires"""
+        if claims.get('jti'):
+            await self.revocations.revoke(claims['jti'], float(claims['exp']))
+
+token_verifier = TokenVerifier()
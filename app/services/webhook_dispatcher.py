@@ -0,0 +1,246 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+
+import httpx
+
+from app.config import settings
+from app.database.dynamodb import db, OUTBOX_SHARDS
+from app.utils.validators import check_webhook_url
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-LocalAssist-Signature"
+
+# Outbox bookkeeping attributes that are not part of the delivered event
+_INTERNAL_FIELDS = {
+    'pk', 'sk', 'attempts', 'next_attempt_at', 'leased_until', 'expires_at', 'delivered_to', 'last_error'
+}
+
+
+def sign_payload(secret: str, timestamp: int, body: bytes) -> str:
+    """Signature header value: HMAC-SHA256 over "<timestamp>.<body>" with the webhook secret"""
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class DispatchStats:
+    """Delivery counters and lag samples for a dispatcher"""
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.delivered = 0
+        self.requests = 0
+        self.failed_requests = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.lag_seconds: List[float] = []
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        lags = sorted(self.lag_seconds)
+
+        def percentile(p: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))], 3)
+
+        return {
+            'delivered': self.delivered,
+            'requests': self.requests,
+            'failed_requests': self.failed_requests,
+            'retried': self.retried,
+            'dead_lettered': self.dead_lettered,
+            'throughput_per_second': round(self.delivered / elapsed, 2),
+            'lag_p50_seconds': percentile(0.5),
+            'lag_p95_seconds': percentile(0.95),
+            'lag_max_seconds': round(lags[-1], 3) if lags else None
+        }
+
+
+class WebhookDispatcher:
+    """
+    Delivers lead events from the outbox to webhook endpoints.
+
+    Each pass reads due events from every outbox shard and claims them with
+    a lease of lease_seconds, so dispatchers polling the same shards never
+    send an event concurrently; the lease has to outlast a pass. Claimed
+    events are grouped per endpoint into batches and the batches POSTed
+    concurrently (bounded by a semaphore). An event leaves the outbox once
+    every subscribed endpoint has accepted it; failures are retried with
+    exponential backoff on later passes and moved to the tenant's dead-letter
+    partition after max_attempts. Endpoint URLs are checked again before
+    each POST, as their host may have been re-pointed since registration;
+    redirects are not followed.
+    """
+    def __init__(
+        self,
+        concurrency: int = 10,
+        batch_size: int = 25,
+        max_attempts: int = 5,
+        base_backoff: float = 2.0,
+        max_backoff: float = 3600.0,
+        timeout: float = 5.0,
+        lease_seconds: float = 300.0
+    ):
+        self.db = db
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.lease_seconds = lease_seconds
+        self.stats = DispatchStats()
+
+    def _backoff(self, attempts: int) -> float:
+        """Seconds to wait before the next attempt, with jitter"""
+        delay = min(self.base_backoff * (2 ** attempts), self.max_backoff)
+        return delay * random.uniform(0.5, 1.5)
+
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        webhook: Dict[str, Any],
+        events: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], Optional[str]]:
+        """Deliver one batch to one endpoint; returns the error, if any"""
+        payload = {
+            'webhook_id': webhook['sk'],
+            'events': [
+                {k: v for k, v in event.items() if k not in _INTERNAL_FIELDS}
+                for event in events
+            ]
+        }
+        body = json.dumps(payload, default=_json_default).encode()
+        headers = {
+            'Content-Type': 'application/json',
+            SIGNATURE_HEADER: sign_payload(webhook['secret'], int(time.time()), body)
+        }
+        async with semaphore:
+            self.stats.requests += 1
+            try:
+                await check_webhook_url(webhook['url'], settings.WEBHOOK_ALLOW_PRIVATE_URLS)
+            except ValueError as e:
+                self.stats.failed_requests += 1
+                logger.warning(f"Webhook {webhook['sk']} delivery blocked: {str(e)}")
+                return webhook, events, str(e)
+            try:
+                response = await client.post(webhook['url'], content=body, headers=headers)
+                if response.status_code >= 300:
+                    raise httpx.HTTPStatusError(
+                        f"HTTP {response.status_code}", request=response.request, response=response
+                    )
+                return webhook, events, None
+            except httpx.HTTPError as e:
+                self.stats.failed_requests += 1
+                logger.warning(f"Webhook {webhook['sk']} delivery failed: {str(e) or type(e).__name__}")
+                return webhook, events, str(e) or type(e).__name__
+
+    async def run_once(self, limit_per_shard: int = 100) -> int:
+        """Deliver every due event once; returns how many events were processed"""
+        events = []
+        for shard in range(OUTBOX_SHARDS):
+            for event in await self.db.get_outbox_events(shard, limit_per_shard):
+                claimed = await self.db.claim_outbox_event(event, self.lease_seconds)
+                if claimed is not None:
+                    events.append(claimed)
+        if not events:
+            return 0
+
+        by_business: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for event in events:
+            by_business[event['business_id']].append(event)
+
+        # event_id -> endpoints the event is being sent to on this pass
+        targets: Dict[str, set] = {}
+        deliveries = []
+        for business_id, business_events in by_business.items():
+            webhooks = await self.db.list_webhooks(business_id)
+            per_endpoint: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for event in business_events:
+                delivered = set(event.get('delivered_to', ()))
+                targets[event['event_id']] = {
+                    w['sk'] for w in webhooks
+                    if event['type'] in w['events'] and w['sk'] not in delivered
+                }
+                for webhook_id in targets[event['event_id']]:
+                    per_endpoint[webhook_id].append(event)
+            for webhook in webhooks:
+                endpoint_events = per_endpoint.get(webhook['sk'], [])
+                for i in range(0, len(endpoint_events), self.batch_size):
+                    deliveries.append((webhook, endpoint_events[i:i + self.batch_size]))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            results = await asyncio.gather(*(
+                self._post(client, semaphore, webhook, batch) for webhook, batch in deliveries
+            ))
+
+        # event_id -> (endpoints that failed, last error)
+        failures: Dict[str, Tuple[set, str]] = {}
+        for webhook, batch, error in results:
+            if error is None:
+                continue
+            for event in batch:
+                failed, _ = failures.get(event['event_id'], (set(), error))
+                failed.add(webhook['sk'])
+                failures[event['event_id']] = (failed, error)
+
+        done = []
+        for event in events:
+            if event['event_id'] not in failures:
+                done.append(event)
+                continue
+
+            failed, error = failures[event['event_id']]
+            attempts = int(event.get('attempts', 0)) + 1
+            if attempts >= self.max_attempts:
+                if await self.db.dead_letter_outbox_event(event, error):
+                    self.stats.dead_lettered += 1
+            else:
+                # Endpoints that accepted the event are not sent it again
+                delivered_to = set(event.get('delivered_to', ())) | (targets[event['event_id']] - failed)
+                if await self.db.reschedule_outbox_event(
+                    event,
+                    int(time.time() + self._backoff(attempts)),
+                    sorted(delivered_to),
+                    error
+                ):
+                    self.stats.retried += 1
+
+        now = datetime.utcnow()
+        for event in done:
+            if targets[event['event_id']]:
+                self.stats.delivered += 1
+                occurred_at = datetime.fromisoformat(event['occurred_at'])
+                self.stats.lag_seconds.append((now - occurred_at).total_seconds())
+        await self.db.delete_outbox_events(done)
+        return len(events)
+
+    async def run_forever(self, poll_interval: float = 1.0) -> None:
+        """Keep draining the outbox, sleeping only when it is empty"""
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Webhook dispatch pass failed: {str(e)}", exc_info=True)
+                processed = 0
+            if not processed:
+                await asyncio.sleep(poll_interval)
@@ -0,0 +1,68 @@
+from typing import List, Optional, Tuple
+import secrets
+
+from app.config import settings
+from app.models.webhook import Webhook, WebhookCreate, WebhookWithSecret
+from app.database.dynamodb import db
+from app.utils.exceptions import BadRequestException, NotFoundException
+from app.utils.validators import check_webhook_url
+
+class WebhookService:
+    def __init__(self):
+        self.db = db
+    
+    async def create_webhook(self, webhook_create: WebhookCreate, business_id: str) -> WebhookWithSecret:
+        """Register an endpoint; the signing secret is only returned here"""
+        try:
+            await check_webhook_url(str(webhook_create.url), settings.WEBHOOK_ALLOW_PRIVATE_URLS)
+        except ValueError as e:
+            raise BadRequestException(str(e))
+        webhook = WebhookWithSecret(
+            business_id=business_id,
+            url=str(webhook_create.url),
+            events=webhook_create.events,
+            secret=secrets.token_urlsafe(32)
+        )
+        webhook_data = webhook.model_dump()
+        webhook_data['created_at'] = webhook.created_at.isoformat()
+        
+        await self.db.create_webhook(webhook_data)
+        return webhook
+    
+    async def list_webhooks(self, business_id: str) -> List[Webhook]:
+        """List a business's endpoints"""
+        return [Webhook(**item) for item in await self.db.list_webhooks(business_id)]
+    
+    async def delete_webhook(self, webhook_id: str, business_id: str) -> bool:
+        """Delete an endpoint"""
+        if not await self.db.delete_webhook(webhook_id, business_id):
+            raise NotFoundException(f"Webhook {webhook_id} not found")
+        return True
+    
+    async def list_dead_letters(
+        self,
+        business_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        A page of events that could not be delivered to this business's
+        endpoints, and the cursor for the next page (None on the last page)
+        """
+        try:
+            items, next_cursor = await self.db.list_dead_letters(business_id, limit, cursor)
+        except ValueError:
+            raise BadRequestException("Invalid cursor")
+        return [
+            {
+                'event_id': item['event_id'],
+                'type': item['type'],
+                'lead_id': item['lead_id'],
+                'occurred_at': item['occurred_at'],
+                'attempts': int(item.get('attempts', 0)) + 1,
+                'last_error': item.get('last_error')
+            }
+            for item in items
+        ], next_cursor
+
+webhook_service = WebhookService()
@@ -8,6 +8,13 @@ class UnauthorizedException(HTTPException):
             headers={"WWW-Authenticate": "Bearer"}
         )
 
+class ForbiddenException(HTTPException):
+    def __init__(self, detail: str = "Forbidden"):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
 class NotFoundException(HTTPException):
     def __init__(self, detail: str = "Resource not found"):
         super().__init__(
@@ -0,0 +1,150 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import functools
+import inspect
+import sys
+import threading
+import time
+
+# The profile of the request being handled, if it is being profiled
+current_profile: ContextVar[Optional["Profile"]] = ContextVar("current_profile", default=None)
+
+# Modules whose frames count as request/response validation in sampled stacks
+VALIDATION_MODULES = ("pydantic", "fastapi.encoders", "fastapi.dependencies", "email_validator")
+
+
+class Profile:
+    """Timed spans and stack samples collected for one request"""
+    def __init__(self, profile_id: str, method: str, path: str, reason: str):
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.status_code: Optional[int] = None
+        # category -> [calls, seconds]
+        self.spans: Dict[str, list] = defaultdict(lambda: [0, 0.0])
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def add_span(self, category: str, seconds: float) -> None:
+        span = self.spans[category]
+        span[0] += 1
+        span[1] += seconds
+
+    def collapsed_stacks(self) -> str:
+        """Samples in collapsed-stack format ("root;...;leaf count"), for flamegraph tools"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Measured time per category, plus validation estimated from the samples"""
+        categories = {
+            category: {'calls': calls, 'ms': round(seconds * 1000, 3)}
+            for category, (calls, seconds) in sorted(self.spans.items())
+        }
+        if self.samples:
+            validation_samples = sum(
+                count for stack, count in self.stacks.items()
+                if any(f";{module}" in f";{stack}" for module in VALIDATION_MODULES)
+            )
+            categories['validation (sampled)'] = {
+                'samples': validation_samples,
+                'ms': round(self.duration * 1000 * validation_samples / self.samples, 3)
+            }
+        return categories
+
+
+@contextmanager
+def span(category: str):
+    """Time a block into the current request's profile; free when not profiling"""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(category, time.perf_counter() - start)
+
+
+def profiled_methods(prefix: str):
+    """
+    Class decorator timing every public method as "<prefix>.<method>" while
+    a request is being profiled. Unprofiled calls pay one ContextVar lookup.
+    """
+    def wrap(func, category):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                profile = current_profile.get()
+                if profile is None:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    profile.add_span(category, time.perf_counter() - start)
+            return async_wrapper
+        if inspect.isasyncgenfunction(func) or inspect.isgeneratorfunction(func):
+            # Time spent inside a generator is interleaved with its consumer
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = current_profile.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_span(category, time.perf_counter() - start)
+        return wrapper
+
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(attribute):
+                continue
+            setattr(cls, name, wrap(attribute, f"{prefix}.{name}"))
+        return cls
+    return decorate
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval from a background
+    thread. For an async request that is the event loop thread, so samples
+    taken while the request awaits may show other requests' work.
+    """
+    def __init__(self, profile: Profile, thread_id: int, interval: float = 0.005):
+        self.profile = profile
+        self.thread_id = thread_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.profile.stacks[";".join(reversed(labels))] += 1
+                self.profile.samples += 1
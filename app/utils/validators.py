@@ -0,0 +1,58 @@
+from typing import Optional
+from urllib.parse import urlsplit
+import asyncio
+import ipaddress
+import socket
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Normalise an email address for duplicate detection.
+    Lowercases it and drops a "+tag" suffix from the local part.
+    """
+    if not email or '@' not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition('@')
+    local = local.split('+', 1)[0]
+    if not local or not domain:
+        return None
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Normalise a phone number for duplicate detection.
+    Keeps digits only and drops the North American country code.
+    """
+    if not phone:
+        return None
+    digits = ''.join(filter(str.isdigit, phone))
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits or None
+
+
+async def check_webhook_url(url: str, allow_private: bool = False) -> None:
+    """
+    Raise ValueError unless url is an https URL whose host resolves only to
+    public addresses, so webhooks cannot be aimed at loopback, private,
+    link-local (cloud metadata) or other internal hosts. allow_private
+    accepts any http(s) URL, for local development.
+    """
+    parts = urlsplit(url)
+    if allow_private:
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("Webhook URLs must be http(s) URLs")
+        return
+    if parts.scheme != "https" or not parts.hostname:
+        raise ValueError("Webhook URLs must use https")
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port or 443, type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"Webhook host {parts.hostname} does not resolve")
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split('%', 1)[0])
+        if not address.is_global:
+            raise ValueError(f"Webhook host {parts.hostname} is not a public address")
@@ -0,0 +1,50 @@
+"""
+Archive old lost/converted leads to compressed files.
+
+Leads created more than --days ago (ARCHIVE_AFTER_DAYS by default) whose
+status is lost or converted are written to NDJSON.gz files in the archive
+store (ARCHIVE_BACKEND) and then deleted from the leads table in batches.
+Archived leads stay readable through GET /leads/archive.
+
+Usage:
+    python scripts/archive_leads.py biz_123 [biz_456 ...]
+    python scripts/archive_leads.py --all [--days 730]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.dynamodb import db
+from app.services.archive_service import ARCHIVE_STATUSES, archive_service
+
+
+async def archive(business_ids, all_businesses, days, statuses):
+    if all_businesses:
+        business_ids = await db.list_business_ids()
+    for business_id in business_ids:
+        result = await archive_service.archive_business(business_id, days, statuses)
+        print(f"  ✓ {business_id}: {result['scanned']} scanned, {result['archived']} archived")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old leads")
+    parser.add_argument("business_ids", nargs="*", help="Businesses to archive")
+    parser.add_argument("--all", action="store_true", help="Archive every business")
+    parser.add_argument("--days", type=int, default=None, help="Minimum lead age in days")
+    parser.add_argument(
+        "--statuses", nargs="+", default=list(ARCHIVE_STATUSES), help="Statuses to archive"
+    )
+    args = parser.parse_args()
+
+    if not args.business_ids and not args.all:
+        parser.error("give business ids or --all")
+
+    asyncio.run(archive(args.business_ids, args.all, args.days, args.statuses))
+    print("✅ Archive complete")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Recompute the per-tenant lead stats counters from the leads table.
+
+Usage:
+    python scripts/backfill_lead_stats.py [--segments 8] [--rcu 100]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.stats_service import lead_stats_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild lead stats counters")
+    parser.add_argument("--segments", type=int, default=8, help="Parallel scan segments")
+    parser.add_argument("--rcu", type=float, default=None, help="Read capacity units per second to stay under")
+    args = parser.parse_args()
+
+    results = asyncio.run(lead_stats_service.rebuild(total_segments=args.segments, rcu_per_second=args.rcu))
+
+    print(f"✅ Rebuilt stats for {len(results)} businesses")
+    for business_id, buckets in results.items():
+        total = sum(count for bucket, count in buckets.items() if bucket.startswith("status#"))
+        print(f"  ✓ {business_id}: {total} leads")
+
+
+if __name__ == '__main__':
+    main()
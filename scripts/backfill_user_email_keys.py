@@ -0,0 +1,64 @@
+"""
+Write email uniqueness items for users registered before they existed.
+
+Registration relies on these items to reject duplicate emails, and login reads
+them instead of querying email-index. Until this has run, registration also
+checks email-index; once it has, set USER_EMAIL_KEYS_BACKFILLED=true to drop
+that extra query.
+
+The users table is read with a parallel scan. With --checkpoint, an
+interrupted run resumes from the same file.
+
+Usage:
+    python scripts/backfill_user_email_keys.py [--segments 8] [--rcu 100] \\
+        [--checkpoint email-keys.json]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.dynamodb import db
+from app.database.parallel_scan import AsyncSink, ParallelScan
+
+
+async def backfill(total_segments, rcu_per_second, checkpoint_path):
+    created = 0
+    existing = 0
+
+    async def reserve_page(users):
+        nonlocal created, existing
+        for user_data in users:
+            if await db.reserve_user_email(user_data):
+                created += 1
+            else:
+                existing += 1
+
+    scan = ParallelScan(
+        db.users_table,
+        total_segments=total_segments,
+        rcu_per_second=rcu_per_second,
+        checkpoint_path=checkpoint_path,
+        # Skip the email uniqueness items themselves
+        transform=lambda item: None if item['id'].startswith('email#') else item,
+        sink=AsyncSink(reserve_page)
+    )
+    await asyncio.to_thread(scan.run)
+    return created, existing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill user email uniqueness items")
+    parser.add_argument("--segments", type=int, default=8, help="Parallel scan segments")
+    parser.add_argument("--rcu", type=float, default=None, help="Read capacity units per second to stay under")
+    parser.add_argument("--checkpoint", default=None, help="Progress file for resuming")
+    args = parser.parse_args()
+
+    created, existing = asyncio.run(backfill(args.segments, args.rcu, args.checkpoint))
+    print(f"✅ Wrote {created} email keys ({existing} already present)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark building Lead models from stored rows and rows from Leads.
+
+Compares validating construction (Lead(**row), the codec's strict mode)
+with the trusted row codec, per lead; no database is involved.
+
+Usage:
+    python scripts/bench_row_codec.py [--leads 10000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.row_codec import lead_codec
+from app.models.lead import Lead
+
+
+def synthetic_row(now: datetime, rng: random.Random) -> dict:
+    created = now - timedelta(seconds=rng.randint(0, 180 * 86400))
+    return {
+        'id': str(uuid4()),
+        'business_id': "biz_bench",
+        'shard_key': "biz_bench#0",
+        'first_name': "Jane",
+        'last_name': "Smith",
+        'email': f"jane.{rng.randint(0, 10**6)}@example.com",
+        'phone': f"555{rng.randint(0, 10**7 - 1):07d}",
+        'company': rng.choice([None, "Acme LLC"]),
+        'message': "x" * rng.randint(0, 500),
+        'source': "website",
+        'status': "new",
+        'duplicate_of': None,
+        'created_at': created.isoformat(),
+        'updated_at': created.isoformat()
+    }
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def legacy_encode(lead: Lead) -> dict:
+    lead_data = lead.dict(exclude={'score'})
+    lead_data['created_at'] = lead.created_at.isoformat()
+    lead_data['updated_at'] = lead.updated_at.isoformat()
+    return lead_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lead row codec")
+    parser.add_argument("--leads", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.leads)
+    rows = [synthetic_row(datetime.utcnow(), rng) for _ in range(args.leads)]
+    leads = lead_codec.decode_many(rows)
+    assert leads[0] == Lead(**rows[0])
+
+    cases = [
+        ("decode Lead(**row)", lambda: [Lead(**row) for row in rows]),
+        ("decode codec strict", lambda: lead_codec.decode_many(rows, strict=True)),
+        ("decode codec trusted", lambda: lead_codec.decode_many(rows, strict=False)),
+        ("encode .dict() + isoformat", lambda: [legacy_encode(lead) for lead in leads]),
+        ("encode codec", lambda: [lead_codec.encode(lead) for lead in leads]),
+    ]
+    print(f"{args.leads} leads, best of {args.repeat}")
+    for name, fn in cases:
+        seconds = best_of(args.repeat, fn)
+        print(f"  {name:<28} {seconds * 1e6 / args.leads:7.2f}µs/lead  ({args.leads / seconds:,.0f} leads/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark vectorised lead scoring against the per-lead implementation.
+
+Scores synthetic stored lead rows in memory; no database is involved.
+
+Usage:
+    python scripts/bench_scoring.py [--sizes 10000 100000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.services.scoring_service import SOURCES, STATUSES, score_batch, score_one
+
+
+def synthetic_row(now: datetime, rng: random.Random) -> dict:
+    created = now - timedelta(seconds=rng.randint(0, 180 * 86400))
+    updated = created + timedelta(seconds=rng.choice([0, 0, rng.randint(0, 30 * 86400)]))
+    return {
+        'id': str(uuid4()),
+        'business_id': "biz_bench",
+        'source': rng.choice(SOURCES),
+        'status': rng.choice(STATUSES),
+        'company': rng.choice([None, "Acme LLC"]),
+        'message': "x" * rng.randint(0, 500),
+        'created_at': created.isoformat(),
+        'updated_at': updated.isoformat()
+    }
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(size: int, repeat: int) -> None:
+    rng = random.Random(size)
+    now = datetime.utcnow()
+    rows = [synthetic_row(now, rng) for _ in range(size)]
+
+    vectorised = best_of(repeat, lambda: score_batch(rows, now))
+    per_lead = best_of(repeat, lambda: [score_one(row, now) for row in rows])
+
+    difference = np.max(np.abs(score_batch(rows, now) - np.array([score_one(r, now) for r in rows])))
+    print(
+        f"{size:>7} leads | vectorised {vectorised * 1000:8.1f}ms "
+        f"({size / vectorised:,.0f} leads/s) | per-lead {per_lead * 1000:8.1f}ms "
+        f"({size / per_lead:,.0f} leads/s) | speedup {per_lead / vectorised:5.1f}x | "
+        f"max diff {difference:.1e}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lead scoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        bench(size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark the lead search index with the in-memory backend.
+
+Builds an index of synthetic leads for a single tenant, then times queries.
+
+Usage:
+    python scripts/bench_search.py [--sizes 10000 100000] [--queries 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.search_index import InMemorySearchIndex
+from app.services.search_service import SearchService
+
+FIRST_NAMES = ["john", "jane", "maria", "david", "sarah", "michael", "emma", "james", "olivia", "liam"]
+LAST_NAMES = ["smith", "johnson", "garcia", "miller", "davis", "martinez", "lopez", "wilson", "anderson", "thomas"]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "acme.io", "contoso.com"]
+WORDS = (
+    "quote estimate roof repair plumbing kitchen remodel urgent weekend install "
+    "replace leak heater window garden fence paint schedule visit price budget"
+).split()
+
+
+def synthetic_lead(business_id: str, rng: random.Random) -> dict:
+    first = rng.choice(FIRST_NAMES) + str(rng.randint(0, 999))
+    last = rng.choice(LAST_NAMES)
+    return {
+        'id': str(uuid4()),
+        'business_id': business_id,
+        'first_name': first,
+        'last_name': last,
+        'email': f"{first}.{last}@{rng.choice(DOMAINS)}",
+        'company': f"{rng.choice(LAST_NAMES)} {rng.choice(['llc', 'inc', 'co'])}",
+        'message': " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30)))
+    }
+
+
+async def bench(size: int, queries: int) -> None:
+    rng = random.Random(size)
+    service = SearchService(index=InMemorySearchIndex())
+    business_id = "biz_bench"
+    leads = [synthetic_lead(business_id, rng) for _ in range(size)]
+
+    start = time.perf_counter()
+    for lead in leads:
+        await service.index_lead(lead)
+    build_time = time.perf_counter() - start
+
+    query_pool = ["john", "smi", "garcia roof", "acme", "urgent leak", "jane5", "contoso quote"]
+    latencies = []
+    for i in range(queries):
+        query = query_pool[i % len(query_pool)]
+        start = time.perf_counter()
+        await service.rank(business_id, query, limit=20)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{size:>7} leads | build {build_time:6.2f}s "
+        f"({size / build_time:,.0f} leads/s) | "
+        f"query p50 {statistics.median(latencies):7.2f}ms p99 {p99:7.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lead search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        asyncio.run(bench(size, args.queries))
+
+
+if __name__ == '__main__':
+    main()
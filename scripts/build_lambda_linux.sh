@@ -36,6 +36,9 @@ pip install \
   python-multipart==0.0.6 \
   python-dotenv==1.0.0 \
   mangum==0.17.0 \
+  numpy==1.26.2 \
+  brotli==1.1.0 \
+  zstandard==0.22.0 \
   -t $LAYER_DIR \
   --no-cache-dir \
   --upgrade
@@ -21,7 +21,8 @@ def create_tables():
             AttributeDefinitions=[
                 {'AttributeName': 'id', 'AttributeType': 'S'},
                 {'AttributeName': 'business_id', 'AttributeType': 'S'},
-                {'AttributeName': 'created_at', 'AttributeType': 'S'}
+                {'AttributeName': 'created_at', 'AttributeType': 'S'},
+                {'AttributeName': 'shard_key', 'AttributeType': 'S'}
             ],
             GlobalSecondaryIndexes=[
                 {
@@ -35,6 +36,18 @@ def create_tables():
                         'ReadCapacityUnits': 5,
                         'WriteCapacityUnits': 5
                     }
+                },
+                {
+                    'IndexName': 'shard_key-created_at-index',
+                    'KeySchema': [
+                        {'AttributeName': 'shard_key', 'KeyType': 'HASH'},
+                        {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'},
+                    'ProvisionedThroughput': {
+                        'ReadCapacityUnits': 5,
+                        'WriteCapacityUnits': 5
+                    }
                 }
             ],
             ProvisionedThroughput={
@@ -78,6 +91,27 @@ def create_tables():
         print("✅ Created users table")
     except dynamodb.exceptions.ResourceInUseException:
         print("⚠️  Users table already exists")
+    
+    # Lead Meta Table (counters and other derived per-tenant data)
+    try:
+        dynamodb.create_table(
+            TableName='lead_meta',
+            KeySchema=[
+                {'AttributeName': 'pk', 'KeyType': 'HASH'},
+                {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'pk', 'AttributeType': 'S'},
+                {'AttributeName': 'sk', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("✅ Created lead_meta table")
+    except dynamodb.exceptions.ResourceInUseException:
+        print("⚠️  Lead meta table already exists")
 
 if __name__ == '__main__':
     create_tables()
\ No newline at end of file
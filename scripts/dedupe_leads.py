@@ -0,0 +1,45 @@
+"""
+Flag duplicate leads in existing data.
+
+Walks each business's leads oldest first, claiming normalised email/phone keys
+and marking later leads with the same contact details as duplicates. Leads are
+processed one page at a time, so memory use does not grow with tenant size.
+
+Usage:
+    python scripts/dedupe_leads.py biz_123 [biz_456 ...]
+    python scripts/dedupe_leads.py --all
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.dynamodb import db
+from app.services.dedupe_service import dedupe_service
+
+
+async def dedupe(business_ids, all_businesses):
+    if all_businesses:
+        business_ids = await db.list_business_ids()
+    for business_id in business_ids:
+        result = await dedupe_service.dedupe_business(business_id)
+        print(f"  ✓ {business_id}: {result['scanned']} scanned, {result['flagged']} flagged")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag duplicate leads")
+    parser.add_argument("business_ids", nargs="*", help="Businesses to dedupe")
+    parser.add_argument("--all", action="store_true", help="Dedupe every business")
+    args = parser.parse_args()
+
+    if not args.business_ids and not args.all:
+        parser.error("give business ids or --all")
+
+    asyncio.run(dedupe(args.business_ids, args.all))
+    print("✅ Dedupe complete")
+
+
+if __name__ == '__main__':
+    main()
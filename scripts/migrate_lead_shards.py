@@ -0,0 +1,65 @@
+"""
+Shard hot tenants' leads over several index partitions.
+
+Leads are listed from shard_key-created_at-index, keyed on business_id for
+most tenants and business_id#N for sharded ones. Rolling this out:
+
+    1. Deploy (creates the shard index; new leads get a shard_key)
+    2. python scripts/migrate_lead_shards.py backfill [--rcu 100] [--checkpoint shard-keys.json]
+    3. Set LEADS_SHARD_INDEX_READY=true, then remove business_id-created_at-index
+
+Sharding a tenant (any time; --shards 1 undoes it):
+
+    python scripts/migrate_lead_shards.py shard biz_123 --shards 8
+
+The shard command waits for every worker to pick up the new layout before
+moving existing leads; reads stay complete throughout.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.sharding_service import lead_sharding_service
+
+
+async def backfill(total_segments, rcu_per_second, checkpoint_path):
+    result = await lead_sharding_service.backfill_shard_keys(total_segments, rcu_per_second, checkpoint_path)
+    print(f"  ✓ {result['scanned']} scanned, {result['updated']} updated")
+
+
+async def shard(business_ids, shards, wait):
+    for business_id in business_ids:
+        result = await lead_sharding_service.shard_business(business_id, shards, wait=wait)
+        print(f"  ✓ {business_id}: {result['scanned']} scanned, {result['moved']} moved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate leads to sharded index keys")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = subparsers.add_parser("backfill", help="Give existing leads a shard_key")
+    backfill_parser.add_argument("--segments", type=int, default=8, help="Parallel scan segments")
+    backfill_parser.add_argument("--rcu", type=float, default=None, help="Read capacity units per second to stay under")
+    backfill_parser.add_argument("--checkpoint", default=None, help="Progress file for resuming")
+
+    shard_parser = subparsers.add_parser("shard", help="Spread tenants over N shards")
+    shard_parser.add_argument("business_ids", nargs="+", help="Businesses to shard")
+    shard_parser.add_argument("--shards", type=int, required=True, help="Number of shards")
+    shard_parser.add_argument(
+        "--no-wait", action="store_true",
+        help="Skip waiting for workers to see the new layout (only safe with no traffic)"
+    )
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        asyncio.run(backfill(args.segments, args.rcu, args.checkpoint))
+    else:
+        asyncio.run(shard(args.business_ids, args.shards, not args.no_wait))
+    print("✅ Migration complete")
+
+
+if __name__ == '__main__':
+    main()
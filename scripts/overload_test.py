@@ -0,0 +1,114 @@
+"""
+Overload a simulated backend with and without load shedding.
+
+A backend with a fixed number of workers (a semaphore) and a fixed service
+time gets open-loop traffic above its capacity. Without shedding the queue,
+and so latency, grows for as long as the overload lasts; with the adaptive
+limit admitted requests keep a bounded p99 and the rest get fast 503s.
+Interactive and bulk requests are mixed to show bulk is shed first.
+
+Usage:
+    python scripts/overload_test.py [--workers 4] [--service-ms 20] [--overload 2] [--seconds 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.responses import PlainTextResponse
+
+from app.middleware.load_shedding import GradientLimit, LoadShedder, LoadSheddingMiddleware
+
+
+def backend(workers: int, service_time: float):
+    capacity = asyncio.Semaphore(workers)
+
+    async def app(scope, receive, send):
+        async with capacity:
+            await asyncio.sleep(service_time)
+        await PlainTextResponse("ok")(scope, receive, send)
+    return app
+
+
+async def call(app, path: str, headers) -> tuple:
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers}
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status[0], time.perf_counter() - start
+
+
+async def run(app, rate: float, seconds: float, bulk_share: float) -> list:
+    rng = random.Random(1)
+    tasks = []
+    tick = 0.005
+    owed = 0.0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        owed += rate * tick
+        while owed >= 1:
+            owed -= 1
+            if rng.random() < bulk_share:
+                request = ("bulk", call(app, "/leads/archive", [(b"authorization", b"Bearer x")]))
+            else:
+                request = ("interactive", call(app, "/leads/", [(b"authorization", b"Bearer x")]))
+            tasks.append((request[0], asyncio.ensure_future(request[1])))
+        await asyncio.sleep(tick)
+    return [(kind, *(await task)) for kind, task in tasks]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else float("nan")
+
+
+def report(name: str, results) -> None:
+    ok = [latency for _, status, latency in results if status == 200]
+    shed = [latency for _, status, latency in results if status == 503]
+    print(f"{name}: {len(results)} requests, {len(ok)} served, {len(shed)} shed")
+    print(f"  served p50 {percentile(ok, 0.5) * 1000:7.1f}ms  p99 {percentile(ok, 0.99) * 1000:7.1f}ms")
+    if shed:
+        print(f"  shed   p99 {percentile(shed, 0.99) * 1000:7.1f}ms")
+    for kind in ("interactive", "bulk"):
+        kind_results = [status for k, status, _ in results if k == kind]
+        if kind_results:
+            rejected = sum(1 for status in kind_results if status == 503) / len(kind_results)
+            print(f"  {kind:<12} shed {rejected:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overload test for load shedding")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--service-ms", type=float, default=20)
+    parser.add_argument("--overload", type=float, default=2.0, help="Offered load / capacity")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--bulk-share", type=float, default=0.3)
+    args = parser.parse_args()
+
+    service_time = args.service_ms / 1000
+    rate = args.overload * args.workers / service_time
+    print(f"capacity {args.workers / service_time:.0f} req/s, offered {rate:.0f} req/s for {args.seconds}s")
+
+    unprotected = backend(args.workers, service_time)
+    report("no shedding", asyncio.run(run(unprotected, rate, args.seconds, args.bulk_share)))
+
+    shedder = LoadShedder(GradientLimit(initial_limit=50, min_limit=2), bulk_paths=("/leads/archive",))
+    protected = LoadSheddingMiddleware(backend(args.workers, service_time), shedder)
+    report("shedding", asyncio.run(run(protected, rate, args.seconds, args.bulk_share)))
+    print(f"  final limit {shedder.limit.limit:.1f}")
+
+
+if __name__ == '__main__':
+    main()
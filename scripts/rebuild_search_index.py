@@ -0,0 +1,33 @@
+"""
+Rebuild the lead search index for one or more businesses.
+
+Usage:
+    python scripts/rebuild_search_index.py biz_123 [biz_456 ...]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.search_service import search_service
+
+
+async def rebuild(business_ids):
+    for business_id in business_ids:
+        count = await search_service.rebuild(business_id)
+        print(f"  ✓ {business_id}: indexed {count} leads")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the lead search index")
+    parser.add_argument("business_ids", nargs="+", help="Businesses to reindex")
+    args = parser.parse_args()
+
+    asyncio.run(rebuild(args.business_ids))
+    print("✅ Search index rebuilt")
+
+
+if __name__ == '__main__':
+    main()
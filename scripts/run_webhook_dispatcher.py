@@ -0,0 +1,46 @@
+"""
+Deliver lead events from the outbox to webhook endpoints.
+
+Usage:
+    python scripts/run_webhook_dispatcher.py           # run until interrupted
+    python scripts/run_webhook_dispatcher.py --once    # drain one pass and exit
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.webhook_dispatcher import WebhookDispatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the webhook dispatcher")
+    parser.add_argument("--once", action="store_true", help="Run a single pass")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent HTTP requests")
+    parser.add_argument("--batch-size", type=int, default=25, help="Events per request")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Attempts before dead-lettering")
+    parser.add_argument("--lease-seconds", type=float, default=300.0, help="How long a claimed event is held")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between empty polls")
+    args = parser.parse_args()
+
+    dispatcher = WebhookDispatcher(
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        max_attempts=args.max_attempts,
+        lease_seconds=args.lease_seconds
+    )
+    try:
+        if args.once:
+            asyncio.run(dispatcher.run_once())
+        else:
+            asyncio.run(dispatcher.run_forever(args.poll_interval))
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(dispatcher.stats.summary(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Walk a whole DynamoDB table with a parallel scan.
+
+Segments are scanned by a pool of worker threads, optionally held to a
+read-capacity budget. Every item goes through an optional transform and into
+a sink. With --checkpoint, progress is saved after every page and an
+interrupted run (Ctrl+C, crash) resumes from the same file.
+
+Transforms and sinks can be built in or given as "package.module:name":
+a transform is a function item -> item or None (to drop the item); a sink is
+a class with write(items) and close().
+
+Usage:
+    python scripts/scan_table.py leads --sink count --group-by business_id
+    python scripts/scan_table.py leads --output leads.ndjson.gz --rcu 200 \\
+        --checkpoint leads-export.json
+    python scripts/scan_table.py leads --transform myjobs.migrate:fix_lead \\
+        --sink myjobs.migrate:UpdateSink --segments 32 --workers 16
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.dynamodb import db
+from app.database.parallel_scan import CountSink, NDJSONSink, ParallelScan
+
+TABLES = {
+    'leads': db.leads_table,
+    'users': db.users_table,
+    'lead_meta': db.meta_table
+}
+
+
+def load(path: str):
+    """Import "package.module:name" """
+    module_name, _, name = path.partition(":")
+    if not name:
+        raise argparse.ArgumentTypeError(f"expected package.module:name, got {path}")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel scan of a DynamoDB table")
+    parser.add_argument("table", choices=sorted(TABLES), help="Table to scan")
+    parser.add_argument("--segments", type=int, default=8, help="TotalSegments")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads (default: one per segment)")
+    parser.add_argument("--rcu", type=float, default=None, help="Read capacity units per second to stay under")
+    parser.add_argument("--page-size", type=int, default=None, help="Items per Scan request")
+    parser.add_argument("--checkpoint", default=None, help="Progress file for resuming")
+    parser.add_argument("--transform", type=load, default=None, help="package.module:function")
+    parser.add_argument("--sink", default=None, help="ndjson, count or package.module:Class")
+    parser.add_argument("--output", default=None, help="Output path for the ndjson sink (.gz to compress)")
+    parser.add_argument("--group-by", default=None, help="Attribute to group counts by (count sink)")
+    args = parser.parse_args()
+
+    sink_name = args.sink or ("ndjson" if args.output else "count")
+    if sink_name == "ndjson":
+        if not args.output:
+            parser.error("the ndjson sink needs --output")
+        sink = NDJSONSink(args.output)
+    elif sink_name == "count":
+        sink = CountSink(args.group_by)
+    else:
+        sink = load(sink_name)()
+
+    scan = ParallelScan(
+        TABLES[args.table],
+        total_segments=args.segments,
+        workers=args.workers,
+        rcu_per_second=args.rcu,
+        checkpoint_path=args.checkpoint,
+        transform=args.transform,
+        sink=sink,
+        page_size=args.page_size
+    )
+    try:
+        stats = scan.run()
+    except KeyboardInterrupt:
+        print(f"⚠️  Interrupted: {json.dumps(scan.stats.summary())}")
+        if args.checkpoint:
+            print(f"   Re-run with --checkpoint {args.checkpoint} to resume")
+        sys.exit(1)
+
+    print(json.dumps(stats.summary(), indent=2))
+    if isinstance(sink, CountSink) and sink.group_by:
+        for group, count in sink.groups.most_common():
+            print(f"  {group}: {count}")
+    print(f"✅ Scan complete: {stats.scanned} items")
+
+
+if __name__ == '__main__':
+    main()
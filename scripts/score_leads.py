@@ -0,0 +1,46 @@
+"""
+Score leads.
+
+By default only leads created, changed or deleted since the last run are
+scored. Use --full to re-score every lead, e.g. nightly so recency decays or
+after changing the scoring weights.
+
+Usage:
+    python scripts/score_leads.py biz_123 [biz_456 ...]
+    python scripts/score_leads.py --all [--full]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.dynamodb import db
+from app.services.scoring_service import scoring_service
+
+
+async def score(business_ids, all_businesses, full):
+    if all_businesses:
+        business_ids = await db.list_business_ids()
+    for business_id in business_ids:
+        result = await scoring_service.score_business(business_id, full=full)
+        print(f"  ✓ {business_id}: {result['scored']} scored, {result['removed']} removed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score leads")
+    parser.add_argument("business_ids", nargs="*", help="Businesses to score")
+    parser.add_argument("--all", action="store_true", help="Score every business")
+    parser.add_argument("--full", action="store_true", help="Re-score every lead, not just changed ones")
+    args = parser.parse_args()
+
+    if not args.business_ids and not args.all:
+        parser.error("give business ids or --all")
+
+    asyncio.run(score(args.business_ids, args.all, args.full))
+    print("✅ Scoring complete")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Sign an X-Profile header so one request is profiled.
+
+The signature covers the method and path and is valid for five minutes.
+The response carries X-Profile-Id; fetch the result from
+GET /admin/profiles/<id> (breakdown) or /admin/profiles/<id>/folded
+(collapsed stacks for flamegraph.pl or speedscope).
+
+Usage:
+    python scripts/sign_profile_header.py GET /leads/
+    curl -H "X-Profile: $(python scripts/sign_profile_header.py GET /leads/)" \\
+         -H "Authorization: Bearer $TOKEN" http://localhost:8000/leads/
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.profiler import sign_profile_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign an X-Profile header")
+    parser.add_argument("method", help="HTTP method, e.g. GET")
+    parser.add_argument("path", help="Request path without the query string, e.g. /leads/")
+    parser.add_argument("--secret", default=settings.PROFILE_SECRET, help="Defaults to PROFILE_SECRET")
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("PROFILE_SECRET is not set")
+    print(sign_profile_request(args.secret, args.method.upper(), args.path))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ resource "aws_api_gateway_rest_api" "api" {
   name        = local.api_name
   description = "LocalAssist API - ${var.environment}"
 
+  # Compressed responses come back from Lambda base64 encoded
+  binary_media_types = ["*/*"]
+
   endpoint_configuration {
     types = ["REGIONAL"]
   }
@@ -70,6 +73,7 @@ resource "aws_api_gateway_deployment" "api" {
 
   triggers = {
     redeployment = sha1(jsonencode([
+      aws_api_gateway_rest_api.api.binary_media_types,
       aws_api_gateway_resource.proxy.id,
       aws_api_gateway_method.proxy.id,
       aws_api_gateway_integration.lambda.id,
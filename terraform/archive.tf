@@ -0,0 +1,67 @@
+# terraform/archive.tf
+
+# Cold storage for archived leads (NDJSON.gz, one prefix per business)
+resource "aws_s3_bucket" "lead_archive" {
+  bucket = "${var.project_name}-lead-archive-${var.environment}"
+
+  tags = {
+    Name = "${var.project_name}-lead-archive-${var.environment}"
+  }
+}
+
+resource "aws_s3_bucket_public_access_block" "lead_archive" {
+  bucket = aws_s3_bucket.lead_archive.id
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "lead_archive" {
+  bucket = aws_s3_bucket.lead_archive.id
+
+  rule {
+    apply_server_side_encryption_by_default {
+      sse_algorithm = "AES256"
+    }
+  }
+}
+
+# Archive files are rarely read after the first few months
+resource "aws_s3_bucket_lifecycle_configuration" "lead_archive" {
+  bucket = aws_s3_bucket.lead_archive.id
+
+  rule {
+    id     = "infrequent-access"
+    status = "Enabled"
+
+    filter {}
+
+    transition {
+      days          = 30
+      storage_class = "STANDARD_IA"
+    }
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_archive" {
+  name = "${local.function_name}-archive-policy"
+  role = aws_iam_role.lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:GetObject", "s3:PutObject"]
+        Resource = "${aws_s3_bucket.lead_archive.arn}/*"
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:ListBucket"]
+        Resource = aws_s3_bucket.lead_archive.arn
+      }
+    ]
+  })
+}
@@ -22,7 +22,13 @@ resource "aws_dynamodb_table" "leads" {
     type = "S"
   }
 
-  # Global Secondary Index for querying by business_id
+  attribute {
+    name = "shard_key"
+    type = "S"
+  }
+
+  # Global Secondary Index for querying by business_id.
+  # Superseded by shard_key-created_at-index; remove once LEADS_SHARD_INDEX_READY is set
   global_secondary_index {
     name            = "business_id-created_at-index"
     hash_key        = "business_id"
@@ -30,6 +36,14 @@ resource "aws_dynamodb_table" "leads" {
     projection_type = "ALL"
   }
 
+  # Per-tenant listing keyed on business_id, or business_id#N for sharded tenants
+  global_secondary_index {
+    name            = "shard_key-created_at-index"
+    hash_key        = "shard_key"
+    range_key       = "created_at"
+    projection_type = "ALL"
+  }
+
   # Enable point-in-time recovery for production
   point_in_time_recovery {
     enabled = var.environment == "prod" ? true : false
@@ -79,4 +93,40 @@ resource "aws_dynamodb_table" "users" {
   tags = {
     Name = "${var.project_name}-users-${var.environment}"
   }
-}
\ No newline at end of file
+}
+
+# Lead Meta Table - derived per-tenant data (stats counters, indexes)
+resource "aws_dynamodb_table" "lead_meta" {
+  name           = "${var.project_name}-lead-meta-${var.environment}"
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "pk"
+  range_key      = "sk"
+
+  attribute {
+    name = "pk"
+    type = "S"
+  }
+
+  attribute {
+    name = "sk"
+    type = "S"
+  }
+
+  # Outbox, dead-letter and other short-lived items set expires_at
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  point_in_time_recovery {
+    enabled = var.environment == "prod" ? true : false
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = {
+    Name = "${var.project_name}-lead-meta-${var.environment}"
+  }
+}
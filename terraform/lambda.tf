@@ -40,6 +40,9 @@ resource "aws_lambda_function" "api" {
       JWT_SECRET_KEY     = var.jwt_secret_key
       LEADS_TABLE_NAME   = aws_dynamodb_table.leads.name
       USERS_TABLE_NAME   = aws_dynamodb_table.users.name
+      LEAD_META_TABLE_NAME = aws_dynamodb_table.lead_meta.name
+      ARCHIVE_BACKEND    = "s3"
+      ARCHIVE_BUCKET     = aws_s3_bucket.lead_archive.bucket
       CORS_ORIGINS       = var.cors_origins
       LOG_LEVEL          = var.log_level
     }
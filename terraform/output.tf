@@ -30,6 +30,16 @@ output "dynamodb_users_table" {
   value       = aws_dynamodb_table.users.name
 }
 
+output "dynamodb_lead_meta_table" {
+  description = "Name of the lead meta DynamoDB table"
+  value       = aws_dynamodb_table.lead_meta.name
+}
+
+output "lead_archive_bucket" {
+  description = "S3 bucket holding archived leads"
+  value       = aws_s3_bucket.lead_archive.bucket
+}
+
 output "cloudwatch_log_group" {
   description = "CloudWatch log group for Lambda"
   value       = aws_cloudwatch_log_group.lambda_logs.name
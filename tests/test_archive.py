@@ -0,0 +1,98 @@
+import asyncio
+import gzip
+import json
+from uuid import uuid4
+
+from fastapi import status
+
+from app.database.archive_store import LocalArchiveStore
+from app.database.dynamodb import db
+from app.services.archive_service import archive_service, encode_rows
+from app.services.stats_service import lead_stats_service
+
+def test_local_archive_store(tmp_path):
+    """Test archive files round-trip through the local store"""
+    store = LocalArchiveStore(str(tmp_path))
+    rows = [{"id": "1", "status": "lost"}, {"id": "2", "status": "converted"}]
+    store.put("biz/b.ndjson.gz", encode_rows(rows))
+    store.put("biz/a.ndjson.gz", encode_rows(rows[:1]))
+    store.put("other/c.ndjson.gz", encode_rows(rows))
+
+    assert store.list_keys("biz/") == ["biz/a.ndjson.gz", "biz/b.ndjson.gz"]
+    with store.open("biz/b.ndjson.gz") as f:
+        assert [json.loads(line) for line in gzip.GzipFile(fileobj=f)] == rows
+
+def test_archive_leads(client, tmp_path, monkeypatch, test_lead_data):
+    """Test closed leads move to the archive and stream back from GET /leads/archive"""
+    monkeypatch.setattr(archive_service, "store", LocalArchiveStore(str(tmp_path)))
+    user = {"email": f"archive-{uuid4().hex[:8]}@example.com", "password": "TestPassword123!",
+            "business_name": "Archive Test"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", data={"username": user["email"], "password": user["password"]}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    business_id = client.get("/auth/me", headers=headers).json()["business_id"]
+
+    ids = {}
+    for lead_status in ("lost", "converted", "new"):
+        lead = {**test_lead_data, "email": f"{lead_status}-{uuid4().hex[:8]}@example.com",
+                "phone": f"555{uuid4().int % 10**7:07d}"}
+        ids[lead_status] = client.post("/leads/", json=lead, headers=headers).json()["id"]
+        if lead_status != "new":
+            client.patch(f"/leads/{ids[lead_status]}", json={"status": lead_status}, headers=headers)
+
+    # Nothing is old enough yet
+    assert asyncio.run(archive_service.archive_business(business_id))["archived"] == 0
+
+    stats = client.get("/leads/stats", headers=headers).json()
+
+    # A cutoff in the future makes every lead old enough
+    result = asyncio.run(archive_service.archive_business(business_id, older_than_days=-1))
+    assert result == {"scanned": 3, "archived": 2}
+
+    # Archived leads stay counted, also after a rebuild from the leads table
+    assert client.get("/leads/stats", headers=headers).json() == stats
+    asyncio.run(lead_stats_service.rebuild(total_segments=2))
+    assert client.get("/leads/stats", headers=headers).json() == stats
+
+    live = [lead["id"] for lead in client.get("/leads/", headers=headers).json()]
+    assert live == [ids["new"]]
+    assert client.get(f"/leads/{ids['lost']}", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+
+    response = client.get("/leads/archive", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    archived = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(lead["id"] for lead in archived) == sorted([ids["lost"], ids["converted"]])
+
+    lost = client.get("/leads/archive", params={"status": "lost"}, headers=headers).text.splitlines()
+    assert [json.loads(line)["id"] for line in lost] == [ids["lost"]]
+    assert client.get("/leads/archive", params={"end": "2000-01-01"}, headers=headers).text == ""
+
+def test_archive_keeps_leads_changed_meanwhile(client, tmp_path, monkeypatch, test_lead_data):
+    """Test a lead reopened between the scan and the delete stays live and leaves the archive"""
+    monkeypatch.setattr(archive_service, "store", LocalArchiveStore(str(tmp_path)))
+    user = {"email": f"archive-{uuid4().hex[:8]}@example.com", "password": "TestPassword123!",
+            "business_name": "Archive Race Test"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", data={"username": user["email"], "password": user["password"]}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    business_id = client.get("/auth/me", headers=headers).json()["business_id"]
+
+    ids = []
+    for _ in range(2):
+        lead = {**test_lead_data, "email": f"race-{uuid4().hex[:8]}@example.com",
+                "phone": f"555{uuid4().int % 10**7:07d}"}
+        ids.append(client.post("/leads/", json=lead, headers=headers).json()["id"])
+        client.patch(f"/leads/{ids[-1]}", json={"status": "lost"}, headers=headers)
+
+    async def scan():
+        return [row async for page in db.iter_business_leads(business_id, oldest_first=True) for row in page]
+
+    rows = asyncio.run(scan())
+    client.patch(f"/leads/{ids[0]}", json={"status": "contacted"}, headers=headers)
+
+    assert asyncio.run(archive_service._archive_file(business_id, rows)) == 1
+    assert client.get(f"/leads/{ids[0]}", headers=headers).json()["status"] == "contacted"
+    assert client.get(f"/leads/{ids[1]}", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+    archived = [json.loads(line)["id"] for line in client.get("/leads/archive", headers=headers).text.splitlines()]
+    assert archived == [ids[1]]
@@ -0,0 +1,197 @@
+import asyncio
+import time
+
+import pytest
+from uuid import uuid4
+from fastapi import status
+from jose import JWTError, jwt
+
+from app.database.dynamodb import db
+from app.services import auth_service as auth_service_module
+from app.services.auth_service import AuthService
+from app.services.token_service import RevocationList, SigningKeys, TokenCache, TokenVerifier
+
+def test_register_and_login(client):
+    """Test a new user can register, log in and fetch their profile"""
+    user = {
+        "email": f"user-{uuid4().hex[:8]}@example.com",
+        "password": "TestPassword123!",
+        "business_name": "Register Test"
+    }
+    response = client.post("/auth/register", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["email"] == user["email"]
+
+    response = client.post("/auth/login", data={"username": user["email"], "password": user["password"]})
+    assert response.status_code == status.HTTP_200_OK
+    token = response.json()["access_token"]
+
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["business_name"] == user["business_name"]
+
+def test_duplicate_registration(client):
+    """Test an email can only be registered once, regardless of case"""
+    user = {
+        "email": f"dup-{uuid4().hex[:8]}@example.com",
+        "password": "TestPassword123!",
+        "business_name": "Duplicate Test"
+    }
+    response = client.post("/auth/register", json=user)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = client.post("/auth/register", json=user)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = client.post("/auth/register", json={**user, "email": user["email"].upper()})
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+def test_register_checks_legacy_users(client):
+    """Test an email held by a user without a uniqueness item cannot be registered again"""
+    email = f"legacy-{uuid4().hex[:8]}@example.com"
+    db.users_table.put_item(Item={
+        "id": str(uuid4()),
+        "email": email,
+        "business_name": "Legacy",
+        "business_id": f"biz_{uuid4().hex[:12]}",
+        "hashed_password": AuthService.get_password_hash("TestPassword123!"),
+        "is_active": True,
+        "created_at": "2024-01-01T00:00:00"
+    })
+    user = {"email": email, "password": "TestPassword123!", "business_name": "Impostor"}
+    response = client.post("/auth/register", json=user)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+def test_login_wrong_password(client, test_user_data, auth_token):
+    """Test login fails with a bad password"""
+    response = client.post(
+        "/auth/login",
+        data={"username": test_user_data["email"], "password": "wrong-password"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def _verifier(keys, cache_size=100):
+    return TokenVerifier(keys, TokenCache(cache_size), RevocationList(shared=False))
+
+def _claims(**overrides):
+    claims = {"sub": "owner@example.com", "exp": int(time.time()) + 60, "jti": uuid4().hex}
+    claims.update(overrides)
+    return claims
+
+def test_signing_key_rotation():
+    """Test tokens from any configured key verify and unknown keys are rejected"""
+    old = SigningKeys({"old": "old-secret"})
+    rotated = SigningKeys({"old": "old-secret", "new": "new-secret"}, "new")
+    verifier = _verifier(rotated)
+
+    old_token = old.sign(_claims())
+    new_token = rotated.sign(_claims())
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert verifier.verify(old_token)["sub"] == "owner@example.com"
+    assert verifier.verify(new_token)["sub"] == "owner@example.com"
+
+    with pytest.raises(JWTError):
+        _verifier(SigningKeys({"new": "new-secret"})).verify(old_token)
+    # Tokens signed before key ids existed are tried against every key
+    legacy = jwt.encode(_claims(), "old-secret", algorithm="HS256")
+    assert verifier.verify(legacy)["sub"] == "owner@example.com"
+
+def test_token_cache():
+    """Test cached tokens skip decoding but still expire and honour revocation"""
+    keys = SigningKeys({"k": "secret"})
+    verifier = _verifier(keys, cache_size=2)
+    token = keys.sign(_claims())
+
+    verifier.verify(token)
+    verifier.verify(token)
+    assert (verifier.cache.hits, verifier.cache.misses) == (1, 1)
+
+    # Bounded: older entries are evicted
+    for _ in range(2):
+        verifier.verify(keys.sign(_claims()))
+    verifier.verify(token)
+    assert verifier.cache.misses == 4
+
+    # Expiry applies to cached claims too
+    verifier.cache.put("expired", {"exp": time.time() - 1})
+    assert verifier.cache.get("expired") is None
+
+    claims = verifier.verify(token)
+    asyncio.run(verifier.revoke(claims))
+    with pytest.raises(JWTError):
+        verifier.verify(token)
+
+def test_tampered_token_rejected(client, auth_token):
+    """Test a token with a modified signature is unauthorized"""
+    tampered = auth_token[:-2] + ("AA" if not auth_token.endswith("AA") else "BB")
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {tampered}"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def _login(client):
+    user = {"email": f"refresh-{uuid4().hex[:8]}@example.com", "password": "TestPassword123!",
+            "business_name": "Refresh Test"}
+    client.post("/auth/register", json=user)
+    response = client.post("/auth/login", data={"username": user["email"], "password": user["password"]})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+def test_refresh_rotates_tokens(client, monkeypatch):
+    """Test refreshing returns new working tokens without checking the password"""
+    tokens = _login(client)
+    assert tokens["refresh_token"] and tokens["expires_in"] > 0
+
+    def no_bcrypt(*args):
+        raise AssertionError("refresh must not verify passwords")
+    monkeypatch.setattr(AuthService, "verify_password", staticmethod(no_bcrypt))
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_200_OK
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert me.status_code == status.HTTP_200_OK
+
+    response = client.post("/auth/refresh", json={"refresh_token": "not-a-token"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_refresh_reuse_revokes_family(client, monkeypatch):
+    """Test replaying a used refresh token revokes every token from that login"""
+    # Past the grace window for concurrent refreshes
+    monkeypatch.setattr(auth_service_module, "REFRESH_REUSE_GRACE_SECONDS", -1)
+    tokens = _login(client)
+    refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {refreshed['access_token']}"})
+    assert me.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_refresh_mismatch_does_not_revoke(client):
+    """Test forged secrets and concurrent refreshes are rejected without logging the user out"""
+    tokens = _login(client)
+    family_id = tokens["refresh_token"].split(".")[0]
+
+    response = client.post("/auth/refresh", json={"refresh_token": f"{family_id}.garbage"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    # A second tab refreshing with the same token just after the first
+    refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == status.HTTP_200_OK
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+    assert me.status_code == status.HTTP_200_OK
+
+def test_logout(client):
+    """Test logout revokes the access token and its refresh token"""
+    tokens = _login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/auth/logout", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+
+    assert client.get("/auth/me", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
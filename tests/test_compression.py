@@ -0,0 +1,110 @@
+import asyncio
+import gzip
+import json
+
+import zstandard
+from fastapi import status
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+BIG = "lead " * 1000
+
+async def big(request):
+    return PlainTextResponse(BIG)
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+async def stream(request):
+    async def lines():
+        for i in range(200):
+            yield f'{{"line": {i}, "pad": "{"x" * 20}"}}\n'
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+async def events(request):
+    return StreamingResponse(iter([BIG]), media_type="text/event-stream")
+
+def _client(**options):
+    app = Starlette(routes=[Route("/big", big), Route("/small", small),
+                            Route("/stream", stream), Route("/events", events)])
+    app.add_middleware(CompressionMiddleware, **options)
+    return TestClient(app)
+
+def test_negotiate_encoding():
+    """Test q-values win and ties go to the server's preference"""
+    encodings = ["zstd", "br", "gzip"]
+    assert negotiate_encoding("gzip, deflate, br, zstd", encodings) == "zstd"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", encodings) == "gzip"
+    assert negotiate_encoding("*", encodings) == "zstd"
+    assert negotiate_encoding("br;q=0, identity", encodings) is None
+    assert negotiate_encoding("", encodings) is None
+
+def test_compresses_above_threshold():
+    """Test large bodies are compressed for each encoding and small ones are not"""
+    client = _client(minimum_size=500)
+    for encoding in ("gzip", "br"):
+        response = client.get("/big", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(BIG)
+        assert response.text == BIG
+
+    # httpx does not decode zstd itself
+    response = client.get("/big", headers={"Accept-Encoding": "zstd"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(response.content).decode() == BIG
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+def test_streaming_compression():
+    """Test streams are compressed incrementally and event streams are left alone"""
+    scope = {"type": "http", "method": "GET", "path": "/stream", "query_string": b"",
+             "headers": [(b"accept-encoding", b"gzip")]}
+    messages = []
+
+    async def receive():
+        # The client stays connected until the response is done
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    async def app(scope, receive, send):
+        response = await stream(None)
+        await response(scope, receive, send)
+
+    middleware = CompressionMiddleware(app, minimum_size=500, encodings=["gzip"])
+    asyncio.run(middleware(scope, receive, send))
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    chunks = [message["body"] for message in messages[1:]]
+    # Flushed as the stream goes, not buffered into one body
+    assert len(chunks) > 10
+    assert messages[-1].get("more_body", False) is False
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    assert [json.loads(line)["line"] for line in lines] == list(range(200))
+
+    response = _client(minimum_size=500).get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BIG
+
+def test_api_responses_are_compressed(client, auth_token, test_lead_data):
+    """Test lead listings are compressed through the app's middleware"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for _ in range(5):
+        client.post("/leads/", json=test_lead_data, headers=headers)
+    response = client.get("/leads/?limit=100", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) >= 5
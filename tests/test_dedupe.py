@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from uuid import uuid4
+from fastapi import status
+
+from app.config import settings
+from app.database.dynamodb import db
+from app.utils.validators import normalize_email, normalize_phone
+from app.services.dedupe_service import contact_keys
+
+def test_normalize_contact_details():
+    """Test email and phone normalisation"""
+    assert normalize_email(" John.Doe+promo@Example.COM ") == "john.doe@example.com"
+    assert normalize_email("not-an-email") is None
+    assert normalize_phone("+1 (555) 555-1234") == "5555551234"
+    assert normalize_phone("5555551234") == "5555551234"
+    assert contact_keys({"email": "a+b@x.io", "phone": "15555551234"}) == [
+        "email#a@x.io",
+        "phone#5555551234"
+    ]
+
+def test_duplicate_lead_flagged(client, auth_token, test_lead_data):
+    """Test a repeat submission is flagged as a duplicate of the first lead"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    phone = f"555{uuid4().int % 10**7:07d}"
+    lead = {**test_lead_data, "email": f"dup-{uuid4().hex[:8]}@example.com", "phone": phone}
+
+    first = client.post("/leads/", json=lead, headers=headers).json()
+    assert first["duplicate_of"] is None
+
+    repeat = {**lead, "email": lead["email"].replace("@", "+again@").upper(), "phone": f"+1{phone}"}
+    response = client.post("/leads/", json=repeat, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["duplicate_of"] == first["id"]
+
+    # Deleting the original frees its contact details
+    client.delete(f"/leads/{first['id']}", headers=headers)
+    third = client.post("/leads/", json=lead, headers=headers).json()
+    assert third["duplicate_of"] is None
+
+def _unique_lead(test_lead_data):
+    return {**test_lead_data, "email": f"dup-{uuid4().hex[:8]}@example.com", "phone": f"555{uuid4().int % 10**7:07d}"}
+
+def test_duplicate_lead_rejected(client, auth_token, test_lead_data, monkeypatch):
+    """Test reject mode answers a repeat submission with 409"""
+    monkeypatch.setattr(settings, "DEDUPE_MODE", "reject")
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    lead = _unique_lead(test_lead_data)
+
+    assert client.post("/leads/", json=lead, headers=headers).status_code == status.HTTP_201_CREATED
+    assert client.post("/leads/", json=lead, headers=headers).status_code == status.HTTP_409_CONFLICT
+
+def test_duplicate_lead_merged(client, auth_token, test_lead_data, monkeypatch):
+    """Test merge mode returns the existing lead with the new message appended"""
+    monkeypatch.setattr(settings, "DEDUPE_MODE", "merge")
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    lead = _unique_lead(test_lead_data)
+
+    first = client.post("/leads/", json=lead, headers=headers).json()
+    response = client.post("/leads/", json={**lead, "message": "Also need a quote"}, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    merged = response.json()
+    assert merged["id"] == first["id"]
+    assert merged["message"] == f"{lead['message']}\n\nAlso need a quote"
+
+def test_merge_with_missing_owner(client, auth_token, test_lead_data, monkeypatch):
+    """Test a key owned by a lead that is gone stores the new lead without claiming keys"""
+    monkeypatch.setattr(settings, "DEDUPE_MODE", "merge")
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    business_id = client.get("/auth/me", headers=headers).json()["business_id"]
+    lead = _unique_lead(test_lead_data)
+    key = contact_keys(lead)[0]
+    asyncio.run(db.claim_contact_key(business_id, key, "missing-lead"))
+
+    response = client.post("/leads/", json=lead, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    created = response.json()
+    assert created["id"] != "missing-lead" and created["duplicate_of"] is None
+
+    # The lead never claimed the key, so deleting it leaves the key alone
+    assert client.delete(f"/leads/{created['id']}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+    assert asyncio.run(db.claim_contact_key(business_id, key, "other-lead")) == "missing-lead"
+
+def test_delete_lead_that_never_claimed_keys(client, auth_token, test_lead_data, monkeypatch):
+    """Test a lead created with dedupe off can be deleted while another lead owns its keys"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    lead = _unique_lead(test_lead_data)
+    owner = client.post("/leads/", json=lead, headers=headers).json()
+
+    monkeypatch.setattr(settings, "DEDUPE_MODE", "off")
+    unchecked = client.post("/leads/", json=lead, headers=headers).json()
+    assert unchecked["duplicate_of"] is None
+    assert client.delete(f"/leads/{unchecked['id']}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+
+    # The owner keeps its keys
+    monkeypatch.setattr(settings, "DEDUPE_MODE", "flag")
+    assert client.post("/leads/", json=lead, headers=headers).json()["duplicate_of"] == owner["id"]
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import pytest
+from fastapi import status
+from uuid import uuid4
+
+from app.config import settings
+from app.database.dynamodb import db
+from app.main import app
+from app.models.lead import LeadCreate
+from app.services.lead_feed import DynamoDBBroker, LeadFeed, RESYNC_EVENT, format_sse, lead_feed
+from app.services.lead_service import lead_service
+
+def _event(event_id, business_id="biz"):
+    return {"event_id": event_id, "type": "lead.created", "business_id": business_id, "lead_id": event_id}
+
+def test_fan_out_per_tenant():
+    """Test events only reach subscribers of the same business"""
+    async def run():
+        feed = LeadFeed()
+        mine = feed.subscribe("biz")
+        other = feed.subscribe("other")
+        await feed.publish(_event("e1"))
+        assert mine.queue.get_nowait()["event_id"] == "e1"
+        assert other.queue.empty()
+
+        feed.unsubscribe(mine)
+        feed.unsubscribe(other)
+        assert feed.subscriber_count() == 0
+
+    asyncio.run(run())
+
+def test_resume_from_last_event_id():
+    """Test reconnecting replays missed events, or asks for a resync"""
+    async def run():
+        feed = LeadFeed(history_size=3)
+        for i in range(4):
+            await feed.publish(_event(f"e{i}"))
+
+        resumed = feed.subscribe("biz", last_event_id="e1")
+        assert [resumed.queue.get_nowait()["event_id"] for _ in range(2)] == ["e2", "e3"]
+
+        too_old = feed.subscribe("biz", last_event_id="e0")
+        assert too_old.queue.get_nowait() == RESYNC_EVENT
+
+    asyncio.run(run())
+
+def test_slow_subscriber_backpressure():
+    """Test a full queue is replaced by a single resync event"""
+    async def run():
+        feed = LeadFeed(queue_size=2)
+        slow = feed.subscribe("biz")
+        for i in range(5):
+            await feed.publish(_event(f"e{i}"))
+        assert slow.queue.qsize() <= 2
+        items = [slow.queue.get_nowait() for _ in range(slow.queue.qsize())]
+        assert RESYNC_EVENT in items
+
+    asyncio.run(run())
+
+def test_format_sse():
+    """Test SSE message framing"""
+    message = format_sse(_event("e1"))
+    assert message.startswith("event: lead.created\nid: e1\ndata: {")
+    assert message.endswith("\n\n")
+
+def test_stream_requires_auth(client):
+    """Test the stream endpoint requires authentication"""
+    response = client.get("/leads/stream")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_feed_crosses_workers():
+    """Test an event published by one worker reaches another worker's subscribers"""
+    async def run():
+        publisher = LeadFeed(DynamoDBBroker(db, poll_interval=0.05))
+        receiver = LeadFeed(DynamoDBBroker(db, poll_interval=0.05))
+        business_id = f"biz_{uuid4().hex[:12]}"
+        subscription = receiver.subscribe(business_id)
+
+        await publisher.publish(_event("e1", business_id))
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=5)
+        assert event["event_id"] == "e1"
+        # Re-reading the lookback window does not deliver it twice
+        await receiver.broker.poll()
+        assert subscription.queue.empty()
+        receiver.unsubscribe(subscription)
+
+    asyncio.run(run())
+
+def test_feed_resumes_after_last_subscriber_leaves():
+    """Test events published while nobody was subscribed are replayed on reconnect"""
+    async def run():
+        publisher = LeadFeed(DynamoDBBroker(db, poll_interval=0.05))
+        receiver = LeadFeed(DynamoDBBroker(db, poll_interval=0.05))
+        business_id = f"biz_{uuid4().hex[:12]}"
+        subscription = receiver.subscribe(business_id)
+        await publisher.publish(_event("e1", business_id))
+        assert (await asyncio.wait_for(subscription.queue.get(), timeout=5))["event_id"] == "e1"
+        receiver.unsubscribe(subscription)
+
+        await publisher.publish(_event("e2", business_id))
+        await asyncio.sleep(0.2)
+        resumed = receiver.subscribe(business_id, last_event_id="e1")
+        assert (await asyncio.wait_for(resumed.queue.get(), timeout=5))["event_id"] == "e2"
+        receiver.unsubscribe(resumed)
+
+        # Past the feed retention the gap cannot be filled, so the client resyncs
+        receiver.broker._read_from[business_id] -= receiver.broker.ttl_seconds
+        stale = receiver.subscribe(business_id, last_event_id="e2")
+        assert stale.queue.get_nowait() == RESYNC_EVENT
+        receiver.unsubscribe(stale)
+
+    asyncio.run(run())
+
+def test_no_feed_writes_on_lambda(client, auth_token, test_lead_data, monkeypatch):
+    """Test lead writes on Lambda, where the feed is unavailable, publish nothing"""
+    published = []
+
+    async def record(event):
+        published.append(event)
+    monkeypatch.setattr(lead_feed, "publish", record)
+    monkeypatch.setattr(settings, "AWS_LAMBDA_FUNCTION_NAME", "localassist-api")
+    response = client.post("/leads/", json=test_lead_data, headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert published == []
+
+def test_stream_delivers_events(client, auth_token, test_lead_data):
+    """Test the stream endpoint sends a lead created after connecting"""
+    business_id = client.get("/auth/me", headers={"Authorization": f"Bearer {auth_token}"}).json()["business_id"]
+    scope = {"type": "http", "method": "GET", "path": "/leads/stream", "query_string": b"",
+             "root_path": "", "scheme": "http", "server": ("testserver", 80),
+             "headers": [(b"authorization", f"Bearer {auth_token}".encode())]}
+    messages = []
+    received_event = asyncio.Event()
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+        if b"event: lead.created" in message.get("body", b""):
+            received_event.set()
+
+    async def run():
+        stream = asyncio.create_task(app(scope, receive, send))
+        while lead_feed.subscriber_count(business_id) == 0:
+            await asyncio.sleep(0.01)
+        lead = await lead_service.create_lead(LeadCreate(**test_lead_data), business_id)
+        await asyncio.wait_for(received_event.wait(), timeout=5)
+        stream.cancel()
+        return lead
+
+    lead = asyncio.run(run())
+    assert messages[0]["status"] == status.HTTP_200_OK
+    body = b"".join(message.get("body", b"") for message in messages[1:]).decode()
+    data = [line[len("data: "):] for line in body.splitlines() if line.startswith("data: ")]
+    assert json.loads(data[0])["lead_id"] == lead.id
+
+def test_stream_unavailable_on_lambda(client, auth_token, monkeypatch):
+    """Test the stream endpoint answers 501 on Lambda, which buffers responses"""
+    monkeypatch.setattr(settings, "AWS_LAMBDA_FUNCTION_NAME", "localassist-api")
+    response = client.get("/leads/stream", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
@@ -0,0 +1,138 @@
+import asyncio
+import heapq
+import time
+
+from uuid import uuid4
+from fastapi import status
+from starlette.responses import PlainTextResponse
+
+from app.config import settings
+from app.middleware.load_shedding import GradientLimit, LoadShedder, LoadSheddingMiddleware
+
+def _backend(workers, service_time):
+    capacity = asyncio.Semaphore(workers)
+
+    async def app(scope, receive, send):
+        async with capacity:
+            await asyncio.sleep(service_time)
+        await PlainTextResponse("ok")(scope, receive, send)
+    return app
+
+async def _call(app, path, authorization=True):
+    headers = [(b"authorization", b"Bearer x")] if authorization else []
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return messages[0], time.perf_counter() - start
+
+def test_rejects_over_limit_by_priority():
+    """Test requests over their class's share get 503 with Retry-After and critical ones never do"""
+    shedder = LoadShedder(GradientLimit(initial_limit=4, min_limit=4, max_limit=4),
+                          bulk_paths=("/leads/archive",), exempt_paths=("/leads/stream",))
+    assert shedder.classify("GET", "/leads/", True) == "interactive"
+    assert shedder.classify("POST", "/leads/", True) == "normal"
+    assert shedder.classify("GET", "/auth/me", True) == "normal"
+    assert shedder.classify("GET", "/leads/", False) == "normal"
+    assert shedder.classify("GET", "/leads/archive", True) == "bulk"
+    assert shedder.classify("GET", "/health", False) == "critical"
+    assert shedder.classify("GET", "/leads/stream", True) is None
+
+    shedder.inflight = 2
+    assert not shedder.try_acquire("bulk")
+    assert shedder.try_acquire("interactive")
+    shedder.inflight = 4
+    assert not shedder.try_acquire("interactive")
+    assert shedder.try_acquire("critical")
+
+    middleware = LoadSheddingMiddleware(_backend(1, 0), shedder)
+    start, _ = asyncio.run(_call(middleware, "/leads/"))
+    assert start["status"] == 503
+    assert (b"retry-after", b"1") in start["headers"]
+    assert shedder.rejected == {"bulk": 1, "interactive": 2}
+
+def test_limit_follows_latency():
+    """Test the limit shrinks when latency inflates and grows back when it recovers"""
+    limit = GradientLimit(initial_limit=50, min_limit=5, max_limit=100)
+    for _ in range(50):
+        limit.on_sample(0.010, inflight=50)
+    assert limit.limit == 100
+    for _ in range(50):
+        limit.on_sample(0.100, inflight=100)
+    assert limit.limit < 20
+    low = limit.limit
+    for _ in range(50):
+        limit.on_sample(0.010, inflight=int(limit.limit))
+    assert limit.limit > low
+
+def test_bulk_latency_does_not_shrink_limit():
+    """Test slow bulk requests are counted in flight but do not feed the limit"""
+    shedder = LoadShedder(GradientLimit(initial_limit=10, min_limit=1, max_limit=10),
+                          bulk_paths=("/leads/archive",))
+    for _ in range(20):
+        assert shedder.try_acquire("interactive")
+        shedder.release(0.010, "interactive")
+    # Slow bulk completions while the limit is fully used
+    for _ in range(50):
+        shedder.inflight = 10
+        shedder.release(5.0, "bulk")
+    assert shedder.limit.limit == 10
+    assert max(shedder.latencies) == 0.010
+
+def test_overload_keeps_latency_bounded():
+    """Test sustained 2x overload keeps served p99 bounded and sheds bulk first"""
+    # Simulated on a fake clock: 4 workers serving FIFO at 20 ms per request
+    # (200 req/s) get 400 req/s for two seconds. scripts/overload_test.py
+    # runs the same scenario in real time through the middleware.
+    service_time = 0.02
+    free_at = [0.0] * 4
+    shedder = LoadShedder(GradientLimit(initial_limit=50), bulk_paths=("/leads/archive",))
+    completions = []
+    results = []
+    for tick in range(400):
+        now = tick * 0.005
+        while completions and completions[0][0] <= now:
+            _, latency, priority = heapq.heappop(completions)
+            shedder.release(latency, priority)
+        for i in range(2):
+            path = "/leads/archive" if (tick + i) % 3 == 0 else "/leads/"
+            priority = shedder.classify("GET", path, True)
+            if not shedder.try_acquire(priority):
+                results.append((path, 503, 0.0))
+                continue
+            worker = min(range(len(free_at)), key=free_at.__getitem__)
+            free_at[worker] = max(now, free_at[worker]) + service_time
+            latency = free_at[worker] - now
+            heapq.heappush(completions, (free_at[worker], latency, priority))
+            results.append((path, 200, latency))
+
+    served = sorted(latency for _, code, latency in results if code == 200)
+    p99 = served[int(0.99 * len(served))]
+    # Unprotected, the queue would reach ~400 requests (about two seconds)
+    assert p99 < 0.5
+
+    def shed_rate(path):
+        codes = [code for p, code, _ in results if p == path]
+        return codes.count(503) / len(codes)
+    assert shed_rate("/leads/archive") > shed_rate("/leads/")
+    assert shedder.metrics()["rejected"]
+
+def test_health_and_metrics(client, monkeypatch):
+    """Test the app serves health checks through the middleware and admins can read its metrics"""
+    assert client.get("/health").status_code == status.HTTP_200_OK
+
+    user = {"email": f"ops-{uuid4().hex[:8]}@example.com", "password": "TestPassword123!",
+            "business_name": "Ops Test"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", data={"username": user["email"], "password": user["password"]}).json()
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", user["email"])
+    response = client.get("/admin/load", headers={"Authorization": f"Bearer {token['access_token']}"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["admitted"]["critical"] >= 1
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+from uuid import uuid4
+from fastapi import status
+
+from app.config import settings
+from app.services.profiler import request_profiler, sign_profile_request
+from app.utils.profiling import Profile, current_profile, profiled_methods, span
+
+SECRET = "profile-test-secret"
+
+@pytest.fixture
+def profiler(monkeypatch, tmp_path):
+    """The app's profiler with a known secret, no random sampling and a temp directory"""
+    monkeypatch.setattr(request_profiler, "secret", SECRET)
+    monkeypatch.setattr(request_profiler, "sample_rate", 0.0)
+    monkeypatch.setattr(request_profiler, "directory", str(tmp_path))
+    yield request_profiler
+    request_profiler.disable()
+
+def _admin(client, monkeypatch):
+    user = {"email": f"admin-{uuid4().hex[:8]}@example.com", "password": "TestPassword123!",
+            "business_name": "Admin Test"}
+    client.post("/auth/register", json=user)
+    response = client.post("/auth/login", data={"username": user["email"], "password": user["password"]})
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", user["email"])
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_spans_only_record_while_profiling():
+    """Test spans and decorated methods time into the current profile, and do nothing otherwise"""
+    @profiled_methods("store")
+    class Store:
+        def get(self, key):
+            time.sleep(0.001)
+            return key
+
+        async def put(self, key):
+            return key
+
+        def _private(self):
+            return None
+
+    store = Store()
+    assert store.get("a") == "a"
+
+    profile = Profile("p", "GET", "/", "test")
+    token = current_profile.set(profile)
+    try:
+        store.get("a")
+        asyncio.run(store.put("b"))
+        store._private()
+        with span("bcrypt"):
+            pass
+    finally:
+        current_profile.reset(token)
+
+    assert set(profile.spans) == {"store.get", "store.put", "bcrypt"}
+    assert profile.spans["store.get"][0] == 1 and profile.spans["store.get"][1] >= 0.001
+
+def test_signed_header_profiles_request(client, auth_token, profiler, monkeypatch):
+    """Test a signed X-Profile header produces a stored profile readable by admins"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = client.get("/leads/", headers={**headers, "X-Profile": sign_profile_request(SECRET, "GET", "/leads/")})
+    assert response.status_code == status.HTTP_200_OK
+    profile_id = response.headers["X-Profile-Id"]
+
+    admin_headers = _admin(client, monkeypatch)
+    response = client.get(f"/admin/profiles/{profile_id}", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    profile = response.json()
+    assert profile["reason"] == "header" and profile["status_code"] == 200
+    assert "jwt" in profile["breakdown"]
+    assert any(category.startswith("dynamodb.") for category in profile["breakdown"])
+
+    response = client.get(f"/admin/profiles/{profile_id}/folded", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    listed = client.get("/admin/profiles", headers=admin_headers).json()
+    assert [p["id"] for p in listed] == [profile_id]
+
+    # Not for other users
+    assert client.get("/admin/profiles", headers=headers).status_code == status.HTTP_403_FORBIDDEN
+
+def test_bad_signatures_are_not_profiled(client, auth_token, profiler):
+    """Test unsigned, wrongly signed, stale or mismatched headers are ignored"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for value in (
+        "yes",
+        sign_profile_request("wrong-secret", "GET", "/leads/"),
+        sign_profile_request(SECRET, "GET", "/leads", int(time.time()) - 3600),
+        sign_profile_request(SECRET, "GET", "/auth/me"),
+    ):
+        response = client.get("/leads/", headers={**headers, "X-Profile": value})
+        assert response.status_code == status.HTTP_200_OK
+        assert "X-Profile-Id" not in response.headers
+    assert profiler.list_profiles() == []
+
+def test_unsaved_profile_has_no_id(client, auth_token, profiler, monkeypatch, tmp_path):
+    """Test no X-Profile-Id is returned when the profile cannot be written"""
+    blocked = tmp_path / "not-a-directory"
+    blocked.write_text("")
+    monkeypatch.setattr(profiler, "directory", str(blocked / "profiles"))
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = client.get("/leads/", headers={**headers, "X-Profile": sign_profile_request(SECRET, "GET", "/leads/")})
+    assert response.status_code == status.HTTP_200_OK
+    assert "X-Profile-Id" not in response.headers
+
+def test_profiles_pruned_on_interval(client, auth_token, profiler, monkeypatch):
+    """Test stored profiles beyond the limit are removed once the prune interval passes"""
+    monkeypatch.setattr(profiler, "max_profiles", 1)
+    monkeypatch.setattr(profiler, "prune_interval", 3600)
+    monkeypatch.setattr(profiler, "_next_prune", 0.0)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    def profiled_request():
+        client.get("/leads/", headers={**headers, "X-Profile": sign_profile_request(SECRET, "GET", "/leads/")})
+
+    profiled_request()
+    profiled_request()
+    assert len(profiler.list_profiles()) == 2
+
+    monkeypatch.setattr(profiler, "_next_prune", 0.0)
+    profiled_request()
+    assert len(profiler.list_profiles()) == 1
+
+def test_profile_dir_on_lambda(monkeypatch):
+    """Test relative profile directories move under /tmp on Lambda"""
+    monkeypatch.setattr(settings, "PROFILE_DIR", "profiles")
+    assert settings.get_profile_dir() == "profiles"
+    monkeypatch.setattr(settings, "AWS_LAMBDA_FUNCTION_NAME", "localassist-api")
+    assert settings.get_profile_dir() == "/tmp/profiles"
+    monkeypatch.setattr(settings, "PROFILE_DIR", "/mnt/profiles")
+    assert settings.get_profile_dir() == "/mnt/profiles"
+
+def test_admin_toggle(client, auth_token, profiler, monkeypatch):
+    """Test the admin toggle profiles matching paths until switched off"""
+    admin_headers = _admin(client, monkeypatch)
+    response = client.post("/admin/profiling", json={"enabled": True, "path_prefix": "/auth/me"},
+                           headers=admin_headers)
+    assert response.json()["enabled"] is True
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert "X-Profile-Id" in client.get("/auth/me", headers=headers).headers
+    assert "X-Profile-Id" not in client.get("/leads/", headers=headers).headers
+
+    client.post("/admin/profiling", json={"enabled": False}, headers=admin_headers)
+    assert "X-Profile-Id" not in client.get("/auth/me", headers=headers).headers
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from uuid import uuid4
+
+from app.database.dynamodb import db
+from app.database.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_flight():
+    """Test identical concurrent calls run once and errors reach every caller"""
+    flight = SingleFlight()
+    calls = []
+
+    async def read(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return {"value": value}
+
+    async def failing():
+        calls.append("boom")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        results = await asyncio.gather(
+            *(flight.do(("biz_1", "get", "a"), lambda: read("a")) for _ in range(5)),
+            flight.do(("biz_1", "get", "b"), lambda: read("b"))
+        )
+        errors = await asyncio.gather(
+            *(flight.do(("biz_1", "get", "c"), failing) for _ in range(3)),
+            return_exceptions=True
+        )
+        return results, errors
+
+    results, errors = asyncio.run(run())
+    assert [r["value"] for r in results] == ["a"] * 5 + ["b"]
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert calls == ["a", "b", "boom"]
+    assert flight.metrics()["collapsed"] == 6
+    assert flight.metrics()["inflight"] == 0
+
+def test_bounded_keys_forget_and_cancel():
+    """Test the key space is bounded, writes stop sharing, and cancelling one caller spares the rest"""
+    flight = SingleFlight(max_keys=1)
+    calls = []
+
+    async def read(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run():
+        first = asyncio.ensure_future(flight.do(("biz_1", "a"), lambda: read(1)))
+        await asyncio.sleep(0)
+        # The key space is full: run uncoalesced
+        assert await flight.do(("biz_1", "b"), lambda: read(2)) == 2
+
+        joined = asyncio.ensure_future(flight.do(("biz_1", "a"), lambda: read(3)))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await joined == 1
+
+        waiting = asyncio.ensure_future(flight.do(("biz_1", "a"), lambda: read(4)))
+        await asyncio.sleep(0)
+        flight.forget("biz_1")
+        # Started after the "write": not joined to the earlier call
+        assert await flight.do(("biz_1", "a"), lambda: read(5)) == 5
+        return await waiting
+
+    assert asyncio.run(run()) == 4
+    assert sorted(calls) == [1, 2, 4, 5]
+    assert flight.bypassed == 1
+
+def test_dynamodb_reads_are_coalesced(client, auth_token, test_lead_data):
+    """Test concurrent identical lead reads against DynamoDB share one call"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    lead = client.post("/leads/", json={**test_lead_data, "email": f"c-{uuid4().hex[:8]}@example.com"},
+                       headers=headers).json()
+
+    async def burst():
+        return await asyncio.gather(
+            *(db.get_lead(lead["id"], lead["business_id"]) for _ in range(5)),
+            *(db.list_leads(lead["business_id"], None, 10) for _ in range(3))
+        )
+
+    before = db.reads.collapsed
+    results = asyncio.run(burst())
+    assert all(item["id"] == lead["id"] for item in results[:5])
+    assert all(any(item["id"] == lead["id"] for item in items) for items in results[5:])
+    assert db.reads.collapsed - before == 6
+
+    # A write makes later reads start a fresh call
+    response = client.patch(f"/leads/{lead['id']}", json={"status": "contacted"}, headers=headers)
+    assert response.json()["status"] == "contacted"
+    assert client.get(f"/leads/{lead['id']}", headers=headers).json()["status"] == "contacted"
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+from fastapi import status
+
+from app.database.dynamodb import db, decode_cursor
+from app.services.lead_service import encode_session_token, merge_recent_writes
+
+def _lead(lead_id, created_at, lead_status="new"):
+    return {"id": lead_id, "created_at": created_at, "status": lead_status}
+
+def test_merge_recent_writes():
+    """Test buffered leads are merged newest first without duplicates, filters or page overflow"""
+    listed = [_lead("b", "2026-01-02"), _lead("a", "2026-01-01")]
+    recent = [_lead("b", "2026-01-02"), _lead("c", "2026-01-03"), _lead("d", "2026-01-04", "lost")]
+
+    items, cursor = merge_recent_writes(listed, recent, None, 10, None)
+    assert [item["id"] for item in items] == ["d", "c", "b", "a"] and cursor is None
+
+    items, _ = merge_recent_writes(listed, recent, "new", 10, None)
+    assert [item["id"] for item in items] == ["c", "b", "a"]
+
+    # Leads pushed off the page are reached through the cursor
+    items, cursor = merge_recent_writes(listed, recent, None, 2, None)
+    assert [item["id"] for item in items] == ["d", "c"]
+    assert decode_cursor(cursor) == ("2026-01-03", "c")
+
+    assert merge_recent_writes(listed, [], None, 10, "next") == (listed, "next")
+
+def test_session_token_reads_own_writes(client, monkeypatch):
+    """Test a lead missing from a lagging index is listed for the client that created it"""
+    user = {"email": f"ryw-{uuid4().hex[:8]}@example.com", "password": "TestPassword123!",
+            "business_name": "Read Your Writes"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", data={"username": user["email"], "password": user["password"]}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    response = client.post("/leads/", headers=headers, json={
+        "first_name": "Fresh", "last_name": "Lead", "email": f"fresh-{uuid4().hex[:8]}@example.com",
+        "phone": f"555{uuid4().int % 10**7:07d}", "source": "website"
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    lead_id = response.json()["id"]
+    session = response.headers["X-Session-Token"]
+
+    # The index has not caught up with the write yet
+    async def lagging_index(business_id, status=None, limit=100, cursor=None):
+        return [], None
+    monkeypatch.setattr(db, "list_leads_page", lagging_index)
+
+    assert client.get("/leads/", headers=headers).json() == []
+    listed = client.get("/leads/", headers={**headers, "X-Session-Token": session}).json()
+    assert [lead["id"] for lead in listed] == [lead_id]
+    filtered = client.get("/leads/?status=lost", headers={**headers, "X-Session-Token": session}).json()
+    assert filtered == []
+
+    # Merged leads are listed as they are now, not as buffered
+    client.patch(f"/leads/{lead_id}", headers=headers, json={"status": "lost"})
+    filtered = client.get("/leads/?status=lost", headers={**headers, "X-Session-Token": session}).json()
+    assert [(lead["id"], lead["status"]) for lead in filtered] == [(lead_id, "lost")]
+    assert client.get("/leads/?status=new", headers={**headers, "X-Session-Token": session}).json() == []
+
+    # The buffer is read past its first page
+    query = db.meta_table.query
+    monkeypatch.setattr(db.meta_table, "query", lambda **kwargs: query(Limit=1, **kwargs))
+    client.post("/leads/", headers=headers, json={
+        "first_name": "Second", "last_name": "Lead", "email": f"second-{uuid4().hex[:8]}@example.com",
+        "phone": f"555{uuid4().int % 10**7:07d}", "source": "website"
+    })
+    listed = client.get("/leads/", headers={**headers, "X-Session-Token": session}).json()
+    assert len(listed) == 2
+    monkeypatch.setattr(db.meta_table, "query", query)
+
+    aware = encode_session_token(datetime.now(timezone.utc))
+    for token in ("not-a-token", aware):
+        response = client.get("/leads/", headers={**headers, "X-Session-Token": token})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    # Deleted leads leave the buffer with them
+    for lead in listed:
+        assert client.delete(f"/leads/{lead['id']}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+    assert client.get("/leads/", headers={**headers, "X-Session-Token": session}).json() == []
@@ -0,0 +1,62 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from app.database.row_codec import RowCodec, lead_codec, user_codec
+from app.models.lead import Lead
+from app.models.user import User
+
+ROW = {
+    "id": "lead-1",
+    "business_id": "biz_codec",
+    "shard_key": "biz_codec#0",
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "john@example.com",
+    "phone": "5555551234",
+    "company": None,
+    "message": "Hi",
+    "source": "website",
+    "status": "new",
+    "duplicate_of": None,
+    "created_at": "2026-01-02T03:04:05.123456",
+    "updated_at": "2026-01-02T03:04:05.123456"
+}
+
+def test_trusted_decode_matches_validation():
+    """Test the trusted codec builds the same Lead as validation and round-trips"""
+    lead = lead_codec.decode(ROW)
+    assert lead == Lead(**ROW)
+    assert lead.created_at == datetime(2026, 1, 2, 3, 4, 5, 123456)
+
+    item = lead_codec.encode(lead)
+    assert "score" not in item and "shard_key" not in item
+    assert item == {key: value for key, value in ROW.items() if key != "shard_key"}
+
+    ranked = lead_codec.decode(ROW, score=0.5)
+    assert ranked.score == 0.5
+
+    user = user_codec.decode({"id": "u1", "email": "a@example.com", "business_name": "A",
+                              "business_id": "biz_a", "hashed_password": "x"})
+    assert user == User(id="u1", email="a@example.com", business_name="A", business_id="biz_a")
+
+def test_strict_decode_validates():
+    """Test strict mode rejects rows the trusted path would accept"""
+    bad = {**ROW, "phone": "12"}
+    assert lead_codec.decode(bad).phone == "12"
+    with pytest.raises(ValidationError):
+        lead_codec.decode(bad, strict=True)
+
+def test_numbers_convert_from_decimal():
+    """Test Decimal attributes become ints and floats, and floats are stored as Decimal"""
+    class Row(BaseModel):
+        count: int
+        ratio: float | None = None
+
+    codec = RowCodec(Row)
+    row = codec.decode({"count": Decimal("3"), "ratio": Decimal("0.25")})
+    assert (row.count, row.ratio) == (3, 0.25)
+    assert isinstance(row.count, int) and isinstance(row.ratio, float)
+    assert codec.encode(row) == {"count": 3, "ratio": Decimal("0.25")}
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import status
+
+from app.database.dynamodb import db
+from app.services.scoring_service import score_batch, score_one, scoring_service
+
+def _row(**overrides):
+    row = {
+        "id": "1",
+        "source": "website",
+        "status": "new",
+        "company": None,
+        "message": "",
+        "created_at": "2026-10-01T10:00:00",
+        "updated_at": "2026-10-01T10:00:00"
+    }
+    row.update(overrides)
+    return row
+
+def test_score_batch_matches_score_one():
+    """Test the vectorised scorer agrees with the per-lead reference"""
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    rows = [
+        _row(),
+        _row(source="referral", status="qualified", company="Acme", message="Need a quote"),
+        _row(source="social", status="lost", created_at="2026-01-01T22:15:00.123456"),
+        _row(source=None, status="contacted", updated_at="2026-10-05T09:00:00"),
+    ]
+    batch = score_batch(rows, now)
+
+    assert batch.shape == (4,)
+    for row, score in zip(rows, batch.tolist()):
+        assert score == pytest.approx(score_one(row, now))
+        assert 0 <= score <= 100
+    assert score_batch([], now).shape == (0,)
+
+def test_business_hours_use_timezone():
+    """Test business hours are judged in the given timezone by both scorers"""
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    # 14:00 UTC is within hours in UTC but 07:00 in Los Angeles
+    row = _row(created_at="2026-10-01T14:00:00")
+    los_angeles = ZoneInfo("America/Los_Angeles")
+    local = score_batch([row], now, los_angeles).tolist()[0]
+    assert local == pytest.approx(score_one(row, now, los_angeles))
+    assert local < score_one(row, now, ZoneInfo("UTC"))
+
+def test_score_ordering():
+    """Test stronger signals give higher scores"""
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    recent = (now - timedelta(days=1)).isoformat()
+    old = (now - timedelta(days=90)).isoformat()
+    qualified, new, lost, stale = score_batch([
+        _row(status="qualified", created_at=recent, updated_at=recent),
+        _row(created_at=recent, updated_at=recent),
+        _row(status="lost", created_at=recent, updated_at=recent),
+        _row(created_at=old, updated_at=old),
+    ], now).tolist()
+    assert qualified > new > lost
+    assert new > stale
+
+def test_list_leads_sorted_by_score(client, auth_token, test_lead_data):
+    """Test GET /leads?sort=score after an incremental scoring run"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    business_id = client.get("/auth/me", headers=headers).json()["business_id"]
+
+    strong = client.post("/leads/", json={**test_lead_data, "source": "referral"}, headers=headers).json()["id"]
+    weak = client.post(
+        "/leads/", json={**test_lead_data, "source": "social", "company": None, "message": None}, headers=headers
+    ).json()["id"]
+    client.patch(f"/leads/{strong}", json={"status": "qualified"}, headers=headers)
+    client.patch(f"/leads/{weak}", json={"status": "lost"}, headers=headers)
+
+    result = asyncio.run(scoring_service.score_business(business_id))
+    assert result["scored"] >= 2
+
+    response = client.get("/leads/", params={"sort": "score", "limit": 1000}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    leads = response.json()
+    scores = [lead["score"] for lead in leads]
+    assert scores == sorted(scores, reverse=True)
+    # The score is stored on the lead itself
+    listed_score = next(lead["score"] for lead in leads if lead["id"] == strong)
+    assert client.get(f"/leads/{strong}", headers=headers).json()["score"] == pytest.approx(listed_score)
+    ids = [lead["id"] for lead in leads]
+    assert ids.index(strong) < ids.index(weak)
+
+    qualified = client.get("/leads/", params={"sort": "score", "status": "qualified"}, headers=headers).json()
+    assert all(lead["status"] == "qualified" for lead in qualified)
+
+    # Deleted leads leave the ranking on the next run
+    client.delete(f"/leads/{weak}", headers=headers)
+    assert asyncio.run(scoring_service.score_business(business_id))["removed"] == 1
+    ids = [lead["id"] for lead in client.get("/leads/", params={"sort": "score", "limit": 1000}, headers=headers).json()]
+    assert weak not in ids
+    assert strong in ids
+
+def test_score_ranking_follows_current_status(client, auth_token, test_lead_data):
+    """Test status filters use the stored lead and full runs drop leads that are gone"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    business_id = client.get("/auth/me", headers=headers).json()["business_id"]
+    lead_id = client.post("/leads/", json=test_lead_data, headers=headers).json()["id"]
+    asyncio.run(scoring_service.score_business(business_id, full=True))
+
+    # Changed after scoring, and not re-scored yet
+    client.patch(f"/leads/{lead_id}", json={"status": "converted"}, headers=headers)
+    converted = client.get("/leads/", params={"sort": "score", "status": "converted", "limit": 1000}, headers=headers)
+    assert lead_id in [lead["id"] for lead in converted.json()]
+    new = client.get("/leads/", params={"sort": "score", "status": "new", "limit": 1000}, headers=headers)
+    assert lead_id not in [lead["id"] for lead in new.json()]
+
+    # A full run clears the dirty queue, so it has to find deleted leads itself
+    client.delete(f"/leads/{lead_id}", headers=headers)
+    assert asyncio.run(scoring_service.score_business(business_id, full=True))["removed"] >= 1
+    assert lead_id not in asyncio.run(db.list_scored_lead_ids(business_id))
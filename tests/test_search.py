@@ -0,0 +1,77 @@
+import asyncio
+import time
+import pytest
+from fastapi import status
+
+from app.database.search_index import InMemorySearchIndex
+from app.services.search_service import SearchService, lead_postings, tokenize
+
+def test_tokenize_and_postings():
+    """Test tokens are normalised and weighted by field"""
+    assert tokenize("Hello, World! a") == ["hello", "world"]
+
+    postings = lead_postings({
+        "first_name": "John",
+        "last_name": "Doe",
+        "email": "john@acme.io",
+        "company": "Acme Corp",
+        "message": "need a roof quote"
+    })
+    assert postings["john"] == 3.0
+    assert postings["acme"] == 2.0
+    assert postings["roof"] == 1.0
+
+def test_incremental_ranking():
+    """Test prefix matching, ranking and incremental updates on the local backend"""
+    service = SearchService(index=InMemorySearchIndex())
+    john = {"id": "1", "business_id": "biz", "first_name": "John", "last_name": "Doe",
+            "email": "john@acme.io", "message": "roof repair"}
+    jo = {"id": "2", "business_id": "biz", "first_name": "Joanna", "last_name": "Roe",
+          "email": "jo@example.com", "message": "asked about john"}
+
+    async def run():
+        await service.index_lead(john)
+        await service.index_lead(jo)
+        assert [lead_id for lead_id, _ in await service.rank("biz", "john")] == ["1", "2"]
+        assert [lead_id for lead_id, _ in await service.rank("biz", "jo")] == ["2", "1"]
+        assert await service.rank("other", "john") == []
+
+        await service.reindex_lead(john, {**john, "message": "gutters"})
+        assert await service.rank("biz", "roof") == []
+        assert [lead_id for lead_id, _ in await service.rank("biz", "gut")] == ["1"]
+
+        await service.unindex_lead(jo)
+        assert [lead_id for lead_id, _ in await service.rank("biz", "jo")] == ["1"]
+
+    asyncio.run(run())
+
+def test_search_leads(client, auth_token, test_lead_data):
+    """Test searching leads through the API"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    lead = {**test_lead_data, "company": "Zyxwidget Holdings"}
+    lead_id = client.post("/leads/", json=lead, headers=headers).json()["id"]
+
+    response = client.get("/leads/search", params={"q": "zyxwid"}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert lead_id in [result["id"] for result in response.json()]
+
+    client.delete(f"/leads/{lead_id}", headers=headers)
+    response = client.get("/leads/search", params={"q": "zyxwid"}, headers=headers)
+    assert lead_id not in [result["id"] for result in response.json()]
+
+def test_common_terms_and_prune():
+    """Test common terms return every posting and prune drops only stale postings"""
+    index = InMemorySearchIndex()
+    service = SearchService(index=index)
+
+    async def run():
+        for n in range(6000):
+            await service.index_lead({"id": str(n), "business_id": "biz", "first_name": "Smith"})
+        assert len(await service.rank("biz", "smi", limit=10000)) == 6000
+
+        cutoff = time.time()
+        await service.index_lead({"id": "0", "business_id": "biz", "first_name": "Smith"})
+        assert await index.prune("biz", cutoff) == 5999
+        assert [lead_id for lead_id, _ in await service.rank("biz", "smith")] == ["0"]
+
+    asyncio.run(run())
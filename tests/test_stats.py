@@ -0,0 +1,76 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+
+from app.database.dynamodb import ConditionalWriteError, db
+from app.services.stats_service import LeadStatsService, lead_stats_service
+
+def test_stats_deltas():
+    """Test counter deltas for each write path"""
+    lead_data = {"status": "new", "created_at": "2026-10-19T12:30:00"}
+
+    assert LeadStatsService.deltas_for_create(lead_data) == {
+        "status#new": 1,
+        "day#2026-10-19": 1
+    }
+    assert LeadStatsService.deltas_for_delete(lead_data) == {
+        "status#new": -1,
+        "day#2026-10-19": -1
+    }
+    assert LeadStatsService.deltas_for_status_change("new", "qualified") == {
+        "status#new": -1,
+        "status#qualified": 1
+    }
+    assert LeadStatsService.deltas_for_status_change("new", "new") == {}
+
+def test_lead_stats(client, auth_token, test_lead_data):
+    """Test stats follow create, status change and delete"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    before = client.get("/leads/stats", headers=headers).json()
+
+    lead_id = client.post("/leads/", json=test_lead_data, headers=headers).json()["id"]
+    client.patch(f"/leads/{lead_id}", json={"status": "contacted"}, headers=headers)
+
+    response = client.get("/leads/stats", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    after = response.json()
+    assert after["total"] == before["total"] + 1
+    assert after["by_status"].get("contacted", 0) == before["by_status"].get("contacted", 0) + 1
+
+    client.delete(f"/leads/{lead_id}", headers=headers)
+    final = client.get("/leads/stats", headers=headers).json()
+    assert final["total"] == before["total"]
+
+def test_rebuild_matches_counters(client, auth_token, test_lead_data):
+    """Test a rebuild from a paged parallel scan reproduces the live counters"""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = client.post("/leads/", json={**test_lead_data, "email": "rebuild@example.com", "phone": "5555550199"},
+                           headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    before = client.get("/leads/stats", headers=headers).json()
+
+    asyncio.run(lead_stats_service.rebuild(total_segments=3))
+
+    after = client.get("/leads/stats", headers=headers).json()
+    assert after["total"] == before["total"]
+    assert after["by_status"] == before["by_status"]
+
+def test_rebuild_resets_businesses_without_leads():
+    """Test a rebuild clears the counters of a business whose leads are all gone"""
+    business_id = f"gone-{uuid4().hex[:8]}"
+    db._apply_stats_deltas(business_id, {"status#new": 2, "day#2026-10-19": 2})
+
+    asyncio.run(lead_stats_service.rebuild(total_segments=2))
+
+    assert asyncio.run(db.get_lead_stats(business_id, "2026-10-01", "2026-10-31")) == []
+
+def test_create_conflict_is_409(client, auth_token, test_lead_data, monkeypatch):
+    """Test a transaction cancelled by a concurrent write is a 409, not a 500"""
+    def conflict(items):
+        raise ConditionalWriteError("Transaction cancelled", [{"Code": "TransactionConflict"}] * len(items))
+    monkeypatch.setattr(db, "_transact_write", conflict)
+
+    response = client.post("/leads/", json=test_lead_data, headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == status.HTTP_409_CONFLICT
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import pytest
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from boto3.dynamodb.conditions import Key
+from fastapi import status
+from uuid import uuid4
+
+from app.config import settings
+from app.database.dynamodb import db
+from app.services.webhook_dispatcher import WebhookDispatcher, SIGNATURE_HEADER, sign_payload
+
+@pytest.fixture
+def webhook_sink(monkeypatch):
+    """Local HTTP server that records webhook deliveries"""
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", True)
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        fail = False
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((dict(self.headers), body))
+            self.send_response(500 if Handler.fail else 204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/hook", received, Handler
+    server.shutdown()
+
+def test_sign_payload():
+    """Test signatures are HMAC-SHA256 over timestamp and body"""
+    expected = hmac.new(b"secret", b"100.{}", hashlib.sha256).hexdigest()
+    assert sign_payload("secret", 100, b"{}") == f"t=100,v1={expected}"
+
+def test_webhook_delivery(client, auth_token, test_lead_data, webhook_sink):
+    """Test lead events are delivered, signed, to a registered endpoint"""
+    url, received, _ = webhook_sink
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    response = client.post("/webhooks/", json={"url": url}, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    webhook = response.json()
+
+    lead_id = client.post("/leads/", json=test_lead_data, headers=headers).json()["id"]
+    client.patch(f"/leads/{lead_id}", json={"status": "contacted"}, headers=headers)
+
+    dispatcher = WebhookDispatcher()
+    asyncio.run(dispatcher.run_once())
+
+    events = []
+    for request_headers, body in received:
+        timestamp = request_headers[SIGNATURE_HEADER].split(",")[0][2:]
+        assert request_headers[SIGNATURE_HEADER] == sign_payload(webhook["secret"], int(timestamp), body)
+        events.extend(json.loads(body)["events"])
+
+    types = [(e["type"], e["lead_id"]) for e in events]
+    assert ("lead.created", lead_id) in types
+    assert ("lead.status_changed", lead_id) in types
+    # lead.updated was not subscribed to
+    assert ("lead.updated", lead_id) not in types
+    assert dispatcher.stats.summary()["delivered"] >= 2
+
+    client.delete(f"/webhooks/{webhook['id']}", headers=headers)
+
+def test_webhook_dead_letter(client, auth_token, test_lead_data, webhook_sink):
+    """Test events that keep failing end up dead-lettered"""
+    url, received, handler = webhook_sink
+    handler.fail = True
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    webhook = client.post("/webhooks/", json={"url": url}, headers=headers).json()
+
+    lead_id = client.post("/leads/", json=test_lead_data, headers=headers).json()["id"]
+    asyncio.run(WebhookDispatcher(max_attempts=1).run_once())
+
+    assert received
+    response = client.get("/webhooks/dead-letters", headers=headers)
+    assert lead_id in [event["lead_id"] for event in response.json()]
+
+    client.delete(f"/webhooks/{webhook['id']}", headers=headers)
+
+def test_outbox_claims_and_backoff():
+    """Test backed-off events do not hide due ones and an event can only be claimed once"""
+    ids = [str(uuid4()) for _ in range(40)]
+    shard = db.outbox_pk(ids[0])
+    backing_off, due = [event_id for event_id in ids if db.outbox_pk(event_id) == shard][:2]
+    shard_number = int(shard.split("#")[1])
+
+    def event(event_id):
+        return {"event_id": event_id, "type": "lead.created", "business_id": "biz_outbox",
+                "lead_id": "lead", "occurred_at": "2026-01-01T00:00:00", "lead": {}}
+
+    async def run():
+        db._transact_write(db._outbox_puts([event(backing_off)]))
+        first = next(e for e in await db.get_outbox_events(shard_number, 1000) if e["event_id"] == backing_off)
+        claimed = await db.claim_outbox_event(first, lease_seconds=60)
+        assert claimed is not None
+        assert await db.claim_outbox_event(first, lease_seconds=60) is None
+        assert await db.reschedule_outbox_event(claimed, int(time.time()) + 3600, [], "HTTP 500")
+
+        db._transact_write(db._outbox_puts([event(due)]))
+        due_ids = [e["event_id"] for e in await db.get_outbox_events(shard_number, 1000)]
+        assert due in due_ids and backing_off not in due_ids
+
+        for event_id in (backing_off, due):
+            await db.delete_outbox_events([
+                e for e in db.meta_table.query(
+                    KeyConditionExpression=Key("pk").eq(shard)
+                )["Items"] if e["event_id"] == event_id
+            ])
+
+    asyncio.run(run())
+
+def test_webhook_urls_must_be_public(client, auth_token, test_lead_data, webhook_sink, monkeypatch):
+    """Test internal webhook URLs are refused at registration and again at delivery"""
+    url, received, _ = webhook_sink
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    webhook = client.post("/webhooks/", json={"url": url}, headers=headers).json()
+
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", False)
+    for blocked in ("http://93.184.216.34/hook", "https://169.254.169.254/latest", "https://localhost/hook",
+                    "https://10.0.0.5/hook", "https://[::1]/hook"):
+        response = client.post("/webhooks/", json={"url": blocked}, headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, blocked
+    public = client.post("/webhooks/", json={"url": "https://93.184.216.34/hook"}, headers=headers)
+    assert public.status_code == status.HTTP_201_CREATED
+    client.delete(f"/webhooks/{public.json()['id']}", headers=headers)
+
+    # An endpoint registered earlier is not called once its URL is disallowed
+    client.post("/leads/", json=test_lead_data, headers=headers)
+    dispatcher = WebhookDispatcher(max_attempts=1)
+    asyncio.run(dispatcher.run_once())
+    assert received == [] and dispatcher.stats.failed_requests >= 1
+
+    client.delete(f"/webhooks/{webhook['id']}", headers=headers)
+
+def test_dead_letters_paginate():
+    """Test dead letters are listed page by page through a cursor"""
+    business_id = f"biz_{uuid4().hex[:8]}"
+    for i in range(5):
+        db.meta_table.put_item(Item={
+            "pk": f"deadletter#{business_id}", "sk": f"2026-01-01T00:00:0{i}#evt{i}", "event_id": f"evt{i}",
+            "type": "lead.created", "lead_id": "lead", "occurred_at": f"2026-01-01T00:00:0{i}"
+        })
+
+    async def pages():
+        seen, cursor = [], None
+        while True:
+            items, cursor = await db.list_dead_letters(business_id, 2, cursor)
+            seen.append([item["event_id"] for item in items])
+            if cursor is None:
+                return seen
+
+    assert asyncio.run(pages()) == [["evt0", "evt1"], ["evt2", "evt3"], ["evt4"]]
+    with pytest.raises(ValueError):
+        asyncio.run(db.list_dead_letters(business_id, 2, "%%%"))